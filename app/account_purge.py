@@ -0,0 +1,161 @@
+# app/account_purge.py
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from app.cache import list_cache, task_cache
+from app.invalidation import bus
+from app.jobs import QUEUED, RUNNING, Job, Progress, runner
+from app.mongo import (
+    IDEMPOTENCY_COLLECTION,
+    JOBS_COLLECTION,
+    TASK_ANALYTICS_COLLECTION,
+    TASK_BUCKETS_COLLECTION,
+    TASK_STATS_COLLECTION,
+    TASKS_ARCHIVE_COLLECTION,
+    get_collection,
+    get_tasks_collection,
+)
+
+ACCOUNT_PURGE_CHUNK_SIZE = int(os.getenv("ACCOUNT_PURGE_CHUNK_SIZE", 500))
+ACCOUNT_PURGE_PAUSE_SECONDS = float(os.getenv("ACCOUNT_PURGE_PAUSE_SECONDS", 0.2))
+# Pause at least this many times as long as the last chunk took to delete
+ACCOUNT_PURGE_LOAD_FACTOR = float(os.getenv("ACCOUNT_PURGE_LOAD_FACTOR", 1))
+
+JOB_KIND = "account_purge"
+
+# Collections holding documents of a user in a user_id field, tasks first
+PURGED_COLLECTIONS = (
+    "tasks",
+    TASKS_ARCHIVE_COLLECTION,
+    TASK_BUCKETS_COLLECTION,
+    IDEMPOTENCY_COLLECTION,
+)
+
+
+def _collection(name: str):
+    return get_tasks_collection() if name == "tasks" else get_collection(name)
+
+
+def throttle(elapsed: float) -> float:
+    """Pause after a chunk, longer when Mongo was slow to delete it"""
+    return max(ACCOUNT_PURGE_PAUSE_SECONDS, elapsed * ACCOUNT_PURGE_LOAD_FACTOR)
+
+
+async def purge_chunk(name: str, user_id: int) -> int:
+    """Delete up to ACCOUNT_PURGE_CHUNK_SIZE documents of a user in one write"""
+    collection = _collection(name)
+    docs = (
+        await collection.find({"user_id": user_id}, projection={"_id": True})
+        .limit(ACCOUNT_PURGE_CHUNK_SIZE)
+        .to_list(None)
+    )
+    if not docs:
+        return 0
+    ids = [doc["_id"] for doc in docs]
+    result = await collection.delete_many({"user_id": user_id, "_id": {"$in": ids}})
+    if name == "tasks":
+        for task_id in ids:
+            await task_cache.invalidate(user_id, task_id)
+        await bus.publish(
+            "task", user_id=user_id, task_ids=[str(task_id) for task_id in ids]
+        )
+    return result.deleted_count
+
+
+async def purge_user(
+    user_id: int,
+    purged: Optional[Dict[str, int]] = None,
+    progress: Optional[Progress] = None,
+) -> Dict[str, int]:
+    """Delete everything stored in Mongo for a user, chunk by chunk
+
+    purged holds the counts of an earlier attempt; since only documents
+    that are still there are deleted, a purge can be re-run at any time.
+    """
+    purged = dict(purged or {})
+    for name in PURGED_COLLECTIONS:
+        while True:
+            started = time.monotonic()
+            chunk = await purge_chunk(name, user_id)
+            if chunk == 0:
+                break
+            purged[name] = purged.get(name, 0) + chunk
+            if progress is not None:
+                await progress(**{name: purged[name]})
+            await asyncio.sleep(throttle(time.monotonic() - started))
+
+    # Per-user documents, keyed by the user id
+    for name in (TASK_STATS_COLLECTION, TASK_ANALYTICS_COLLECTION):
+        await get_collection(name).delete_one({"_id": user_id})
+    await list_cache.bump(user_id)
+    await bus.publish("task", user_id=user_id)
+    return purged
+
+
+async def run_job(job: Job, progress: Progress) -> Dict[str, Any]:
+    # A resumed job continues the counts of the attempt before it
+    return await purge_user(job["user_id"], job["progress"], progress)
+
+
+async def schedule(user_id: int) -> Job:
+    return await runner.submit(JOB_KIND, user_id, {})
+
+
+async def schedule_orphans(accounts: Callable[[Iterable[int]], Set[int]]) -> int:
+    """Queue purges for users with tasks but no account, e.g. after a failed
+    schedule, skipping those already queued. Returns how many were queued.
+
+    accounts returns which of the given ids still have an account. It is
+    asked after reading the ids from Mongo, so a user who signed up and
+    created a task meanwhile is never taken for an orphan.
+    """
+    user_ids = set(await get_tasks_collection().distinct("user_id"))
+    orphans = user_ids - await asyncio.to_thread(accounts, user_ids)
+    queued = 0
+    for user_id in sorted(orphans):
+        pending = await get_collection(JOBS_COLLECTION).find_one(
+            {
+                "kind": JOB_KIND,
+                "user_id": user_id,
+                "status": {"$in": [QUEUED, RUNNING]},
+            }
+        )
+        if pending is None:
+            await schedule(user_id)
+            queued += 1
+    return queued
+
+
+runner.register(JOB_KIND, run_job)
+
+
+def existing_accounts(user_ids: Iterable[int]) -> Set[int]:
+    from app import database, models
+
+    db = database.SessionLocal()
+    try:
+        return {
+            user_id
+            for (user_id,) in db.query(models.User.id).filter(
+                models.User.id.in_(list(user_ids))
+            )
+        }
+    finally:
+        db.close()
+
+
+async def main():
+    from app.mongo import connect_to_mongo, disconnect_from_mongo
+
+    await connect_to_mongo()
+    try:
+        queued = await schedule_orphans(existing_accounts)
+        print(f"Queued purges for {queued} deleted accounts")
+    finally:
+        await disconnect_from_mongo()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
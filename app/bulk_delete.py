@@ -0,0 +1,140 @@
+# app/bulk_delete.py
+import asyncio
+import os
+from datetime import UTC, datetime
+from typing import Any, Dict, Optional, Tuple
+
+import app.task_analytics as task_analytics
+import app.task_stats as task_stats
+import app.task_tiering as task_tiering
+from app.cache import list_cache, task_cache
+from app.invalidation import bus
+from app.jobs import Job, Progress, runner
+from app.mongo import get_tasks_collection
+
+BULK_DELETE_CHUNK_SIZE = int(os.getenv("BULK_DELETE_CHUNK_SIZE", 500))
+# Larger sets are deleted by a background job instead of within the request
+BULK_DELETE_INLINE_LIMIT = int(os.getenv("BULK_DELETE_INLINE_LIMIT", 1000))
+BULK_DELETE_PAUSE_SECONDS = float(os.getenv("BULK_DELETE_PAUSE_SECONDS", 0.1))
+
+JOB_KIND = "bulk_delete"
+
+
+def match_query(user_id: int, criteria: Dict[str, Any]) -> Dict[str, Any]:
+    """Live tasks of a user matching TaskBulkDelete fields"""
+    query: Dict[str, Any] = {"user_id": user_id, "deleted_at": None}
+    completed: Dict[str, Any] = {}
+    if criteria.get("completed") is not None:
+        completed["$ne" if criteria["completed"] else "$eq"] = None
+    if criteria.get("completed_before") is not None:
+        completed["$lt"] = criteria["completed_before"]
+    if completed:
+        query["completed_at"] = completed
+    if criteria.get("created_before") is not None:
+        query["created_at"] = {"$lt": criteria["created_before"]}
+    if criteria.get("tag") is not None:
+        query["tags"] = criteria["tag"]
+    return query
+
+
+def cold_match(
+    user_id: int, criteria: Dict[str, Any]
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Bucket entry and month conditions for cold tasks matching criteria
+
+    None when no cold task can match: cold tasks are all completed.
+    """
+    if criteria.get("completed") is False:
+        return None
+    query = match_query(user_id, criteria)
+    task_match = {k: v for k, v in query.items() if k not in ("user_id", "deleted_at")}
+    months: Dict[str, Any] = {}
+    if criteria.get("created_before") is not None:
+        # A bucket's month starts no later than any task in it was created
+        months["$lt"] = criteria["created_before"]
+    return task_match, months
+
+
+async def count_cold(user_id: int, criteria: Dict[str, Any], limit: int) -> int:
+    match = cold_match(user_id, criteria)
+    if match is None:
+        return 0
+    return await task_tiering.count_matching(user_id, *match, limit=limit)
+
+
+async def delete_chunk(user_id: int, query: Dict[str, Any]) -> int:
+    """Soft-delete up to BULK_DELETE_CHUNK_SIZE matching tasks in one write"""
+    tasks_collection = get_tasks_collection()
+    docs = (
+        await tasks_collection.find(
+            query,
+            projection={"created_at": True, "completed_at": True, "tags": True},
+        )
+        .limit(BULK_DELETE_CHUNK_SIZE)
+        .to_list(None)
+    )
+    if not docs:
+        return 0
+    ids = [doc["_id"] for doc in docs]
+    result = await tasks_collection.update_many(
+        {**query, "_id": {"$in": ids}},
+        {"$set": {"deleted_at": datetime.now(UTC)}},
+    )
+    if result.modified_count == len(ids):
+        await task_stats.record_bulk_deleted(user_id, docs)
+    else:
+        # Some tasks changed meanwhile, count from scratch
+        await task_stats.recompute_stats(user_id)
+    await task_analytics.record_change(
+        user_id,
+        [doc.get(field) for doc in docs for field in ("created_at", "completed_at")],
+    )
+    for task_id in ids:
+        await task_cache.invalidate(user_id, task_id)
+    await list_cache.bump(user_id)
+    await bus.publish(
+        "task", user_id=user_id, task_ids=[str(task_id) for task_id in ids]
+    )
+    return result.modified_count
+
+
+async def delete_matching(
+    user_id: int,
+    criteria: Dict[str, Any],
+    progress: Optional[Progress] = None,
+    pause: float = 0,
+) -> int:
+    """Delete matching tasks chunk by chunk, returning how many were deleted"""
+    query = match_query(user_id, criteria)
+    cold = cold_match(user_id, criteria)
+    deleted = 0
+    while True:
+        if cold is not None:
+            # Matching cold tasks are deleted like hot ones once thawed
+            await task_tiering.thaw_matching(
+                user_id, *cold, limit=BULK_DELETE_CHUNK_SIZE
+            )
+        chunk = await delete_chunk(user_id, query)
+        if chunk == 0:
+            return deleted
+        deleted += chunk
+        if progress is not None:
+            await progress(deleted=deleted)
+        if pause:
+            await asyncio.sleep(pause)
+
+
+async def run_job(job: Job, progress: Progress) -> Dict[str, Any]:
+    # A resumed job continues the count of the attempt before it
+    done = job["progress"].get("deleted", 0)
+
+    async def report(deleted: int) -> None:
+        await progress(deleted=done + deleted)
+
+    deleted = await delete_matching(
+        job["user_id"], job["params"], report, BULK_DELETE_PAUSE_SECONDS
+    )
+    return {"deleted": done + deleted}
+
+
+runner.register(JOB_KIND, run_job)
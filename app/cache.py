@@ -0,0 +1,245 @@
+# app/cache.py
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import bson
+from pydantic import BaseModel
+
+from app import metrics
+from app.singleflight import AsyncSingleFlight
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 300))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class MemoryCacheBackend:
+    """In-process LRU bounded by entry count and total value size"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int = CACHE_TTL_SECONDS) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RedisCacheBackend:
+    """Shared cache in Redis, memory is bounded by the Redis server"""
+
+    def __init__(self, url: str = REDIS_URL):
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int = CACHE_TTL_SECONDS) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def clear(self) -> None:
+        await self._client.flushdb()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+
+class NullCacheBackend:
+    """Backend that stores nothing, used to disable caching"""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int = CACHE_TTL_SECONDS) -> None:
+        return None
+
+    async def delete(self, key: str) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+
+def build_backend(name: str = CACHE_BACKEND):
+    if name == "none":
+        return NullCacheBackend()
+    if name == "redis":
+        if redis is not None:
+            return RedisCacheBackend()
+        print("redis package not installed, falling back to in-memory cache")
+    return MemoryCacheBackend()
+
+
+class TaskCache:
+    """Read-through cache of live task documents keyed by (user_id, task_id)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every write so reads started before it cannot refill
+        # the cache with the document they fetched earlier
+        self.generation = 0
+        self.flights = AsyncSingleFlight()
+
+    @staticmethod
+    def key(user_id: int, task_id: Any) -> str:
+        return f"task:{user_id}:{task_id}"
+
+    async def get_or_load(
+        self,
+        user_id: int,
+        task_id: Any,
+        loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        key = self.key(user_id, task_id)
+        cached = await self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return bson.decode(cached)
+        self.misses += 1
+        generation = self.generation
+        # Reads issued after a write never join a load started before it
+        doc = await self.flights.do((key, generation), loader)
+        if doc is not None and generation == self.generation:
+            await self.backend.set(key, bson.encode(doc))
+        return doc
+
+    async def put(self, user_id: int, task_id: Any, doc: Dict[str, Any]) -> None:
+        self.generation += 1
+        await self.backend.set(self.key(user_id, task_id), bson.encode(doc))
+
+    async def invalidate(self, user_id: int, task_id: Any) -> None:
+        self.generation += 1
+        await self.backend.delete(self.key(user_id, task_id))
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "coalesced": self.flights.coalesced,
+            **self.backend.metrics(),
+        }
+
+
+class ListPageCache:
+    """Serialized list pages namespaced by a per-user version
+
+    Every write replaces the user's version, which makes all their cached
+    pages unreachable at once; stale entries then age out of the backend.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.flights = AsyncSingleFlight()
+
+    async def _version(self, user_id: int) -> bytes:
+        key = f"tasks:version:{user_id}"
+        version = await self.backend.get(key)
+        if version is None:
+            # An evicted version must never fall back to an older one
+            version = uuid.uuid4().hex.encode()
+            await self.backend.set(key, version)
+        return version
+
+    async def get_or_build(
+        self,
+        user_id: int,
+        params: Dict[str, Any],
+        build: Callable[[], Awaitable[BaseModel]],
+    ) -> bytes:
+        version = await self._version(user_id)
+        query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+        key = f"tasks:list:{user_id}:{version.decode()}:{query}"
+        cached = await self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        async def build_and_store() -> bytes:
+            page = await build()
+            body = page.model_dump_json(by_alias=True).encode()
+            await self.backend.set(key, body)
+            return body
+
+        # The version is part of the key, so reads after a write start afresh
+        return await self.flights.do(key, build_and_store)
+
+    async def bump(self, user_id: int) -> None:
+        await self.backend.set(f"tasks:version:{user_id}", uuid.uuid4().hex.encode())
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "coalesced": self.flights.coalesced,
+        }
+
+
+backend = build_backend()
+task_cache = TaskCache(backend)
+list_cache = ListPageCache(backend)
+metrics.register("task_cache", task_cache.metrics)
+metrics.register("list_cache", list_cache.metrics)
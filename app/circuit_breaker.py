@@ -0,0 +1,128 @@
+# app/circuit_breaker.py
+import functools
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple, Type
+
+from app import metrics
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_TIMEOUT_SECONDS = float(os.getenv("CIRCUIT_RESET_TIMEOUT_SECONDS", 10))
+CIRCUIT_HALF_OPEN_MAX_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_MAX_CALLS", 1))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that is known to be down"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency keeps failing, probing for recovery
+
+    Opens after failure_threshold consecutive failures. After reset_timeout
+    it lets half_open_max_calls probes through; a success closes it again
+    and a failure reopens it. Safe to use from the threadpool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT_SECONDS,
+        half_open_max_calls: int = CIRCUIT_HALF_OPEN_MAX_CALLS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_count = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        metrics.register(f"circuit_{name}", self.metrics)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == CLOSED:
+                return
+            waited = now - self._opened_at
+            if self.state == OPEN and waited >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._opened_at = now
+                self._probes = 0
+            elif self.state == HALF_OPEN and waited >= self.reset_timeout:
+                # The probes never reported back, allow fresh ones
+                self._opened_at = now
+                self._probes = 0
+            if self.state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self.rejected += 1
+            raise CircuitOpenError(
+                self.name, max(0.0, self.reset_timeout - (now - self._opened_at))
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                print(f"Circuit {self.name} closed")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self.opened_count += 1
+                print(f"Circuit {self.name} opened")
+
+    def guard(self, failures: Tuple[Type[BaseException], ...]):
+        """Decorate a blocking call; the listed exceptions count as failures"""
+
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                self.before_call()
+                try:
+                    result = fn(*args, **kwargs)
+                except failures:
+                    self.record_failure()
+                    raise
+                self.record_success()
+                return result
+
+            return wrapper
+
+        return decorator
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened_count,
+            "rejected": self.rejected,
+        }
+
+
+def retry_after_header(error: CircuitOpenError) -> str:
+    return str(max(1, math.ceil(error.retry_after)))
@@ -0,0 +1,212 @@
+# app/compression.py
+import os
+import zlib
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 500))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", 6))
+COMPRESSION_EXCLUDE_PATHS = [
+    path.strip()
+    for path in os.getenv("COMPRESSION_EXCLUDE_PATHS", "").split(",")
+    if path.strip()
+]
+
+# Scope key set by routes that must never be compressed
+SKIP_COMPRESSION_KEY = "app.skip_compression"
+
+
+def skip_compression(request: Request) -> None:
+    """Route dependency that opts the response out of compression"""
+    request.scope[SKIP_COMPRESSION_KEY] = True
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level: int):
+        # Brotli quality goes up to 11, gzip levels up to 9
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encoders() -> Dict[str, type]:
+    """Encoders usable in this environment, in server preference order"""
+    encoders: Dict[str, type] = {}
+    if brotli is not None:
+        encoders[BrotliEncoder.name] = BrotliEncoder
+    if zstandard is not None:
+        encoders[ZstdEncoder.name] = ZstdEncoder
+    encoders[GzipEncoder.name] = GzipEncoder
+    return encoders
+
+
+def select_encoding(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+    """Pick the supported coding with the highest client q-value"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """Compress response bodies, streaming chunk by chunk when needed"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        compresslevel: int = COMPRESSION_LEVEL,
+        exclude_paths: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.exclude_paths = tuple(
+            COMPRESSION_EXCLUDE_PATHS if exclude_paths is None else exclude_paths
+        )
+        self.encoders = available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = select_encoding(headers.get("accept-encoding", ""), self.encoders)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        encoder = self.encoders[encoding](self.compresslevel)
+        responder = _CompressionResponder(self, scope, send, encoder)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoder
+    ):
+        self.minimum_size = middleware.minimum_size
+        self.scope = scope
+        self.inner_send = send
+        self.encoder = encoder
+        self.start_message: Optional[Message] = None
+        self.started = False
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Defer until the first body chunk tells us the response size
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.inner_send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            start_message = self.start_message
+            assert start_message is not None, "body sent before response start"
+            headers = MutableHeaders(raw=start_message["headers"])
+            self.passthrough = (
+                self.scope.get(SKIP_COMPRESSION_KEY, False)
+                or "content-encoding" in headers
+                or (not more_body and len(body) < self.minimum_size)
+            )
+            if self.passthrough:
+                await self.inner_send(start_message)
+                await self.inner_send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoder.name
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Streaming response, length is unknown until the end
+                del headers["Content-Length"]
+                message["body"] = self.encoder.compress(body)
+            else:
+                message["body"] = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.inner_send(start_message)
+            await self.inner_send(message)
+            return
+
+        if self.passthrough:
+            await self.inner_send(message)
+            return
+
+        compressed = self.encoder.compress(body)
+        if not more_body:
+            compressed += self.encoder.finish()
+        message["body"] = compressed
+        await self.inner_send(message)
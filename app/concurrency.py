@@ -0,0 +1,160 @@
+# app/concurrency.py
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import metrics
+
+CONCURRENCY_LIMIT_ENABLED = os.getenv("CONCURRENCY_LIMIT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+CONCURRENCY_INITIAL_LIMIT = float(os.getenv("CONCURRENCY_INITIAL_LIMIT", 20))
+CONCURRENCY_MIN_LIMIT = float(os.getenv("CONCURRENCY_MIN_LIMIT", 2))
+CONCURRENCY_MAX_LIMIT = float(os.getenv("CONCURRENCY_MAX_LIMIT", 200))
+CONCURRENCY_LATENCY_THRESHOLD_MS = float(
+    os.getenv("CONCURRENCY_LATENCY_THRESHOLD_MS", 500)
+)
+CONCURRENCY_BACKOFF = float(os.getenv("CONCURRENCY_BACKOFF", 0.9))
+CONCURRENCY_PATHS = [
+    path.strip()
+    for path in os.getenv("CONCURRENCY_PATHS", "/tasks").split(",")
+    if path.strip()
+]
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight requests driven by observed latency
+
+    The limit grows by about one per round trip while requests finish
+    under the latency threshold, and is cut multiplicatively when they
+    don't, at most once per round trip.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = CONCURRENCY_INITIAL_LIMIT,
+        min_limit: float = CONCURRENCY_MIN_LIMIT,
+        max_limit: float = CONCURRENCY_MAX_LIMIT,
+        latency_threshold_ms: float = CONCURRENCY_LATENCY_THRESHOLD_MS,
+        backoff: float = CONCURRENCY_BACKOFF,
+    ):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold_ms / 1000
+        self.backoff = backoff
+        self.in_flight = 0
+        self.accepted = 0
+        self.shed = 0
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._latencies: deque = deque(maxlen=1000)
+
+    def try_acquire(self) -> Optional[float]:
+        """Return the start time of an admitted request, or None to shed it"""
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return None
+        self.in_flight += 1
+        self.accepted += 1
+        return time.monotonic()
+
+    def release(self, started_at: float, overloaded: bool = False) -> None:
+        now = time.monotonic()
+        latency = now - started_at
+        self.in_flight -= 1
+        self._latencies.append(latency)
+        if overloaded or latency > self.latency_threshold:
+            # Requests admitted before the last cut already reflect it
+            if started_at >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow a limit that is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def cancel(self) -> None:
+        """Release a request that ended without a usable latency sample"""
+        self.in_flight -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "accepted": self.accepted,
+            "shed": self.shed,
+            "decreases": self.decreases,
+            "p99_ms": p99 * 1000,
+        }
+
+
+class ConcurrencyLimitMiddleware:
+    """Shed requests beyond the adaptive limit with an immediate 503"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        paths: Optional[Iterable[str]] = None,
+        enabled: bool = CONCURRENCY_LIMIT_ENABLED,
+    ):
+        self.app = app
+        self.limiter = limiter or task_concurrency
+        self.paths = tuple(CONCURRENCY_PATHS if paths is None else paths)
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or not scope["path"].startswith(self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = self.limiter.try_acquire()
+        if started_at is None:
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            self.limiter.release(started_at, overloaded=True)
+            raise
+        except BaseException:
+            # Cancelled by a client disconnect, says nothing about the backend
+            self.limiter.cancel()
+            raise
+        else:
+            # Deadline 504s count by latency only, see request_deadline
+            deadline_exceeded = scope.get("state", {}).get("deadline_exceeded", False)
+            self.limiter.release(
+                started_at, overloaded=status_code >= 500 and not deadline_exceeded
+            )
+
+
+task_concurrency = AdaptiveConcurrencyLimiter()
+metrics.register("task_concurrency", task_concurrency.metrics)
@@ -1,23 +1,58 @@
 # app/crud.py
 import os
 from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import exc
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app import models, schemas
+from app import metrics, models, schemas
+from app.circuit_breaker import CircuitBreaker
+from app.singleflight import SingleFlight
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("SECRET_KEY", "secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Concurrent lookups of the same email share a single query
+user_lookups = SingleFlight()
+metrics.register("user_lookups", user_lookups.metrics)
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+# Connection level errors, not constraint violations, trip the breaker
+sql_breaker = CircuitBreaker("mysql")
+sql_guard = sql_breaker.guard(
+    (exc.OperationalError, exc.DisconnectionError, exc.TimeoutError)
+)
 
 
+def _load_user_row(db: Session, email: str) -> Optional[Dict[str, Any]]:
+    user = db.query(models.User).filter(models.User.email == email).first()
+    if user is None:
+        return None
+    return {
+        "id": user.id,
+        "email": user.email,
+        "hashed_password": user.hashed_password,
+    }
+
+
+@sql_guard
+def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    # Share the row, not the leader's instance: ORM objects belong to the
+    # session, and thread, that loaded them
+    row = user_lookups.do(email, lambda: _load_user_row(db, email))
+    if row is None:
+        return None
+    user = models.User(**row)
+    make_transient_to_detached(user)
+    # Attached to the caller's session without another query
+    return db.merge(user, load=False)
+
+
+@sql_guard
 def create_user(db: Session, user: schemas.UserCreate):
     hashed_password = pwd_context.hash(user.password)
     db_user = models.User(email=user.email, hashed_password=hashed_password)
@@ -27,6 +62,12 @@ def create_user(db: Session, user: schemas.UserCreate):
     return db_user
 
 
+@sql_guard
+def delete_user(db: Session, user: models.User):
+    db.delete(user)
+    db.commit()
+
+
 def authenticate_user(db: Session, email: str, password: str):
     user = get_user_by_email(db, email)
     if not user or not pwd_context.verify(password, user.hashed_password):
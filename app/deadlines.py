@@ -0,0 +1,115 @@
+# app/deadlines.py
+import asyncio
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Annotated, Dict, Optional
+
+import pymongo
+from fastapi import Header, HTTPException, Request, status
+from pymongo.errors import PyMongoError
+from sqlalchemy import event
+
+from app import database
+
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", 5))
+# Per-route budgets as "<route name>=<seconds>,...", e.g. "list_tasks=2"
+REQUEST_TIMEOUTS: Dict[str, float] = {
+    name.strip(): float(seconds)
+    for name, _, seconds in (
+        item.partition("=")
+        for item in os.getenv("REQUEST_TIMEOUTS", "get_task_analytics=15").split(",")
+        if item.strip()
+    )
+}
+
+# Monotonic time by which the current request must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised before starting work the request no longer has time for"""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def route_timeout(request: Request) -> float:
+    name = getattr(request.scope.get("route"), "name", None)
+    if name is None:
+        return REQUEST_TIMEOUT_SECONDS
+    return REQUEST_TIMEOUTS.get(name, REQUEST_TIMEOUT_SECONDS)
+
+
+def deadline_exceeded(request: Request) -> HTTPException:
+    # Clients pick their own deadlines, so the concurrency limiter judges
+    # these 504s by their latency rather than as overload
+    request.state.deadline_exceeded = True
+    return HTTPException(status.HTTP_504_GATEWAY_TIMEOUT, "Request deadline exceeded")
+
+
+async def request_deadline(
+    request: Request,
+    x_request_timeout: Annotated[Optional[str], Header()] = None,
+):
+    """Bound the whole request, Mongo and SQL calls included, by a deadline
+
+    Clients may shorten the route's budget with X-Request-Timeout (seconds)
+    but never extend it. Work still running at the deadline is cancelled
+    and answered with a 504.
+    """
+    budget = route_timeout(request)
+    if x_request_timeout is not None:
+        try:
+            requested = float(x_request_timeout)
+        except ValueError:
+            requested = 0
+        if not requested > 0:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, "Invalid X-Request-Timeout header"
+            )
+        budget = min(budget, requested)
+
+    token = _deadline.set(time.monotonic() + budget)
+    try:
+        # pymongo turns the remaining budget into maxTimeMS and socket timeouts
+        with pymongo.timeout(budget):
+            async with asyncio.timeout(budget):
+                yield
+    except TimeoutError:
+        raise deadline_exceeded(request)
+    except PyMongoError as e:
+        if not e.timeout:
+            raise
+        raise deadline_exceeded(request)
+    finally:
+        _deadline.reset(token)
+
+
+def with_statement_timeout(statement: str, milliseconds: int) -> str:
+    """Add a MySQL MAX_EXECUTION_TIME hint to a SELECT statement"""
+    return re.sub(
+        r"^\s*SELECT\b",
+        f"SELECT /*+ MAX_EXECUTION_TIME({milliseconds}) */",
+        statement,
+        count=1,
+        flags=re.IGNORECASE,
+    )
+
+
+@event.listens_for(database.engine, "before_cursor_execute", retval=True)
+def apply_statement_timeout(conn, cursor, statement, parameters, context, executemany):
+    left = remaining()
+    if left is None:
+        return statement, parameters
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded")
+    if conn.dialect.name == "mysql":
+        statement = with_statement_timeout(statement, max(1, int(left * 1000)))
+    return statement, parameters
@@ -1,4 +1,7 @@
 # app/deps.py
+from contextvars import ContextVar
+from typing import Any, Optional
+
 from bson import ObjectId
 from fastapi import Depends, HTTPException, Path, status
 from fastapi.security import OAuth2PasswordBearer
@@ -9,6 +12,9 @@ from app import crud, database
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
+# User a /batch request authenticated, shared by its sub-requests
+batch_principal: ContextVar[Optional[Any]] = ContextVar("batch_principal", default=None)
+
 
 def get_db():
     db = database.SessionLocal()
@@ -21,6 +27,10 @@ def get_db():
 def get_current_user(
     token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
 ):
+    principal = batch_principal.get()
+    if principal is not None:
+        # A /batch sub-request, its token was checked by the batch
+        return principal
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,7 +45,9 @@ def get_current_user(
         raise credentials_exception
 
     user = crud.get_user_by_email(db, email=email)
-    if user is None:
+    # Tokens name the account they were issued for, so they stop working
+    # once it is deleted, even if the email is registered again
+    if user is None or payload.get("uid", user.id) != user.id:
         raise credentials_exception
     return user
 
@@ -49,3 +61,11 @@ def get_object_id_or_404(param_name: str, description: str):
         return ObjectId(obj_id)
 
     return dependency
+
+
+def prefers_return_minimal(prefer: Optional[str]) -> bool:
+    """Check whether a Prefer header asks for return=minimal (RFC 7240)"""
+    if not prefer:
+        return False
+    preferences = {item.strip().lower() for item in prefer.split(",")}
+    return "return=minimal" in preferences
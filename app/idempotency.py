@@ -0,0 +1,135 @@
+# app/idempotency.py
+import asyncio
+import contextvars
+import hashlib
+import os
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.mongo import IDEMPOTENCY_COLLECTION, get_collection
+
+MAX_KEY_LENGTH = 255
+# A pending claim its request never completed or released, e.g. after a
+# crash, can be taken over by a retry once this has passed
+IDEMPOTENCY_PENDING_SECONDS = float(os.getenv("IDEMPOTENCY_PENDING_SECONDS", 60))
+
+# Releases in flight, referenced until done so they are not collected
+_releases: Set[asyncio.Task] = set()
+
+
+def request_fingerprint(operation: str, payload: str) -> str:
+    """Hash identifying the request a key was first used for"""
+    return hashlib.sha256(f"{operation}:{payload}".encode()).hexdigest()
+
+
+async def begin(user_id: int, key: str, fingerprint: str) -> Optional[JSONResponse]:
+    """Claim an idempotency key, or replay the response stored under it
+
+    Returns None when the caller owns the key and must perform the request.
+    The unique (user_id, key) index makes the claim atomic, so concurrent
+    duplicates either replay the stored response or get a 409, until the
+    claim's lease runs out and a retry may take it over.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid Idempotency-Key")
+
+    collection = get_collection(IDEMPOTENCY_COLLECTION)
+    now = datetime.now(UTC)
+    pending_until = now + timedelta(seconds=IDEMPOTENCY_PENDING_SECONDS)
+    try:
+        await collection.insert_one(
+            {
+                "user_id": user_id,
+                "key": key,
+                "fingerprint": fingerprint,
+                "status": "pending",
+                "pending_until": pending_until,
+                "created_at": now,
+            }
+        )
+        return None
+    except DuplicateKeyError:
+        pass
+
+    # Claims without a lease predate it and are treated as expired
+    taken_over = await collection.find_one_and_update(
+        {
+            "user_id": user_id,
+            "key": key,
+            "fingerprint": fingerprint,
+            "status": "pending",
+            "pending_until": {"$not": {"$gt": now}},
+        },
+        {"$set": {"pending_until": pending_until}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if taken_over is not None:
+        return None
+    record = await collection.find_one({"user_id": user_id, "key": key})
+
+    if record is not None and record["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "Idempotency-Key was already used for a different request",
+        )
+    if record is None or record["status"] != "completed":
+        raise HTTPException(
+            status.HTTP_409_CONFLICT,
+            "A request with this Idempotency-Key is in progress",
+            headers={"Retry-After": "1"},
+        )
+    return JSONResponse(
+        status_code=record["status_code"],
+        content=record["response"],
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def complete(
+    user_id: int,
+    key: str,
+    resource_id: Any,
+    status_code: int,
+    response: Dict[str, Any],
+) -> None:
+    """Store the outcome of a request so retries can replay it"""
+    collection = get_collection(IDEMPOTENCY_COLLECTION)
+    await collection.update_one(
+        {"user_id": user_id, "key": key},
+        {
+            "$set": {
+                "status": "completed",
+                "resource_id": resource_id,
+                "status_code": status_code,
+                "response": response,
+            }
+        },
+    )
+
+
+async def release(user_id: int, key: str) -> None:
+    """Drop a pending claim after a failed request so it can be retried"""
+    collection = get_collection(IDEMPOTENCY_COLLECTION)
+    try:
+        await collection.delete_one(
+            {"user_id": user_id, "key": key, "status": "pending"}
+        )
+    except Exception as e:
+        # The claim's lease runs out instead
+        print(f"Error releasing idempotency key for user {user_id}: {e}")
+
+
+def release_later(user_id: int, key: str) -> None:
+    """Release a claim in the background, e.g. from a cancelled request
+
+    The release must not inherit the request's context: past its deadline
+    pymongo would fail the delete before sending it.
+    """
+    task = asyncio.create_task(release(user_id, key), context=contextvars.Context())
+    _releases.add(task)
+    task.add_done_callback(_releases.discard)
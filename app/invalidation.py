@@ -0,0 +1,192 @@
+# app/invalidation.py
+import asyncio
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+
+from app import metrics, mongo
+from app.cache import list_cache, task_cache
+
+INVALIDATION_TRANSPORT = os.getenv("INVALIDATION_TRANSPORT", "mongo")
+INVALIDATION_COLLECTION_SIZE = int(
+    os.getenv("INVALIDATION_COLLECTION_SIZE", 16 * 1024 * 1024)
+)
+INVALIDATION_RETRY_SECONDS = float(os.getenv("INVALIDATION_RETRY_SECONDS", 0.5))
+
+Message = Dict[str, Any]
+Deliver = Callable[[Message], Awaitable[None]]
+
+
+class InMemoryHub:
+    """Fan-out point shared by in-process transports, used in tests"""
+
+    def __init__(self):
+        self.subscribers: List[Deliver] = []
+
+
+class InMemoryTransport:
+    def __init__(self, hub: Optional[InMemoryHub] = None):
+        self.hub = hub or InMemoryHub()
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self.hub.subscribers.append(deliver)
+
+    async def stop(self) -> None:
+        if self._deliver in self.hub.subscribers:
+            self.hub.subscribers.remove(self._deliver)
+
+    async def publish(self, message: Message) -> None:
+        for deliver in list(self.hub.subscribers):
+            await deliver(dict(message))
+
+
+class MongoCappedTransport:
+    """Broadcast through a capped collection tailed by every worker
+
+    Works on standalone servers, unlike change streams. Messages missed
+    while a tail is being re-established are bounded by the cache TTL.
+    """
+
+    def __init__(
+        self,
+        name: str = mongo.INVALIDATION_COLLECTION,
+        size: int = INVALIDATION_COLLECTION_SIZE,
+    ):
+        self.name = name
+        self.size = size
+        self.collection: Optional[Any] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        if mongo.db is None:
+            raise RuntimeError("MongoDB is not connected")
+        try:
+            await mongo.db.create_collection(self.name, capped=True, size=self.size)
+        except CollectionInvalid:
+            pass  # Already created by another worker
+        collection = self.collection = mongo.get_collection(self.name)
+        last = await collection.find_one({}, sort=[("$natural", -1)])
+        self._task = asyncio.create_task(
+            self._tail(collection, deliver, last["_id"] if last else None)
+        )
+
+    async def _tail(self, collection: Any, deliver: Deliver, last_id: Any) -> None:
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            try:
+                cursor = collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for message in cursor:
+                        last_id = message["_id"]
+                        await deliver(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation tail failed: {e}")
+            # Tailable cursors die on empty collections, retry shortly
+            await asyncio.sleep(INVALIDATION_RETRY_SECONDS)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, message: Message) -> None:
+        if self.collection is None:
+            raise RuntimeError("Invalidation transport is not started")
+        await self.collection.insert_one(dict(message))
+
+
+class InvalidationBus:
+    """Tell other workers and nodes to drop cache entries after a write"""
+
+    def __init__(self, transport=None):
+        self.transport = transport
+        self.origin = uuid.uuid4().hex
+        self.handlers: Dict[str, List[Deliver]] = {}
+        self.started = False
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    def subscribe(self, kind: str, handler: Deliver) -> None:
+        self.handlers.setdefault(kind, []).append(handler)
+
+    async def start(self) -> None:
+        if self.transport is None:
+            return
+        try:
+            await self.transport.start(self._deliver)
+            self.started = True
+        except Exception as e:
+            # Caches still work per worker, bounded by their TTL
+            print(f"Error starting cache invalidation bus: {e}")
+
+    async def stop(self) -> None:
+        if self.started:
+            await self.transport.stop()
+            self.started = False
+
+    async def publish(self, kind: str, **fields: Any) -> None:
+        """Broadcast a message; the local worker has already applied it"""
+        if not self.started:
+            return
+        try:
+            await self.transport.publish(
+                {"origin": self.origin, "kind": kind, **fields}
+            )
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Error publishing cache invalidation: {e}")
+
+    async def _deliver(self, message: Message) -> None:
+        if message.get("origin") == self.origin:
+            return
+        self.received += 1
+        for handler in self.handlers.get(message.get("kind", ""), []):
+            try:
+                await handler(message)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error applying cache invalidation: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+def build_transport(name: str = INVALIDATION_TRANSPORT):
+    if name == "mongo":
+        return MongoCappedTransport()
+    if name == "memory":
+        return InMemoryTransport()
+    return None
+
+
+async def on_task_change(message: Message) -> None:
+    user_id = message["user_id"]
+    if message.get("task_id") is not None:
+        await task_cache.invalidate(user_id, message["task_id"])
+    # Bulk writes send all their task ids in one message
+    for task_id in message.get("task_ids", []):
+        await task_cache.invalidate(user_id, task_id)
+    await list_cache.bump(user_id)
+
+
+bus = InvalidationBus(build_transport())
+bus.subscribe("task", on_task_change)
+metrics.register("invalidation_bus", bus.metrics)
@@ -0,0 +1,199 @@
+# app/jobs.py
+import asyncio
+import os
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app import metrics
+from app.mongo import JOBS_COLLECTION, get_collection
+
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() in ("1", "true", "yes")
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", 2))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 5))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+Job = Dict[str, Any]
+Progress = Callable[..., Awaitable[None]]
+Handler = Callable[[Job, Progress], Awaitable[Dict[str, Any]]]
+
+
+class JobLost(Exception):
+    """Raised when another worker took over a job whose lease expired"""
+
+
+class JobRunner:
+    """Run background jobs stored in Mongo, resuming them after restarts
+
+    A worker leases a job while it runs and renews the lease with every
+    progress report. Jobs of workers that stopped or died are picked up
+    again once their lease expires, so handlers must be safe to re-run
+    from the start, e.g. by only touching what still matches.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = JOB_CONCURRENCY,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        poll_seconds: float = JOB_POLL_SECONDS,
+    ):
+        self.concurrency = concurrency
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_seconds = poll_seconds
+        self.worker_id = uuid.uuid4().hex
+        self.handlers: Dict[str, Handler] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self.completed = 0
+        self.failed = 0
+
+    def register(self, kind: str, handler: Handler) -> None:
+        self.handlers[kind] = handler
+
+    async def submit(self, kind: str, user_id: int, params: Dict[str, Any]) -> Job:
+        now = datetime.now(UTC)
+        job = {
+            "_id": ObjectId(),
+            "kind": kind,
+            "user_id": user_id,
+            "params": params,
+            "status": QUEUED,
+            "progress": {},
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+            "lease_until": now,
+        }
+        await get_collection(JOBS_COLLECTION).insert_one(job)
+        self._wakeup.set()
+        return job
+
+    async def get(self, user_id: int, job_id: ObjectId) -> Optional[Job]:
+        return await get_collection(JOBS_COLLECTION).find_one(
+            {"_id": job_id, "user_id": user_id}
+        )
+
+    async def start(self) -> None:
+        if not JOBS_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        for task in [self._task, *self._running]:
+            task.cancel()
+        await asyncio.gather(self._task, *self._running, return_exceptions=True)
+        self._task = None
+        try:
+            # Let other workers resume our jobs without waiting for the lease
+            await get_collection(JOBS_COLLECTION).update_many(
+                {"owner": self.worker_id, "status": RUNNING},
+                {"$set": {"lease_until": datetime.now(UTC)}},
+            )
+        except Exception as e:
+            print(f"Error releasing job leases: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while len(self._running) < self.concurrency:
+                    job = await self._claim()
+                    if job is None:
+                        break
+                    task = asyncio.create_task(self._execute(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._finished)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job runner error: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _claim(self) -> Optional[Job]:
+        """Lease the oldest queued job, or a running one whose worker is gone"""
+        now = datetime.now(UTC)
+        return await get_collection(JOBS_COLLECTION).find_one_and_update(
+            {
+                "status": {"$in": [QUEUED, RUNNING]},
+                "kind": {"$in": list(self.handlers)},
+                "lease_until": {"$lte": now},
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "owner": self.worker_id,
+                    "lease_until": now + self.lease,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _execute(self, job: Job) -> None:
+        jobs = get_collection(JOBS_COLLECTION)
+        owned = {"_id": job["_id"], "owner": self.worker_id}
+
+        async def progress(**fields: Any) -> None:
+            now = datetime.now(UTC)
+            result = await jobs.update_one(
+                owned,
+                {
+                    "$set": {
+                        **{f"progress.{name}": value for name, value in fields.items()},
+                        "lease_until": now + self.lease,
+                        "updated_at": now,
+                    }
+                },
+            )
+            if result.matched_count == 0:
+                raise JobLost(f"Job {job['_id']} was taken over")
+
+        update: Dict[str, Any]
+        try:
+            result = await self.handlers[job["kind"]](job, progress)
+        except asyncio.CancelledError:
+            raise  # Resumed by whichever worker leases it next
+        except JobLost:
+            return
+        except Exception as e:
+            self.failed += 1
+            print(f"Job {job['_id']} failed: {e}")
+            update = {"status": FAILED, "error": str(e)}
+        else:
+            self.completed += 1
+            update = {"status": DONE, "result": result}
+        now = datetime.now(UTC)
+        await jobs.update_one(
+            owned, {"$set": {**update, "finished_at": now, "updated_at": now}}
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+runner = JobRunner()
+metrics.register("jobs", runner.metrics)
@@ -1,10 +1,18 @@
 # app/main.py
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from app import invalidation, metrics
+from app.circuit_breaker import CircuitOpenError, retry_after_header
+from app.compression import CompressionMiddleware
+from app.concurrency import ConcurrencyLimitMiddleware
+from app.jobs import runner
 from app.mongo import connect_to_mongo, disconnect_from_mongo, ensure_indexes
-from app.routers import tasks, users
+from app.reminders import scheduler
+from app.routers import batch, tasks, users
+from app.write_batcher import insert_batcher
 
 
 @asynccontextmanager
@@ -12,12 +20,37 @@ async def lifespan(app: FastAPI):
     print("Application startup")
     await connect_to_mongo()
     await ensure_indexes()
+    await invalidation.bus.start()
+    await scheduler.start()
+    await runner.start()
     yield
+    await runner.stop()
+    await scheduler.stop()
+    await invalidation.bus.stop()
+    await insert_batcher.close()
     await disconnect_from_mongo()
     print("Application shutdown")
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+# Outermost, so shed requests cost no other work
+app.add_middleware(ConcurrencyLimitMiddleware)
 
 app.include_router(users.router)
 app.include_router(tasks.router)
+app.include_router(batch.router)
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"{exc.name} is temporarily unavailable"},
+        headers={"Retry-After": retry_after_header(exc)},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return metrics.snapshot()
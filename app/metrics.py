@@ -0,0 +1,13 @@
+# app/metrics.py
+from typing import Any, Callable, Dict
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Expose a component's counters under name in the metrics snapshot"""
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: provider() for name, provider in _providers.items()}
@@ -2,14 +2,81 @@
 import os
 from typing import Optional
 
+import pymongo.errors
 from dotenv import load_dotenv
-from pymongo import ASCENDING, DESCENDING, AsyncMongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient, monitoring
+from pymongo.errors import (
+    ConnectionFailure,
+    NetworkTimeout,
+    ServerSelectionTimeoutError,
+    WaitQueueTimeoutError,
+)
+
+from app.circuit_breaker import CircuitBreaker
 
 load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 MONGODB_DB = os.getenv("MONGODB_DB", "fastapi_tasks")
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", 86400))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 7 * 86400))
+
+IDEMPOTENCY_COLLECTION = "idempotency_keys"
+TASK_STATS_COLLECTION = "task_stats"
+TASK_ANALYTICS_COLLECTION = "task_analytics"
+INVALIDATION_COLLECTION = "cache_invalidations"
+REMINDER_LEASES_COLLECTION = "reminder_leases"
+TASKS_ARCHIVE_COLLECTION = "tasks_archive"
+TASK_BUCKETS_COLLECTION = "task_buckets"
+JOBS_COLLECTION = "jobs"
+
+mongo_breaker = CircuitBreaker("mongo")
+
+
+class BreakerCommandListener(monitoring.CommandListener):
+    """Feed command outcomes to the breaker, only network errors are failures"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        self.breaker.record_success()
+
+    def failed(self, event) -> None:
+        error_type = getattr(pymongo.errors, event.failure.get("errtype", ""), None)
+        if isinstance(error_type, type) and issubclass(
+            error_type, (NetworkTimeout, WaitQueueTimeoutError)
+        ):
+            # Mostly a request's own deadline running out, which clients
+            # choose; an unreachable server still fails the heartbeats
+            return
+        if isinstance(error_type, type) and issubclass(error_type, ConnectionFailure):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()  # The server answered
+
+
+class BreakerHeartbeatListener(monitoring.ServerHeartbeatListener):
+    """Count failed heartbeats, which also cover servers that can't be selected"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        pass
+
+    def failed(self, event) -> None:
+        self.breaker.record_failure()
+
+
+monitoring.register(BreakerCommandListener(mongo_breaker))
+monitoring.register(BreakerHeartbeatListener(mongo_breaker))
 
 # Global variables for MongoDB client and database
 mongo_client: Optional[AsyncMongoClient] = None
@@ -78,6 +145,38 @@ async def ensure_indexes():
         await tasks_collection.create_index(
             [("user_id", ASCENDING), ("deleted_at", ASCENDING)]
         )
+        # Multikey index for listing a user's tasks by tag, newest first
+        await tasks_collection.create_index(
+            [("user_id", ASCENDING), ("tags", ASCENDING), ("created_at", DESCENDING)]
+        )
+        # Manual ordering of a user's live tasks
+        await tasks_collection.create_index(
+            [("user_id", ASCENDING), ("deleted_at", ASCENDING), ("rank", ASCENDING)]
+        )
+        # Deleted tasks only, for keyset pages of a user's trash
+        await tasks_collection.create_index(
+            [("user_id", ASCENDING), ("deleted_at", DESCENDING), ("_id", DESCENDING)],
+            partialFilterExpression={"deleted_at": {"$type": "date"}},
+        )
+        # Recurring tasks only, expanded into occurrences on read
+        await tasks_collection.create_index(
+            [("user_id", ASCENDING), ("recurrence", ASCENDING)],
+            partialFilterExpression={"recurrence": {"$type": "string"}},
+        )
+        # Materialized occurrences, at most one per series and moment
+        await tasks_collection.create_index(
+            [("series_id", ASCENDING), ("occurrence_at", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"series_id": {"$exists": True}},
+        )
+        # Only tasks with a reminder still to send, read by the scheduler
+        await tasks_collection.create_index(
+            [("due_at", ASCENDING)],
+            partialFilterExpression={"reminder_pending": True},
+        )
+
+        if db is not None:
+            await ensure_auxiliary_indexes()
 
         print("MongoDB indexes created successfully")
     except Exception as e:
@@ -85,10 +184,58 @@ async def ensure_indexes():
         # Don't raise the error as this shouldn't stop the application
 
 
+async def ensure_auxiliary_indexes():
+    """Ensure indexes on collections supporting the tasks API"""
+    idempotency_collection = db[IDEMPOTENCY_COLLECTION]
+    await idempotency_collection.create_index(
+        [("user_id", ASCENDING), ("key", ASCENDING)], unique=True
+    )
+    # Expire keys once clients can no longer be retrying
+    await idempotency_collection.create_index(
+        [("created_at", ASCENDING)], expireAfterSeconds=IDEMPOTENCY_KEY_TTL_SECONDS
+    )
+    # Keyset pages of a user's archived trash, and restores
+    await db[TASKS_ARCHIVE_COLLECTION].create_index(
+        [("user_id", ASCENDING), ("deleted_at", DESCENDING), ("_id", DESCENDING)]
+    )
+    # Monthly buckets of old completed tasks, read by date range or task id
+    buckets_collection = db[TASK_BUCKETS_COLLECTION]
+    await buckets_collection.create_index(
+        [("user_id", ASCENDING), ("month", ASCENDING)]
+    )
+    await buckets_collection.create_index(
+        [("user_id", ASCENDING), ("tasks._id", ASCENDING)]
+    )
+    # Claiming queued jobs and jobs whose worker's lease expired
+    jobs_collection = db[JOBS_COLLECTION]
+    await jobs_collection.create_index(
+        [("status", ASCENDING), ("lease_until", ASCENDING)]
+    )
+    # Keep finished jobs around for clients polling their outcome
+    await jobs_collection.create_index(
+        [("finished_at", ASCENDING)], expireAfterSeconds=JOB_RETENTION_SECONDS
+    )
+    # Drop leases of workers that have been gone for a while
+    await db[REMINDER_LEASES_COLLECTION].create_index(
+        [("expires_at", ASCENDING)], expireAfterSeconds=3600
+    )
+
+
 def get_tasks_collection():
     """Get tasks collection with error handling"""
     if tasks_collection is None:
         raise RuntimeError(
             "Tasks collection not initialized. Make sure MongoDB connection is established."
         )
+    mongo_breaker.before_call()
     return tasks_collection
+
+
+def get_collection(name: str):
+    """Get an auxiliary collection with error handling"""
+    if db is None:
+        raise RuntimeError(
+            "Database not initialized. Make sure MongoDB connection is established."
+        )
+    mongo_breaker.before_call()
+    return db[name]
@@ -0,0 +1,157 @@
+# app/rate_limit.py
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app import deps, metrics, schemas
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Refill and take tokens atomically on the Redis server
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] + clock[2] / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class MemoryRateLimitStore:
+    """Token buckets for this worker, least recently seen keys are dropped"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        """Take cost tokens, returning 0 or the seconds until they are available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            # A dropped bucket restarts full, which only errs towards allowing
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker and node"""
+
+    def __init__(self, url: str = REDIS_URL):
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        result = await self._script(keys=[f"ratelimit:{key}"], args=[rate, burst, cost])
+        return float(result)
+
+
+def build_store(name: str = RATE_LIMIT_BACKEND):
+    if name == "redis":
+        if redis is not None:
+            return RedisRateLimitStore()
+        print("redis package not installed, falling back to in-memory rate limits")
+    return MemoryRateLimitStore()
+
+
+store = build_store()
+
+
+class RateLimiter:
+    """Token bucket limit for one route group
+
+    Defaults can be overridden with RATE_LIMIT_<NAME>="<rate>/<burst>",
+    where rate is tokens refilled per second.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float):
+        override = os.getenv(f"RATE_LIMIT_{name.upper()}")
+        if override:
+            rate_text, _, burst_text = override.partition("/")
+            rate, burst = float(rate_text), float(burst_text or rate_text)
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.allowed = 0
+        self.limited = 0
+        metrics.register(f"rate_limit_{name}", self.metrics)
+
+    async def hit(self, key: str) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        retry_after = await store.take(f"{self.name}:{key}", self.rate, self.burst)
+        if retry_after > 0:
+            self.limited += 1
+            raise HTTPException(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        self.allowed += 1
+
+    def per_user(self):
+        """Dependency limiting each authenticated user separately"""
+
+        async def dependency(
+            current_user: schemas.User = Depends(deps.get_current_user),
+        ) -> None:
+            await self.hit(f"user:{current_user.id}")
+
+        return dependency
+
+    def per_ip(self):
+        """Dependency limiting each client address separately"""
+
+        async def dependency(request: Request) -> None:
+            host = request.client.host if request.client else "unknown"
+            await self.hit(f"ip:{host}")
+
+        return dependency
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+tasks_limiter = RateLimiter("tasks", rate=10, burst=20)
+login_limiter = RateLimiter("login", rate=0.2, burst=5)
@@ -0,0 +1,62 @@
+# app/recurrence.py
+import itertools
+import os
+import re
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from dateutil.rrule import rrule, rrulestr
+
+from app.reminders import as_utc
+
+MAX_OCCURRENCE_RANGE_DAYS = int(os.getenv("MAX_OCCURRENCE_RANGE_DAYS", 366))
+MAX_OCCURRENCES_PER_SERIES = int(os.getenv("MAX_OCCURRENCES_PER_SERIES", 1000))
+
+# Sub-daily rules would make a range expand into huge lists
+SUB_DAILY_FREQUENCIES = {"SECONDLY", "MINUTELY", "HOURLY"}
+FREQUENCY = re.compile(r"(?:^|[;:\s])FREQ=(\w+)", re.IGNORECASE)
+
+
+def parse_rule(recurrence: str, dtstart: datetime) -> rrule:
+    """Build the rule of an RFC 5545 RRULE string starting at dtstart"""
+    text = recurrence.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[len("RRULE:") :]
+    rule = rrulestr(
+        text, dtstart=as_utc(dtstart).replace(microsecond=0), forceset=False
+    )
+    if not isinstance(rule, rrule):
+        raise ValueError("recurrence must be a single RRULE")
+    return rule
+
+
+def validate_rule(recurrence: str) -> str:
+    """Check an RRULE string, rejecting rules that repeat more than daily"""
+    try:
+        parse_rule(recurrence, datetime.now(UTC))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid recurrence rule: {e}")
+    frequency = FREQUENCY.search(recurrence)
+    if frequency and frequency.group(1).upper() in SUB_DAILY_FREQUENCIES:
+        raise ValueError("recurrence must repeat at most daily")
+    return recurrence.strip()
+
+
+def occurrences(rule: rrule, start: datetime, end: datetime) -> List[datetime]:
+    """Occurrences in [start, end), capped per series
+
+    Only the requested range is expanded; nothing is stored for it.
+    """
+    moments: Iterator[datetime] = rule.xafter(as_utc(start), inc=True)
+    in_range = itertools.takewhile(lambda moment: moment < as_utc(end), moments)
+    return list(itertools.islice(in_range, MAX_OCCURRENCES_PER_SERIES))
+
+
+def is_occurrence(rule: rrule, moment: datetime) -> bool:
+    moment = as_utc(moment)
+    return rule.after(moment - timedelta(seconds=1)) == moment
+
+
+def series_rule(doc: Dict[str, Any]) -> rrule:
+    """Rule of a recurring task, anchored at its due date or creation"""
+    return parse_rule(doc["recurrence"], doc.get("due_at") or doc["created_at"])
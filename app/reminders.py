@@ -0,0 +1,311 @@
+# app/reminders.py
+import asyncio
+import heapq
+import math
+import os
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, List, Optional, Protocol, Set, Tuple
+
+import httpx
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app import metrics
+from app.mongo import REMINDER_LEASES_COLLECTION, get_collection, get_tasks_collection
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+REMINDER_PARTITIONS = int(os.getenv("REMINDER_PARTITIONS", 8))
+REMINDER_WINDOW_SECONDS = float(os.getenv("REMINDER_WINDOW_SECONDS", 60))
+REMINDER_LEASE_SECONDS = float(os.getenv("REMINDER_LEASE_SECONDS", 30))
+# Wait this long before retrying after Mongo failed, e.g. during an outage
+REMINDER_RETRY_SECONDS = float(os.getenv("REMINDER_RETRY_SECONDS", 5))
+REMINDER_SINK = os.getenv("REMINDER_SINK", "log")
+REMINDER_WEBHOOK_URL = os.getenv("REMINDER_WEBHOOK_URL", "")
+
+Reminder = Dict[str, Any]
+
+
+class ReminderSink(Protocol):
+    async def send(self, reminder: Reminder) -> None: ...
+
+
+class LogSink:
+    async def send(self, reminder: Reminder) -> None:
+        print(
+            f"Reminder for user {reminder['user_id']}: "
+            f"{reminder['title']} is due at {reminder['due_at'].isoformat()}"
+        )
+
+
+class WebhookSink:
+    def __init__(self, url: str = REMINDER_WEBHOOK_URL, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, reminder: Reminder) -> None:
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            response = await client.post(
+                self.url,
+                json={**reminder, "due_at": reminder["due_at"].isoformat()},
+            )
+            response.raise_for_status()
+
+
+def build_sink(name: str = REMINDER_SINK) -> ReminderSink:
+    if name == "webhook":
+        return WebhookSink()
+    return LogSink()
+
+
+def as_utc(moment: datetime) -> datetime:
+    # Mongo hands back naive datetimes that are UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=UTC)
+
+
+class ReminderScheduler:
+    """Fire reminders for tasks whose due_at arrives, without polling
+
+    Users are split into partitions by user_id; each worker leases a fair
+    share of them. For its partitions a worker loads only reminders due
+    within the next window into a timer heap, sleeps until the earliest
+    one, and claims each reminder with a conditional update before
+    handing it to the sink, so a reminder fires once across workers.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[ReminderSink] = None,
+        partitions: int = REMINDER_PARTITIONS,
+        window_seconds: float = REMINDER_WINDOW_SECONDS,
+        lease_seconds: float = REMINDER_LEASE_SECONDS,
+    ):
+        self.sink = sink or build_sink()
+        self.partitions = partitions
+        self.window = timedelta(seconds=window_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self.worker_id = uuid.uuid4().hex
+        self.owned: Set[int] = set()
+        self._heap: List[Tuple[datetime, str, Any, int]] = []
+        self._queued: Set[Tuple[Any, datetime]] = set()
+        self._horizon = datetime.min.replace(tzinfo=UTC)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.loaded = 0
+        self.sent = 0
+        self.failed = 0
+
+    def partition(self, user_id: int) -> int:
+        return user_id % self.partitions
+
+    async def start(self) -> None:
+        if not REMINDERS_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            # Hand our partitions over without waiting for the leases to expire
+            await get_collection(REMINDER_LEASES_COLLECTION).update_many(
+                {"owner": self.worker_id},
+                {"$set": {"expires_at": datetime.now(UTC)}},
+            )
+        except Exception as e:
+            print(f"Error releasing reminder leases: {e}")
+
+    def notify(self, user_id: int, task_id: Any, due_at: Optional[datetime]) -> None:
+        """Queue a reminder set by a write on this worker if it is due soon"""
+        if self._task is None or due_at is None:
+            return
+        due_at = as_utc(due_at)
+        if self.partition(user_id) in self.owned and due_at < self._horizon:
+            # Mongo stores milliseconds, the claim in _fire_due matches on them
+            due_at = due_at.replace(microsecond=due_at.microsecond // 1000 * 1000)
+            self._push(task_id, user_id, due_at)
+            self._wakeup.set()
+
+    def _push(self, task_id: Any, user_id: int, due_at: datetime) -> None:
+        if (task_id, due_at) in self._queued:
+            return
+        self._queued.add((task_id, due_at))
+        heapq.heappush(self._heap, (due_at, str(task_id), task_id, user_id))
+
+    async def _run(self) -> None:
+        next_renewal = next_load = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_renewal:
+                    if await self._renew_leases():
+                        next_load = 0.0  # Partitions changed, reload the heap
+                    next_renewal = time.monotonic() + self.lease.total_seconds() / 3
+                if time.monotonic() >= next_load:
+                    await self._load()
+                    next_load = time.monotonic() + self.window.total_seconds() / 2
+                await self._fire_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Reminder scheduler error: {e}")
+                retry_at = time.monotonic() + REMINDER_RETRY_SECONDS
+                next_renewal = max(next_renewal, retry_at)
+                next_load = max(next_load, retry_at)
+
+            timeout = min(next_renewal, next_load) - time.monotonic()
+            if self._heap:
+                until_due = (self._heap[0][0] - datetime.now(UTC)).total_seconds()
+                timeout = min(timeout, until_due)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(0.0, timeout))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _renew_leases(self) -> bool:
+        """Keep a fair share of partitions leased, returning whether it changed"""
+        leases = get_collection(REMINDER_LEASES_COLLECTION)
+        now = datetime.now(UTC)
+        expires_at = now + self.lease
+        # Announce this worker so the others shrink their share
+        await leases.update_one(
+            {"_id": f"worker:{self.worker_id}"},
+            {"$set": {"owner": self.worker_id, "expires_at": expires_at}},
+            upsert=True,
+        )
+        workers = await leases.distinct("owner", {"expires_at": {"$gt": now}})
+        share = math.ceil(self.partitions / max(1, len(workers)))
+
+        owned: Set[int] = set()
+        # Renew what we hold first, then top up to our share
+        held = sorted(self.owned)
+        free = [p for p in range(self.partitions) if p not in self.owned]
+        for partition in held + free:
+            if partition not in self.owned and len(owned) >= share:
+                break
+            try:
+                await leases.find_one_and_update(
+                    {
+                        "_id": partition,
+                        "$or": [
+                            {"owner": self.worker_id},
+                            {"expires_at": {"$lte": now}},
+                        ],
+                    },
+                    {"$set": {"owner": self.worker_id, "expires_at": expires_at}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                continue  # Leased by another worker
+            owned.add(partition)
+
+        # Give back what is over our share so newly started workers get some
+        for partition in sorted(owned)[share:]:
+            await leases.update_one(
+                {"_id": partition, "owner": self.worker_id},
+                {"$set": {"expires_at": now}},
+            )
+            owned.discard(partition)
+
+        changed = owned != self.owned
+        self.owned = owned
+        return changed
+
+    async def _load(self) -> None:
+        """Fill the heap with pending reminders due before the next window"""
+        self._heap, self._queued = [], set()
+        self._horizon = datetime.now(UTC) + self.window
+        if not self.owned:
+            return
+        tasks_collection = get_tasks_collection()
+        cursor = tasks_collection.find(
+            {
+                # Matches the partial (due_at) index of pending reminders
+                "reminder_pending": True,
+                "due_at": {"$lt": self._horizon},
+                "$or": [
+                    {"user_id": {"$mod": [self.partitions, partition]}}
+                    for partition in sorted(self.owned)
+                ],
+            },
+            projection={
+                "user_id": True,
+                "due_at": True,
+                "deleted_at": True,
+                "completed_at": True,
+            },
+        )
+        stale = []
+        async for doc in cursor:
+            if doc.get("deleted_at") or doc.get("completed_at"):
+                stale.append(doc["_id"])
+                continue
+            self._push(doc["_id"], doc["user_id"], as_utc(doc["due_at"]))
+            self.loaded += 1
+        if stale:
+            # Finished tasks never fire, take them out of the index
+            await tasks_collection.update_many(
+                {"_id": {"$in": stale}}, {"$unset": {"reminder_pending": ""}}
+            )
+
+    async def _fire_due(self) -> None:
+        tasks_collection = get_tasks_collection()
+        while self._heap and self._heap[0][0] <= datetime.now(UTC):
+            due_at, _, task_id, user_id = heapq.heappop(self._heap)
+            self._queued.discard((task_id, due_at))
+            doc = await tasks_collection.find_one_and_update(
+                {
+                    "_id": task_id,
+                    "due_at": due_at,
+                    "reminder_pending": True,
+                    "deleted_at": None,
+                    "completed_at": None,
+                },
+                {"$unset": {"reminder_pending": ""}},
+                projection={"user_id": True, "title": True, "due_at": True},
+            )
+            if not doc:
+                continue  # Rescheduled, finished or fired by another worker
+            try:
+                await self.sink.send(
+                    {
+                        "task_id": str(task_id),
+                        "user_id": doc["user_id"],
+                        "title": doc["title"],
+                        "due_at": as_utc(doc["due_at"]),
+                    }
+                )
+                self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Error sending reminder for task {task_id}: {e}")
+                # Pending again, the next load retries it
+                await tasks_collection.update_one(
+                    {"_id": task_id, "due_at": doc["due_at"]},
+                    {"$set": {"reminder_pending": True}},
+                )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "partitions_owned": len(self.owned),
+            "queued": len(self._heap),
+            "loaded": self.loaded,
+            "sent": self.sent,
+            "failed": self.failed,
+        }
+
+
+scheduler = ReminderScheduler()
+metrics.register("reminders", scheduler.metrics)
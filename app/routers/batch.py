@@ -0,0 +1,84 @@
+# app/routers/batch.py
+import asyncio
+
+import httpx
+from fastapi import APIRouter, Depends, Request
+
+import app.deps as deps
+import app.schemas as schemas
+from app.schemas_batch import (
+    BatchRequest,
+    BatchRequestItem,
+    BatchResponse,
+    BatchResponseItem,
+)
+
+router = APIRouter(tags=["batch"])
+
+# Added by the transport or recomputed by clients, not worth echoing
+SKIPPED_HEADERS = {"authorization", "content-length", "content-encoding"}
+
+
+async def dispatch(
+    client: httpx.AsyncClient, item: BatchRequestItem, authorization: str
+) -> BatchResponseItem:
+    headers = {
+        name: value
+        for name, value in item.headers.items()
+        if name.lower() not in SKIPPED_HEADERS
+    }
+    response = await client.request(
+        item.method,
+        item.path,
+        json=item.body,
+        headers={**headers, "authorization": authorization},
+    )
+    body = None
+    if response.content:
+        if response.headers.get("content-type", "").startswith("application/json"):
+            body = response.json()
+        else:
+            body = response.text
+    return BatchResponseItem(
+        status=response.status_code,
+        headers={
+            name: value
+            for name, value in response.headers.items()
+            if name not in SKIPPED_HEADERS | {"content-type"}
+        },
+        body=body,
+    )
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Run several tasks API requests concurrently, authenticating once
+
+    Sub-requests go through the app in-process, rate limits and deadlines
+    included, but share the principal resolved here instead of decoding
+    the token and looking the user up again. Each one gets its own
+    status, so one failing does not fail the others.
+    """
+    transport = httpx.ASGITransport(app=request.app, raise_app_exceptions=False)
+    principal = deps.batch_principal.set(current_user)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport,
+            base_url="http://batch",
+            # Sub-responses are embedded in ours, compress that one instead
+            headers={"accept-encoding": "identity"},
+            follow_redirects=False,
+        ) as client:
+            responses = await asyncio.gather(
+                *(
+                    dispatch(client, item, request.headers["authorization"])
+                    for item in batch.requests
+                )
+            )
+    finally:
+        deps.batch_principal.reset(principal)
+    return BatchResponse(responses=responses)
@@ -1,68 +1,505 @@
 # app/routers/tasks.py
-from datetime import UTC, datetime
-from typing import Any, Dict
+import heapq
+import itertools
+from datetime import UTC, date, datetime, timedelta
+from typing import Annotated, Any, Dict, Literal, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
+import app.bulk_delete as bulk_delete
 import app.deps as deps
+import app.idempotency as idempotency
+import app.recurrence as recurrence
 import app.schemas as schemas
+import app.task_analytics as task_analytics
+import app.task_archive as task_archive
+import app.task_ranking as task_ranking
+import app.task_stats as task_stats
+import app.task_tiering as task_tiering
+from app.cache import list_cache, task_cache
+from app.deadlines import request_deadline
+from app.invalidation import bus
+from app.jobs import runner
 from app.mongo import get_tasks_collection
-from app.schemas_task import TaskCreate, TaskInDB, TaskList, TaskUpdate
+from app.rate_limit import tasks_limiter
+from app.reminders import as_utc, scheduler
+from app.schemas_task import (
+    Granularity,
+    TaskAnalytics,
+    TaskBulkDelete,
+    TaskCreate,
+    TaskInDB,
+    TaskJob,
+    TaskList,
+    TaskLookup,
+    TaskLookupResult,
+    TaskMove,
+    TaskOccurrence,
+    TaskOccurrenceList,
+    TaskStats,
+    TaskTagCounts,
+    TaskTrash,
+    TaskUpdate,
+)
+from app.write_batcher import insert_batcher
 
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(
+    prefix="/tasks",
+    tags=["tasks"],
+    dependencies=[Depends(request_deadline), Depends(tasks_limiter.per_user())],
+)
 get_task_id = Depends(deps.get_object_id_or_404("task_id", "Task ID"))
+minimal_responses: Dict[int | str, Dict[str, Any]] = {
+    204: {"description": "Updated, sent with Prefer: return=minimal"}
+}
 
 
 def convert_doc_to_task(doc: Dict[str, Any]) -> TaskInDB:
     """Convert MongoDB document to TaskInDB model"""
     doc_copy = doc.copy()
     doc_copy["_id"] = str(doc_copy["_id"])
+    if doc_copy.get("series_id") is not None:
+        doc_copy["series_id"] = str(doc_copy["series_id"])
     return TaskInDB(**doc_copy)
 
 
+async def task_written(
+    user_id: int, task_id: Any = None, doc: Optional[Dict[str, Any]] = None
+) -> None:
+    """Refresh this worker's caches after a write and notify the others"""
+    if task_id is not None:
+        if doc is not None:
+            await task_cache.put(user_id, task_id, doc)
+        else:
+            await task_cache.invalidate(user_id, task_id)
+    await list_cache.bump(user_id)
+    await bus.publish(
+        "task", user_id=user_id, task_id=str(task_id) if task_id else None
+    )
+
+
+async def apply_task_update(
+    task_id: ObjectId, user_id: int, update: Dict[str, Any], return_minimal: bool
+):
+    """Apply a $set update to a live task and build the response"""
+    tasks_collection = get_tasks_collection()
+    query = {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None}
+    tracked = {"completed_at", "tags"}.intersection(update)
+    if return_minimal and not tracked:
+        # Skip fetching and serializing the document nobody will read
+        result = await tasks_collection.update_one(query, {"$set": update})
+        if result.matched_count == 0:
+            if await task_tiering.thaw(user_id, ObjectId(task_id)):
+                return await apply_task_update(task_id, user_id, update, return_minimal)
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
+        await task_written(user_id, task_id)
+        return minimal_response()
+    # Take the previous state so the stats counters follow real transitions,
+    # projected down to what they need when the body is not wanted
+    before = await tasks_collection.find_one_and_update(
+        query,
+        {"$set": update},
+        projection=dict.fromkeys(tracked, True) if return_minimal else None,
+    )
+    if not before:
+        if await task_tiering.thaw(user_id, ObjectId(task_id)):
+            # Old completed task, write it back in the tasks collection first
+            return await apply_task_update(task_id, user_id, update, return_minimal)
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
+    await task_stats.record_update(user_id, before, update)
+    if "completed_at" in update:
+        await task_analytics.record_change(
+            user_id, [before.get("completed_at"), update["completed_at"]]
+        )
+    if return_minimal:
+        await task_written(user_id, task_id)
+        return minimal_response()
+    updated = {**before, **update}
+    await task_written(user_id, task_id, updated)
+    return convert_doc_to_task(updated)
+
+
+def task_update_fields(task: TaskUpdate) -> Dict[str, Any]:
+    """The $set fields of a TaskUpdate"""
+    update = {
+        k: v for k, v in task.model_dump(exclude_unset=True).items() if v is not None
+    }
+    update["updated_at"] = datetime.now(UTC)
+    if "completed" in update:
+        update["completed_at"] = datetime.now(UTC) if update.pop("completed") else None
+    if "due_at" in update:
+        update["reminder_pending"] = True
+    return update
+
+
+def convert_doc_to_job(doc: Dict[str, Any]) -> TaskJob:
+    return TaskJob(
+        id=str(doc["_id"]),
+        kind=doc["kind"],
+        status=doc["status"],
+        progress=doc.get("progress", {}),
+        result=doc.get("result"),
+        error=doc.get("error"),
+    )
+
+
+def minimal_response() -> Response:
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"Preference-Applied": "return=minimal"},
+    )
+
+
 @router.post("/", response_model=TaskInDB, status_code=status.HTTP_201_CREATED)
 async def create_task(
-    task: TaskCreate, current_user: schemas.User = Depends(deps.get_current_user)
+    task: TaskCreate,
+    current_user: schemas.User = Depends(deps.get_current_user),
+    idempotency_key: Annotated[Optional[str], Header()] = None,
 ):
     """Create a new task for the authenticated user"""
+    if idempotency_key is not None:
+        replay = await idempotency.begin(
+            current_user.id,
+            idempotency_key,
+            idempotency.request_fingerprint("create_task", task.model_dump_json()),
+        )
+        if replay is not None:
+            return replay
     now = datetime.now(UTC)
     doc = {
         "user_id": current_user.id,
         "title": task.title,
         "description": task.description,
+        "tags": task.tags,
+        "due_at": task.due_at,
+        "recurrence": task.recurrence,
+        "rank": await task_ranking.top_rank(current_user.id),
         "created_at": now,
         "updated_at": now,
         "deleted_at": None,
         "completed_at": None,
     }
+    if task.due_at is not None:
+        # Puts the task in the partial index the reminder scheduler reads
+        doc["reminder_pending"] = True
     tasks_collection = get_tasks_collection()
-    result = await tasks_collection.insert_one(doc)
-    doc["_id"] = result.inserted_id
-    return convert_doc_to_task(doc)
+    try:
+        if insert_batcher.enabled:
+            doc["_id"] = await insert_batcher.insert(doc)
+        else:
+            doc["_id"] = (await tasks_collection.insert_one(doc)).inserted_id
+    except BaseException:
+        # Cancellation too, e.g. at the request deadline or a disconnect
+        if idempotency_key is not None:
+            idempotency.release_later(current_user.id, idempotency_key)
+        raise
+    await task_written(current_user.id)
+    scheduler.notify(current_user.id, doc["_id"], task.due_at)
+    await task_stats.record_created(current_user.id, task.tags)
+    await task_analytics.record_change(current_user.id, [now])
+    created = convert_doc_to_task(doc)
+    if idempotency_key is not None:
+        await idempotency.complete(
+            current_user.id,
+            idempotency_key,
+            doc["_id"],
+            status.HTTP_201_CREATED,
+            created.model_dump(mode="json", by_alias=True),
+        )
+    return created
 
 
 @router.get("/", response_model=TaskList)
 async def list_tasks(
     page: int = 1,
     size: int = 10,
+    tag: Optional[str] = None,
+    order: Literal["created", "manual"] = "created",
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Get all tasks for the authenticated user, optionally with a given tag
+
+    Tasks completed long ago live in monthly buckets and are only listed
+    when the created_from/created_to range reaches back to them.
+    """
+    user_id = current_user.id
+    query: Dict[str, Any] = {"user_id": user_id, "deleted_at": None}
+    params: Dict[str, Any] = {"page": page, "size": size}
+    if tag is not None:
+        # Served by the (user_id, tags, created_at) multikey index
+        tag = query["tags"] = params["tag"] = tag.strip().lower()
+    if order == "manual":
+        params["order"] = order
+    created: Dict[str, datetime] = {}
+    if created_from is not None:
+        created["$gte"] = created_from
+        params["created_from"] = created_from.isoformat()
+    if created_to is not None:
+        created["$lt"] = created_to
+        params["created_to"] = created_to.isoformat()
+    if created:
+        query["created_at"] = created
+    include_cold = task_tiering.reaches_cold(created_from, created_to)
+
+    async def build_page() -> TaskList:
+        skip = (page - 1) * size
+        tasks_collection = get_tasks_collection()
+        cursor = tasks_collection.find(query)
+        if order == "manual":
+            # Served by the (user_id, deleted_at, rank) index
+            cursor = cursor.sort(task_ranking.MANUAL_ORDER)
+        else:
+            cursor = cursor.sort("created_at", -1)
+        if include_cold:
+            # Merge the first skip + size tasks of both tiers
+            hot = [doc async for doc in cursor.limit(skip + size)]
+            cold, cold_total = await task_tiering.list_cold(
+                user_id, created_from, created_to, tag, order, skip + size
+            )
+            merged = heapq.merge(hot, cold, key=task_tiering.sort_key(order))
+            docs = itertools.islice(merged, skip, skip + size)
+            tasks = [convert_doc_to_task(doc) for doc in docs]
+            total = await tasks_collection.count_documents(query) + cold_total
+            return TaskList(tasks=tasks, total=total, page=page, size=size)
+        cursor = cursor.skip(skip).limit(size)
+        tasks = [convert_doc_to_task(doc) async for doc in cursor]
+        total = await tasks_collection.count_documents(query)
+        return TaskList(tasks=tasks, total=total, page=page, size=size)
+
+    # Pages are cached already serialized, hits skip validation and encoding
+    body = await list_cache.get_or_build(user_id, params, build_page)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/stats", response_model=TaskStats)
+async def get_task_stats(current_user: schemas.User = Depends(deps.get_current_user)):
+    """Get task counters for the authenticated user"""
+    return await task_stats.get_stats(current_user.id)
+
+
+@router.get("/tags", response_model=TaskTagCounts)
+async def get_task_tags(current_user: schemas.User = Depends(deps.get_current_user)):
+    """Get the number of live tasks per tag for the authenticated user"""
+    return await task_stats.get_tag_counts(current_user.id)
+
+
+@router.get("/analytics", response_model=TaskAnalytics)
+async def get_task_analytics(
+    granularity: Granularity = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
     current_user: schemas.User = Depends(deps.get_current_user),
 ):
-    """Get all tasks for the authenticated user"""
+    """Get tasks created and completed per day or week"""
+    return await task_analytics.get_analytics(current_user.id, granularity, start, end)
+
+
+@router.get("/occurrences", response_model=TaskOccurrenceList)
+async def list_occurrences(
+    start: datetime,
+    end: datetime,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Get the occurrences of recurring tasks between start and end
+
+    Occurrences are expanded from each task's rule for the requested range
+    only; the stored ones are those completed, edited or deleted.
+    """
+    start, end = as_utc(start), as_utc(end)
+    max_days = recurrence.MAX_OCCURRENCE_RANGE_DAYS
+    if not start < end <= start + timedelta(days=max_days):
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            f"end must be after start and at most {max_days} days later",
+        )
     user_id = current_user.id
-    skip = (page - 1) * size
     tasks_collection = get_tasks_collection()
-    cursor = (
-        tasks_collection.find({"user_id": user_id, "deleted_at": None})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(size)
+    # Served by the partial (user_id, recurrence) index holding only series
+    cursor = tasks_collection.find(
+        {"user_id": user_id, "recurrence": {"$type": "string"}, "deleted_at": None}
+    )
+    series = [doc async for doc in cursor]
+    stored = {}
+    if series:
+        cursor = tasks_collection.find(
+            {
+                "user_id": user_id,
+                "series_id": {"$in": [doc["_id"] for doc in series]},
+                "occurrence_at": {"$gte": start, "$lt": end},
+            }
+        )
+        async for doc in cursor:
+            stored[(doc["series_id"], as_utc(doc["occurrence_at"]))] = doc
+
+    occurrences = []
+    for doc in series:
+        rule = recurrence.series_rule(doc)
+        for moment in recurrence.occurrences(rule, start, end):
+            occurrence = stored.get((doc["_id"], moment))
+            if occurrence is not None and occurrence.get("deleted_at"):
+                continue  # Deleting an occurrence skips it
+            source = occurrence or doc
+            occurrences.append(
+                TaskOccurrence(
+                    series_id=str(doc["_id"]),
+                    occurrence_at=moment,
+                    id=str(occurrence["_id"]) if occurrence else None,
+                    title=source["title"],
+                    description=source.get("description"),
+                    tags=source.get("tags") or [],
+                    completed_at=occurrence and occurrence.get("completed_at"),
+                )
+            )
+    occurrences.sort(key=lambda occurrence: occurrence.occurrence_at)
+    return TaskOccurrenceList(occurrences=occurrences, start=start, end=end)
+
+
+@router.post(
+    "/bulk-delete",
+    response_model=TaskJob,
+    responses={202: {"description": "Deleting in a background job"}},
+)
+async def bulk_delete_tasks(
+    criteria: TaskBulkDelete,
+    response: Response,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Delete every live task matching a filter, e.g. all completed ones
+
+    Small sets are deleted before responding. Larger ones are deleted in
+    chunks by a background job, answered with 202 and the job to poll.
+    """
+    user_id = current_user.id
+    params = criteria.model_dump(exclude_none=True)
+    limit = bulk_delete.BULK_DELETE_INLINE_LIMIT
+    matching = await get_tasks_collection().count_documents(
+        bulk_delete.match_query(user_id, params), limit=limit + 1
+    )
+    if matching <= limit:
+        matching += await bulk_delete.count_cold(
+            user_id, params, limit=limit + 1 - matching
+        )
+    if matching > limit:
+        job = await runner.submit(bulk_delete.JOB_KIND, user_id, params)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return convert_doc_to_job(job)
+    deleted = await bulk_delete.delete_matching(user_id, params)
+    return TaskJob(
+        kind=bulk_delete.JOB_KIND,
+        status="done",
+        progress={"deleted": deleted},
+        result={"deleted": deleted},
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=TaskJob)
+async def get_task_job(
+    job_id: ObjectId = Depends(deps.get_object_id_or_404("job_id", "Job ID")),
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Get the progress of a background job of the authenticated user"""
+    job = await runner.get(current_user.id, job_id)
+    if not job:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Job not found")
+    return convert_doc_to_job(job)
+
+
+@router.post("/lookup", response_model=TaskLookupResult)
+async def lookup_tasks(
+    lookup: TaskLookup,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Get many tasks of the authenticated user by id in one query
+
+    Ids that GET /tasks/{task_id} would answer with 404 are listed as
+    missing instead of failing the whole lookup.
+    """
+    user_id = current_user.id
+    requested = list(dict.fromkeys(lookup.ids))
+    # Same rule as deps.get_object_id_or_404, invalid ids match nothing
+    task_ids = {
+        task_id: ObjectId(task_id)
+        for task_id in requested
+        if ObjectId.is_valid(task_id)
+    }
+    docs: Dict[ObjectId, Dict[str, Any]] = {}
+    if task_ids:
+        cursor = get_tasks_collection().find(
+            {
+                "_id": {"$in": list(task_ids.values())},
+                "user_id": user_id,
+                "deleted_at": None,
+            }
+        )
+        docs = {doc["_id"]: doc async for doc in cursor}
+    cold = [task_id for task_id in task_ids.values() if task_id not in docs]
+    for doc in await task_tiering.find_cold_many(user_id, cold):
+        docs[doc["_id"]] = doc
+
+    found = [task_id for task_id in requested if task_ids.get(task_id) in docs]
+    return TaskLookupResult(
+        tasks=[convert_doc_to_task(docs[task_ids[task_id]]) for task_id in found],
+        missing=[task_id for task_id in requested if task_id not in found],
+    )
+
+
+TRASH_ORDER = [("deleted_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def trash_cursor(doc: Dict[str, Any]) -> str:
+    return f"{as_utc(doc['deleted_at']).isoformat()}_{doc['_id']}"
+
+
+def after_trash_cursor(cursor: str) -> Dict[str, Any]:
+    """Keyset condition for trash entries that follow cursor in TRASH_ORDER"""
+    try:
+        deleted_text, id_text = cursor.rsplit("_", 1)
+        deleted_at, task_id = datetime.fromisoformat(deleted_text), ObjectId(id_text)
+    except (ValueError, InvalidId):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor")
+    return {
+        "$or": [
+            {"deleted_at": {"$lt": deleted_at}},
+            {"deleted_at": deleted_at, "_id": {"$lt": task_id}},
+        ]
+    }
+
+
+@router.get("/trash", response_model=TaskTrash)
+async def list_trash(
+    size: Annotated[int, Query(ge=1, le=100)] = 10,
+    cursor: Optional[str] = None,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Get deleted tasks of the authenticated user, latest deletions first
+
+    Pages are keyset paginated, pass next_cursor back as cursor. Tasks
+    already moved to the archive follow the ones still in the trash.
+    """
+    user_id = current_user.id
+    # Implies the partial index of deleted tasks, live tasks are never scanned
+    query = {"user_id": user_id, "deleted_at": {"$type": "date"}}
+    if cursor is not None:
+        query.update(after_trash_cursor(cursor))
+    hot = get_tasks_collection().find(query).sort(TRASH_ORDER).limit(size)
+    archived = task_archive.find_archived(query, TRASH_ORDER, size)
+    merged = heapq.merge(
+        [doc async for doc in hot],
+        [doc async for doc in archived],
+        key=lambda doc: (as_utc(doc["deleted_at"]), doc["_id"]),
+        reverse=True,
     )
-    tasks = [convert_doc_to_task(doc) async for doc in cursor]
-    total = await tasks_collection.count_documents(
-        {"user_id": user_id, "deleted_at": None}
+    docs = list(itertools.islice(merged, size))
+    return TaskTrash(
+        tasks=[convert_doc_to_task(doc) for doc in docs],
+        next_cursor=trash_cursor(docs[-1]) if len(docs) == size else None,
     )
-    return TaskList(tasks=tasks, total=total, page=page, size=size)
 
 
 @router.get("/{task_id}", response_model=TaskInDB)
@@ -73,37 +510,36 @@ async def get_task(
     """Get a specific task for the authenticated user"""
     user_id = current_user.id
     tasks_collection = get_tasks_collection()
-    doc = await tasks_collection.find_one(
-        {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None}
-    )
+
+    async def load_task():
+        doc = await tasks_collection.find_one(
+            {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None}
+        )
+        if doc is None:
+            doc = await task_tiering.find_cold(user_id, ObjectId(task_id))
+        return doc
+
+    doc = await task_cache.get_or_load(user_id, task_id, load_task)
     if not doc:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
     return convert_doc_to_task(doc)
 
 
-@router.put("/{task_id}", response_model=TaskInDB)
+@router.put("/{task_id}", response_model=TaskInDB, responses=minimal_responses)
 async def update_task(
     task: TaskUpdate,
     task_id: ObjectId = get_task_id,
     current_user: schemas.User = Depends(deps.get_current_user),
+    prefer: Annotated[Optional[str], Header()] = None,
 ):
     """Update a task for the authenticated user"""
     user_id = current_user.id
-    update = {
-        k: v for k, v in task.model_dump(exclude_unset=True).items() if v is not None
-    }
-    update["updated_at"] = datetime.now(UTC)
-    if "completed" in update:
-        update["completed_at"] = datetime.now(UTC) if update.pop("completed") else None
-    tasks_collection = get_tasks_collection()
-    result = await tasks_collection.find_one_and_update(
-        {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None},
-        {"$set": update},
-        return_document=True,
+    update = task_update_fields(task)
+    result = await apply_task_update(
+        task_id, user_id, update, deps.prefers_return_minimal(prefer)
     )
-    if not result:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
-    return convert_doc_to_task(result)
+    scheduler.notify(user_id, task_id, update.get("due_at"))
+    return result
 
 
 @router.delete("/{task_id}", status_code=204)
@@ -114,48 +550,241 @@ async def delete_task(
     """Delete a task for the authenticated user"""
     user_id = current_user.id
     tasks_collection = get_tasks_collection()
-    result = await tasks_collection.update_one(
+    before = await tasks_collection.find_one_and_update(
         {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None},
         {"$set": {"deleted_at": datetime.now(UTC)}},
+        projection={"created_at": True, "completed_at": True, "tags": True},
     )
-    if result.matched_count == 0:
+    if not before:
+        if await task_tiering.thaw(user_id, ObjectId(task_id)):
+            return await delete_task(task_id, current_user)
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
+    await task_written(user_id, task_id)
+    await task_stats.record_deleted(
+        user_id, before.get("completed_at") is not None, before.get("tags") or []
+    )
+    await task_analytics.record_change(
+        user_id, [before.get("created_at"), before.get("completed_at")]
+    )
     return
 
 
-@router.post("/{task_id}/complete", response_model=TaskInDB)
+@router.post("/{task_id}/restore", response_model=TaskInDB)
+async def restore_task(
+    task_id: ObjectId = get_task_id,
+    current_user: schemas.User = Depends(deps.get_current_user),
+):
+    """Restore a deleted task for the authenticated user"""
+    user_id = current_user.id
+    tasks_collection = get_tasks_collection()
+    query = {
+        "_id": ObjectId(task_id),
+        "user_id": user_id,
+        "deleted_at": {"$type": "date"},
+    }
+    update = {"$set": {"deleted_at": None, "updated_at": datetime.now(UTC)}}
+    doc = await tasks_collection.find_one_and_update(
+        query, update, return_document=ReturnDocument.AFTER
+    )
+    if not doc and await task_archive.restore(user_id, ObjectId(task_id)):
+        # Back from the archive into the trash, restore it from there
+        doc = await tasks_collection.find_one_and_update(
+            query, update, return_document=ReturnDocument.AFTER
+        )
+    if not doc:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Deleted task not found")
+    await task_written(user_id, task_id, doc)
+    await task_stats.record_restored(
+        user_id, doc.get("completed_at") is not None, doc.get("tags") or []
+    )
+    await task_analytics.record_change(
+        user_id, [doc.get("created_at"), doc.get("completed_at")]
+    )
+    return convert_doc_to_task(doc)
+
+
+@router.post(
+    "/{task_id}/complete", response_model=TaskInDB, responses=minimal_responses
+)
 async def mark_complete(
     task_id: ObjectId = get_task_id,
     current_user: schemas.User = Depends(deps.get_current_user),
+    prefer: Annotated[Optional[str], Header()] = None,
 ):
     """Mark a task as completed for the authenticated user"""
     user_id = current_user.id
     now = datetime.now(UTC)
-    tasks_collection = get_tasks_collection()
-    result = await tasks_collection.find_one_and_update(
-        {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None},
-        {"$set": {"completed_at": now, "updated_at": now}},
-        return_document=True,
+    return await apply_task_update(
+        task_id,
+        user_id,
+        {"completed_at": now, "updated_at": now},
+        deps.prefers_return_minimal(prefer),
     )
-    if not result:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
-    return convert_doc_to_task(result)
 
 
-@router.post("/{task_id}/uncomplete", response_model=TaskInDB)
+@router.post(
+    "/{task_id}/uncomplete", response_model=TaskInDB, responses=minimal_responses
+)
 async def mark_uncomplete(
     task_id: ObjectId = get_task_id,
     current_user: schemas.User = Depends(deps.get_current_user),
+    prefer: Annotated[Optional[str], Header()] = None,
 ):
     """Mark a task as uncompleted for the authenticated user"""
     user_id = current_user.id
     now = datetime.now(UTC)
+    return await apply_task_update(
+        task_id,
+        user_id,
+        {"completed_at": None, "updated_at": now},
+        deps.prefers_return_minimal(prefer),
+    )
+
+
+async def get_neighbour_rank(user_id: int, neighbour_id: str) -> str:
+    if not ObjectId.is_valid(neighbour_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Neighbour task not found")
+    query = {"_id": ObjectId(neighbour_id), "user_id": user_id, "deleted_at": None}
     tasks_collection = get_tasks_collection()
-    result = await tasks_collection.find_one_and_update(
-        {"_id": ObjectId(task_id), "user_id": user_id, "deleted_at": None},
-        {"$set": {"completed_at": None, "updated_at": now}},
-        return_document=True,
+    neighbour = await tasks_collection.find_one(query, projection={"rank": True})
+    if not neighbour:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Neighbour task not found")
+    if neighbour.get("rank") is None:
+        # Rank the user's older tasks once, later moves touch a single task
+        await task_ranking.rebalance_user(user_id)
+        neighbour = await tasks_collection.find_one(query, projection={"rank": True})
+        if not neighbour or neighbour.get("rank") is None:
+            raise HTTPException(status.HTTP_409_CONFLICT, "Task order changed, retry")
+    return neighbour["rank"]
+
+
+@router.post("/{task_id}/move", response_model=TaskInDB, responses=minimal_responses)
+async def move_task(
+    move: TaskMove,
+    task_id: ObjectId = get_task_id,
+    current_user: schemas.User = Depends(deps.get_current_user),
+    prefer: Annotated[Optional[str], Header()] = None,
+):
+    """Move a task between two others in the user's manual order"""
+    user_id = current_user.id
+    neighbours = {move.previous_id, move.next_id} - {None}
+    if not neighbours or str(task_id) in neighbours:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "previous_id or next_id of another task is required",
+        )
+    # None at either end of the user's order
+    previous_rank: Optional[str]
+    next_rank: Optional[str]
+    if move.next_id is None:
+        assert move.previous_id is not None  # One of them was required above
+        # The other neighbour is whichever task follows or precedes it now
+        previous_rank = await get_neighbour_rank(user_id, move.previous_id)
+        next_rank = await task_ranking.neighbour_rank(
+            user_id, previous_rank, following=True, exclude=task_id
+        )
+    elif move.previous_id is None:
+        next_rank = await get_neighbour_rank(user_id, move.next_id)
+        previous_rank = await task_ranking.neighbour_rank(
+            user_id, next_rank, following=False, exclude=task_id
+        )
+    else:
+        previous_rank = await get_neighbour_rank(user_id, move.previous_id)
+        next_rank = await get_neighbour_rank(user_id, move.next_id)
+        if previous_rank == next_rank:
+            # Tasks created at the same moment can share a key, spread them out
+            await task_ranking.rebalance_user(user_id)
+            previous_rank = await get_neighbour_rank(user_id, move.previous_id)
+            next_rank = await get_neighbour_rank(user_id, move.next_id)
+        if previous_rank >= next_rank:
+            raise HTTPException(
+                status.HTTP_409_CONFLICT, "previous_id must come before next_id"
+            )
+    rank = task_ranking.rank_between(previous_rank, next_rank)
+    return await apply_task_update(
+        task_id, user_id, {"rank": rank}, deps.prefers_return_minimal(prefer)
     )
-    if not result:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Task not found")
-    return convert_doc_to_task(result)
+
+
+async def materialize_occurrence(series: Dict[str, Any], occurrence_at: datetime):
+    """Store an occurrence of a recurring task as a task of its own, once"""
+    user_id = series["user_id"]
+    query = {
+        "user_id": user_id,
+        "series_id": series["_id"],
+        "occurrence_at": occurrence_at,
+    }
+    tasks_collection = get_tasks_collection()
+    now = datetime.now(UTC)
+    try:
+        result = await tasks_collection.update_one(
+            query,
+            {
+                "$setOnInsert": {
+                    "title": series["title"],
+                    "description": series.get("description"),
+                    "tags": series.get("tags") or [],
+                    "due_at": None,
+                    "rank": await task_ranking.top_rank(user_id),
+                    "created_at": now,
+                    "updated_at": now,
+                    "deleted_at": None,
+                    "completed_at": None,
+                }
+            },
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        result = None  # Materialized concurrently by another request
+    if result is None or result.upserted_id is None:
+        doc = await tasks_collection.find_one(query, projection={"_id": True})
+        return doc["_id"]
+    await task_written(user_id)
+    await task_stats.record_created(user_id, series.get("tags") or [])
+    await task_analytics.record_change(user_id, [now])
+    return result.upserted_id
+
+
+@router.put(
+    "/{task_id}/occurrences/{occurrence_at}",
+    response_model=TaskInDB,
+    responses=minimal_responses,
+)
+async def update_occurrence(
+    task: TaskUpdate,
+    occurrence_at: datetime,
+    task_id: ObjectId = get_task_id,
+    current_user: schemas.User = Depends(deps.get_current_user),
+    prefer: Annotated[Optional[str], Header()] = None,
+):
+    """Complete or edit one occurrence of a recurring task
+
+    The occurrence becomes a task of its own with its id in the response;
+    later changes can use the regular task endpoints.
+    """
+    user_id = current_user.id
+    if task.recurrence is not None:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "An occurrence cannot have a recurrence of its own",
+        )
+    series = await get_tasks_collection().find_one(
+        {
+            "_id": ObjectId(task_id),
+            "user_id": user_id,
+            "deleted_at": None,
+            "recurrence": {"$type": "string"},
+        }
+    )
+    if not series:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Recurring task not found")
+    occurrence_at = as_utc(occurrence_at)
+    if not recurrence.is_occurrence(recurrence.series_rule(series), occurrence_at):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Occurrence not found")
+    occurrence_id = await materialize_occurrence(series, occurrence_at)
+    update = task_update_fields(task)
+    result = await apply_task_update(
+        occurrence_id, user_id, update, deps.prefers_return_minimal(prefer)
+    )
+    scheduler.notify(user_id, occurrence_id, update.get("due_at"))
+    return result
@@ -1,9 +1,11 @@
 # app/routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app import crud, deps, schemas
+from app import account_purge, crud, deps, models, schemas
+from app.rate_limit import login_limiter
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -18,7 +20,11 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(deps.get_db)):
     return crud.create_user(db=db, user=user)
 
 
-@router.post("/token", response_model=schemas.Token)
+@router.post(
+    "/token",
+    response_model=schemas.Token,
+    dependencies=[Depends(login_limiter.per_ip())],
+)
 def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(deps.get_db)
 ):
@@ -29,5 +35,21 @@ def login_for_access_token(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = crud.create_access_token(data={"sub": user.email})
+    access_token = crud.create_access_token(data={"sub": user.email, "uid": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_account(
+    current_user: models.User = Depends(deps.get_current_user),
+    db: Session = Depends(deps.get_db),
+):
+    user_id = int(current_user.id)
+    # Its tokens stop working with the row, the tasks go in the background
+    await run_in_threadpool(crud.delete_user, db, current_user)
+    try:
+        await account_purge.schedule(user_id)
+    except Exception as e:
+        # make purge-orphans queue it later
+        print(f"Error scheduling purge for deleted user {user_id}: {e}")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
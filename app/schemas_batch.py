@@ -0,0 +1,50 @@
+# app/schemas_batch.py
+from typing import Any, Dict, List, Literal, Optional
+from urllib.parse import unquote
+
+from pydantic import BaseModel, Field, field_validator
+
+MAX_BATCH_REQUESTS = 20
+BATCH_PATH_PREFIX = "/tasks"
+
+
+class BatchRequestItem(BaseModel):
+    """One request against the tasks API, e.g. GET /tasks/stats"""
+
+    method: Literal["GET", "POST", "PUT", "DELETE"]
+    path: str  # With its query string, e.g. /tasks?tag=work
+    body: Optional[Any] = None  # Sent as JSON
+    headers: Dict[str, str] = Field(default_factory=dict)
+
+    @field_validator("path")
+    @classmethod
+    def path_valid(cls, v: str) -> str:
+        # Only the tasks API, so batches cannot nest or reach other routes.
+        # Clients normalize dot segments, so /tasks/../users/me would leave
+        # it: check the decoded segments before the prefix.
+        path = v.split("?", 1)[0].split("#", 1)[0]
+        segments = unquote(path).replace("\\", "/").split("/")
+        if any(segment in (".", "..") for segment in segments) or "" in segments[1:-1]:
+            raise ValueError("path must not contain empty, . or .. segments")
+        if path == BATCH_PATH_PREFIX:
+            # The list is served at /tasks/, redirects are not followed
+            return f"{BATCH_PATH_PREFIX}/{v[len(path):]}"
+        if not path.startswith(f"{BATCH_PATH_PREFIX}/"):
+            raise ValueError(f"path must start with {BATCH_PATH_PREFIX}")
+        return v
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_REQUESTS
+    )
+
+
+class BatchResponseItem(BaseModel):
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None  # Parsed JSON, or text for other content
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]  # In the order requested
@@ -1,13 +1,39 @@
 # app/schemas_task.py
-from datetime import datetime
-from typing import List, Optional
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.recurrence import validate_rule
+
+MAX_TAGS = 20
+MAX_LOOKUP_IDS = 100
+
+Granularity = Literal["day", "week"]
+TAG_PATTERN = re.compile(r"^[a-z0-9_-]{1,32}$")
+
+
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Lowercase, validate and de-duplicate tags, keeping their order"""
+    normalized = list(dict.fromkeys(tag.strip().lower() for tag in tags))
+    if len(normalized) > MAX_TAGS:
+        raise ValueError(f"at most {MAX_TAGS} tags are allowed")
+    for tag in normalized:
+        # Tags become field names of the per-user tag counters
+        if not TAG_PATTERN.match(tag):
+            raise ValueError(
+                "tags must be 1-32 letters, digits, underscores or hyphens"
+            )
+    return normalized
 
 
 class TaskBase(BaseModel):
     title: str
     description: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    due_at: Optional[datetime] = None
+    recurrence: Optional[str] = None  # RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO"
 
 
 class TaskCreate(TaskBase):
@@ -20,11 +46,24 @@ class TaskCreate(TaskBase):
             raise ValueError("title must not be empty")
         return v
 
+    @field_validator("tags")
+    @classmethod
+    def tags_valid(cls, v: List[str]) -> List[str]:
+        return normalize_tags(v)
+
+    @field_validator("recurrence")
+    @classmethod
+    def recurrence_valid(cls, v: Optional[str]) -> Optional[str]:
+        return validate_rule(v) if v is not None else v
+
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     completed: Optional[bool] = None
+    tags: Optional[List[str]] = None
+    due_at: Optional[datetime] = None
+    recurrence: Optional[str] = None
 
     @field_validator("title")
     @classmethod
@@ -34,6 +73,16 @@ class TaskUpdate(BaseModel):
             raise ValueError("title must not be empty")
         return v
 
+    @field_validator("tags")
+    @classmethod
+    def tags_valid(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return normalize_tags(v) if v is not None else v
+
+    @field_validator("recurrence")
+    @classmethod
+    def recurrence_valid(cls, v: Optional[str]) -> Optional[str]:
+        return validate_rule(v) if v is not None else v
+
 
 class TaskInDB(TaskBase):
     id: str = Field(..., alias="_id")
@@ -41,13 +90,114 @@ class TaskInDB(TaskBase):
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
+    rank: Optional[str] = None  # Manual order key, see task_ranking
+    series_id: Optional[str] = None  # Recurring task this occurrence came from
+    occurrence_at: Optional[datetime] = None
     deleted_at: Optional[datetime] = None  # Add deleted_at field
 
     model_config = {"populate_by_name": True}
 
 
+class TaskMove(BaseModel):
+    """Place a task between two others in manual order, either may be omitted"""
+
+    previous_id: Optional[str] = None
+    next_id: Optional[str] = None
+
+
+class TaskOccurrence(BaseModel):
+    """One occurrence of a recurring task, stored only once materialized"""
+
+    series_id: str
+    occurrence_at: datetime
+    id: Optional[str] = None  # Set once completed or edited
+    title: str
+    description: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    completed_at: Optional[datetime] = None
+
+
+class TaskOccurrenceList(BaseModel):
+    occurrences: List[TaskOccurrence]
+    start: datetime
+    end: datetime
+
+
+class TaskBulkDelete(BaseModel):
+    """Live tasks to delete, matching every condition given"""
+
+    completed: Optional[bool] = None
+    completed_before: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    tag: Optional[str] = None
+
+    @field_validator("tag")
+    @classmethod
+    def tag_valid(cls, v: Optional[str]) -> Optional[str]:
+        return normalize_tags([v])[0] if v is not None else v
+
+    @model_validator(mode="after")
+    def has_condition(self) -> "TaskBulkDelete":
+        # An empty filter would delete everything by accident
+        if all(getattr(self, name) is None for name in type(self).model_fields):
+            raise ValueError("at least one condition is required")
+        return self
+
+
+class TaskJob(BaseModel):
+    id: Optional[str] = None  # Set for background jobs, poll GET /tasks/jobs/{id}
+    kind: str
+    status: Literal["queued", "running", "done", "failed"]
+    progress: Dict[str, Any] = Field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class TaskLookup(BaseModel):
+    """Ids of tasks to get at once, instead of one GET /tasks/{id} each"""
+
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_LOOKUP_IDS)
+
+
+class TaskLookupResult(BaseModel):
+    tasks: List[TaskInDB]  # In the order requested
+    missing: List[str]  # Invalid, deleted or not the user's, as a 404 would be
+
+
 class TaskList(BaseModel):
     tasks: List[TaskInDB]
     total: int
     page: int
     size: int
+
+
+class TaskTrash(BaseModel):
+    tasks: List[TaskInDB]
+    next_cursor: Optional[str] = None  # Pass as cursor for the next page
+
+
+class TaskStats(BaseModel):
+    total: int = 0
+    open: int = 0
+    completed: int = 0
+    deleted: int = 0
+
+
+class AnalyticsBucket(BaseModel):
+    start: date
+    created: int = 0
+    completed: int = 0
+
+
+class TaskAnalytics(BaseModel):
+    granularity: Granularity
+    buckets: List[AnalyticsBucket]
+
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+
+class TaskTagCounts(BaseModel):
+    tags: List[TagCount]
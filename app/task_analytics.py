@@ -0,0 +1,147 @@
+# app/task_analytics.py
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from app.mongo import TASK_ANALYTICS_COLLECTION, get_collection, get_tasks_collection
+from app.schemas_task import AnalyticsBucket, Granularity, TaskAnalytics
+from app.task_tiering import union_cold_tasks
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def day_key(moment: datetime) -> str:
+    return moment.strftime(DAY_FORMAT)
+
+
+def _day_range(key: str) -> Dict[str, datetime]:
+    start = datetime.combine(datetime.strptime(key, DAY_FORMAT), time.min)
+    return {"$gte": start, "$lt": start + timedelta(days=1)}
+
+
+def _day_counts(field: str, days: Optional[List[str]]) -> List[Dict[str, Any]]:
+    match: Dict[str, Any] = {field: {"$ne": None}}
+    if days is not None:
+        match = {"$or": [{field: _day_range(day)} for day in days]}
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"$dateToString": {"format": DAY_FORMAT, "date": f"${field}"}},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+
+def build_pipeline(user_id: int, days: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Count created and completed tasks per UTC day, optionally for some days"""
+    match: Dict[str, Any] = {"user_id": user_id, "deleted_at": None}
+    if days is not None:
+        match["$or"] = [
+            {field: _day_range(day)}
+            for day in days
+            for field in ("created_at", "completed_at")
+        ]
+    # Cold tasks in monthly buckets still count for their days
+    cold = union_cold_tasks(user_id)
+    cold["$unionWith"]["pipeline"].append({"$match": match})
+    return [
+        {"$match": match},
+        cold,
+        {
+            "$facet": {
+                "created": _day_counts("created_at", days),
+                "completed": _day_counts("completed_at", days),
+            }
+        },
+    ]
+
+
+async def record_change(user_id: int, moments: Iterable[Optional[datetime]]) -> None:
+    """Mark the days a write touched so the next view recomputes them"""
+    dirty = {f"dirty.{day_key(moment)}": 1 for moment in moments if moment}
+    if not dirty:
+        return
+    try:
+        await get_collection(TASK_ANALYTICS_COLLECTION).update_one(
+            {"_id": user_id}, {"$inc": dirty}, upsert=True
+        )
+    except Exception as e:
+        print(f"Error marking task analytics for user {user_id}: {e}")
+
+
+async def _refresh(user_id: int, doc: Optional[Dict[str, Any]]) -> Dict[str, Dict]:
+    """Recompute dirty days, or everything on first use, and cache them"""
+    doc = doc or {}
+    dirty: Dict[str, int] = doc.get("dirty", {})
+    cached: Dict[str, Dict] = dict(doc.get("days", {}))
+    initialized = doc.get("initialized", False)
+    if initialized and not dirty:
+        return cached
+
+    days = list(dirty) if initialized else None
+    cursor = await get_tasks_collection().aggregate(build_pipeline(user_id, days))
+    facets = await cursor.next()
+
+    fresh: Dict[str, Dict] = {day: {"created": 0, "completed": 0} for day in dirty}
+    for counter in ("created", "completed"):
+        for row in facets[counter]:
+            fresh.setdefault(row["_id"], {"created": 0, "completed": 0})
+            fresh[row["_id"]][counter] = row["count"]
+    if not initialized:
+        cached = {}
+    cached.update(fresh)
+
+    update: Dict[str, Any] = {f"days.{day}": counts for day, counts in fresh.items()}
+    if not initialized:
+        update = {"days": cached, "initialized": True}
+    operations = [UpdateOne({"_id": user_id}, {"$set": update}, upsert=True)]
+    # Only clear a dirty day if no write touched it while we were counting
+    operations += [
+        UpdateOne(
+            {"_id": user_id, f"dirty.{day}": count},
+            {"$unset": {f"dirty.{day}": ""}},
+        )
+        for day, count in dirty.items()
+    ]
+    await get_collection(TASK_ANALYTICS_COLLECTION).bulk_write(operations)
+    return cached
+
+
+def _bucket_start(day: date, granularity: Granularity) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+async def get_analytics(
+    user_id: int,
+    granularity: Granularity = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> TaskAnalytics:
+    """Created/completed counts per day or ISO week from the cached buckets"""
+    analytics_collection = get_collection(TASK_ANALYTICS_COLLECTION)
+    doc = await analytics_collection.find_one({"_id": user_id})
+    days = await _refresh(user_id, doc)
+
+    buckets: Dict[date, AnalyticsBucket] = {}
+    for key, counts in days.items():
+        day = datetime.strptime(key, DAY_FORMAT).date()
+        if (start and day < start) or (end and day > end):
+            continue
+        bucket_start = _bucket_start(day, granularity)
+        bucket = buckets.setdefault(bucket_start, AnalyticsBucket(start=bucket_start))
+        bucket.created += counts.get("created", 0)
+        bucket.completed += counts.get("completed", 0)
+
+    return TaskAnalytics(
+        granularity=granularity,
+        buckets=[
+            bucket
+            for _, bucket in sorted(buckets.items())
+            if bucket.created or bucket.completed
+        ],
+    )
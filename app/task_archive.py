@@ -0,0 +1,125 @@
+# app/task_archive.py
+import asyncio
+import os
+import sys
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import app.task_stats as task_stats
+from app.mongo import TASKS_ARCHIVE_COLLECTION, get_collection, get_tasks_collection
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 30))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", 0.5))
+
+DUPLICATE_KEY = 11000
+
+
+async def _insert_archived(docs) -> None:
+    """Copy docs to the archive, ignoring ones copied by an interrupted run"""
+    try:
+        await get_collection(TASKS_ARCHIVE_COLLECTION).insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+            raise
+
+
+async def archive_batch(cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move one batch of tasks deleted before cutoff to the archive
+
+    Tasks are copied before they are removed, so a crash in between only
+    leaves copies the next run skips. Returns the number of tasks moved.
+    """
+    tasks_collection = get_tasks_collection()
+    query = {"deleted_at": {"$lt": cutoff}}
+    # Served by the deleted_at index
+    docs = await tasks_collection.find(query).limit(batch_size).to_list(None)
+    if not docs:
+        return 0
+    now = datetime.now(UTC)
+    await _insert_archived([{**doc, "archived_at": now} for doc in docs])
+
+    ids = [doc["_id"] for doc in docs]
+    result = await tasks_collection.delete_many({**query, "_id": {"$in": ids}})
+    archived = {doc["_id"]: doc for doc in docs}
+    if result.deleted_count < len(ids):
+        # Restored meanwhile, the hot copy wins
+        kept = await tasks_collection.distinct("_id", {"_id": {"$in": ids}})
+        await get_collection(TASKS_ARCHIVE_COLLECTION).delete_many(
+            {"_id": {"$in": kept}}
+        )
+        for task_id in kept:
+            archived.pop(task_id, None)
+
+    for user_id, count in Counter(doc["user_id"] for doc in archived.values()).items():
+        await task_stats.record_archived(user_id, count)
+    return len(archived)
+
+
+async def archive_deleted(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = ARCHIVE_BATCH_PAUSE_SECONDS,
+) -> int:
+    """Archive every task deleted more than older_than_days ago
+
+    Batches are separated by a pause so the job never competes with API
+    writes for long. Returns the number of tasks archived.
+    """
+    cutoff = datetime.now(UTC) - timedelta(days=older_than_days)
+    total = 0
+    while True:
+        moved = await archive_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        await asyncio.sleep(pause)
+
+
+def find_archived(query: Dict[str, Any], sort: List[Tuple[str, int]], limit: int):
+    """Cursor over archived tasks, for listings that include the archive"""
+    return get_collection(TASKS_ARCHIVE_COLLECTION).find(query).sort(sort).limit(limit)
+
+
+async def restore(user_id: int, task_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Move an archived task back into the tasks collection, still deleted
+
+    Returns the task, or None when the user has no such archived task.
+    """
+    archive = get_collection(TASKS_ARCHIVE_COLLECTION)
+    doc = await archive.find_one({"_id": task_id, "user_id": user_id})
+    if doc is None:
+        return None
+    doc.pop("archived_at", None)
+    try:
+        await get_tasks_collection().insert_one(doc)
+    except DuplicateKeyError:
+        pass  # Restored by an earlier, interrupted attempt
+    else:
+        await task_stats.record_archived(user_id, -1)
+    await archive.delete_one({"_id": task_id})
+    return doc
+
+
+async def main(argv):
+    from app.mongo import connect_to_mongo, disconnect_from_mongo
+
+    await connect_to_mongo()
+    try:
+        if argv[:1] == ["restore"]:
+            user_id, task_id = int(argv[1]), ObjectId(argv[2])
+            doc = await restore(user_id, task_id)
+            print(f"Restored task {task_id}" if doc else f"Task {task_id} not found")
+        else:
+            archived = await archive_deleted()
+            print(f"Archived {archived} deleted tasks")
+    finally:
+        await disconnect_from_mongo()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,177 @@
+# app/task_ranking.py
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from app.cache import list_cache, task_cache
+from app.invalidation import bus
+from app.mongo import get_tasks_collection
+
+RANK_MAX_LENGTH = int(os.getenv("RANK_MAX_LENGTH", 12))
+
+# Base-62 digits in ASCII order, so string comparison is numeric comparison
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Unranked tasks (null) sort first, newest on top, then by rank
+MANUAL_ORDER = [("rank", ASCENDING), ("created_at", DESCENDING)]
+
+
+def midpoint(a: str, b: Optional[str]) -> str:
+    """Key strictly between a and b, read as base-62 fractions
+
+    An empty a stands for 0 and a missing b for 1. Keys never end in
+    the zero digit, so there is always room between two of them.
+    """
+    if b is not None:
+        common = 0
+        while common < len(b) and (a[common] if common < len(a) else "0") == b[common]:
+            common += 1
+        if common:
+            return b[:common] + midpoint(a[common:], b[common:])
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else BASE
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[low] + midpoint(a[1:], None)
+
+
+def rank_before(b: str) -> str:
+    """Key before b, stepping one digit so repeated prepends stay short"""
+    zeros = len(b) - len(b.lstrip("0"))
+    digit = DIGITS.index(b[zeros])
+    if digit > 1:
+        return b[:zeros] + DIGITS[digit - 1]
+    # Only a single digit left below b, continue from the top of the next one
+    return b[:zeros] + DIGITS[0] + DIGITS[-1]
+
+
+def rank_after(a: str) -> str:
+    """Key after a, stepping one digit so repeated appends stay short"""
+    tops = len(a) - len(a.lstrip(DIGITS[-1]))
+    if tops == len(a):
+        return a + DIGITS[1]
+    return a[:tops] + DIGITS[DIGITS.index(a[tops]) + 1]
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    if before is None:
+        return midpoint("", None) if after is None else rank_before(after)
+    if after is None:
+        return rank_after(before)
+    return midpoint(before, after)
+
+
+def spread_ranks(count: int) -> List[str]:
+    """Evenly spaced keys of the shortest length that fits count of them"""
+    width = 1
+    while BASE**width <= count:
+        width += 1
+    step = BASE**width // (count + 1)
+    ranks = []
+    for position in range(1, count + 1):
+        value, digits = position * step, []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+
+def _live(user_id: int) -> Dict[str, Any]:
+    return {"user_id": user_id, "deleted_at": None}
+
+
+async def top_rank(user_id: int) -> str:
+    """Key placing a new task first in the user's manual order"""
+    first = await get_tasks_collection().find_one(
+        {**_live(user_id), "rank": {"$ne": None}},
+        projection={"rank": True},
+        sort=[("rank", ASCENDING)],
+    )
+    return rank_between(None, first["rank"] if first else None)
+
+
+async def neighbour_rank(
+    user_id: int, rank: str, following: bool, exclude: Any
+) -> Optional[str]:
+    """Rank of the task next to rank in manual order, None at either end"""
+    doc = await get_tasks_collection().find_one(
+        {
+            **_live(user_id),
+            "_id": {"$ne": exclude},
+            "rank": {"$gt": rank} if following else {"$lt": rank, "$ne": None},
+        },
+        projection={"rank": True},
+        sort=[("rank", ASCENDING if following else DESCENDING)],
+    )
+    return doc["rank"] if doc else None
+
+
+async def rebalance_user(user_id: int) -> int:
+    """Rewrite a user's keys evenly spaced, ranking unranked tasks too
+
+    Each write is conditional on the key it replaces, so a task moved
+    meanwhile keeps its new position. Returns the number of tasks updated.
+    """
+    cursor = (
+        get_tasks_collection()
+        .find(_live(user_id), projection={"rank": True})
+        .sort(MANUAL_ORDER)
+    )
+    docs = [doc async for doc in cursor]
+    changed = [
+        (doc, rank)
+        for doc, rank in zip(docs, spread_ranks(len(docs)))
+        if doc.get("rank") != rank
+    ]
+    operations = [
+        UpdateOne(
+            {"_id": doc["_id"], "rank": doc.get("rank")}, {"$set": {"rank": rank}}
+        )
+        for doc, rank in changed
+    ]
+    if operations:
+        await get_tasks_collection().bulk_write(operations, ordered=False)
+        # Cached tasks and pages still show the old ranks and order
+        task_ids = [doc["_id"] for doc, _ in changed]
+        for task_id in task_ids:
+            await task_cache.invalidate(user_id, task_id)
+        await list_cache.bump(user_id)
+        await bus.publish(
+            "task", user_id=user_id, task_ids=[str(task_id) for task_id in task_ids]
+        )
+    return len(operations)
+
+
+async def rebalance_all(max_length: int = RANK_MAX_LENGTH) -> int:
+    """Rebalance every user with unranked tasks or keys over max_length"""
+    user_ids = await get_tasks_collection().distinct(
+        "user_id",
+        {
+            "deleted_at": None,
+            "$or": [{"rank": None}, {"rank": {"$regex": f"^.{{{max_length + 1},}}"}}],
+        },
+    )
+    for user_id in user_ids:
+        await rebalance_user(user_id)
+    return len(user_ids)
+
+
+async def main():
+    from app.mongo import connect_to_mongo, disconnect_from_mongo
+
+    await connect_to_mongo()
+    try:
+        users = await rebalance_all()
+        print(f"Rebalanced task order for {users} users")
+    finally:
+        await disconnect_from_mongo()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+# app/task_stats.py
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+from pymongo import UpdateOne
+
+from app.mongo import TASK_STATS_COLLECTION, get_collection, get_tasks_collection
+from app.schemas_task import TagCount, TaskStats, TaskTagCounts
+from app.task_tiering import union_cold_tasks
+
+COUNTERS = ("total", "open", "completed", "deleted")
+
+
+def _is_set(field: str) -> Dict[str, Any]:
+    return {"$ne": [{"$ifNull": [f"${field}", None]}, None]}
+
+
+def _count_if(*conditions: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$sum": {"$cond": [{"$and": list(conditions)}, 1, 0]}}
+
+
+def _not(condition: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$not": [condition]}
+
+
+STATS_PIPELINE = [
+    {
+        "$group": {
+            "_id": "$user_id",
+            "open": _count_if(
+                _not(_is_set("deleted_at")), _not(_is_set("completed_at"))
+            ),
+            "completed": _count_if(
+                _not(_is_set("deleted_at")), _is_set("completed_at")
+            ),
+            "deleted": _count_if(_is_set("deleted_at")),
+            "tag_lists": {
+                "$push": {
+                    "$cond": [
+                        _is_set("deleted_at"),
+                        [],
+                        {"$ifNull": ["$tags", []]},
+                    ]
+                }
+            },
+        }
+    },
+    {
+        "$addFields": {
+            "total": {"$add": ["$open", "$completed"]},
+            "all_tags": {
+                "$reduce": {
+                    "input": "$tag_lists",
+                    "initialValue": [],
+                    "in": {"$concatArrays": ["$$value", "$$this"]},
+                }
+            },
+        }
+    },
+    {
+        "$project": {
+            **{counter: True for counter in COUNTERS},
+            "tags": {
+                "$arrayToObject": {
+                    "$map": {
+                        "input": {"$setUnion": ["$all_tags"]},
+                        "as": "tag",
+                        "in": {
+                            "k": "$$tag",
+                            "v": {
+                                "$size": {
+                                    "$filter": {
+                                        "input": "$all_tags",
+                                        "cond": {"$eq": ["$$this", "$$tag"]},
+                                    }
+                                }
+                            },
+                        },
+                    }
+                }
+            },
+        }
+    },
+]
+
+
+async def _increment(user_id: int, **deltas: int) -> None:
+    """Atomically adjust counters of an existing stats document
+
+    Missing documents are left alone; they are built from scratch the
+    first time the stats are read, so increments never start from zero
+    for users with older tasks.
+    """
+    try:
+        await get_collection(TASK_STATS_COLLECTION).update_one(
+            {"_id": user_id}, {"$inc": deltas}
+        )
+    except Exception as e:
+        # Counters are repairable, a failed increment must not fail the write
+        print(f"Error updating task stats for user {user_id}: {e}")
+
+
+def _tag_deltas(tags: Iterable[str], delta: int) -> Dict[str, int]:
+    return {f"tags.{tag}": delta for tag in tags}
+
+
+async def record_created(user_id: int, tags: Iterable[str] = ()) -> None:
+    await _increment(user_id, total=1, open=1, **_tag_deltas(tags, 1))
+
+
+async def record_deleted(
+    user_id: int, was_completed: bool, tags: Iterable[str] = ()
+) -> None:
+    state = "completed" if was_completed else "open"
+    await _increment(
+        user_id, **{"total": -1, "deleted": 1, state: -1}, **_tag_deltas(tags, -1)
+    )
+
+
+async def record_bulk_deleted(user_id: int, docs: Iterable[Dict[str, Any]]) -> None:
+    """Counters after deleting many live tasks in one write"""
+    deltas: Dict[str, int] = {"total": 0, "deleted": 0, "open": 0, "completed": 0}
+    for doc in docs:
+        state = "completed" if doc.get("completed_at") is not None else "open"
+        deltas["total"] -= 1
+        deltas["deleted"] += 1
+        deltas[state] -= 1
+        for tag in doc.get("tags") or []:
+            deltas[f"tags.{tag}"] = deltas.get(f"tags.{tag}", 0) - 1
+    if deltas["deleted"]:
+        await _increment(user_id, **deltas)
+
+
+async def record_restored(
+    user_id: int, was_completed: bool, tags: Iterable[str] = ()
+) -> None:
+    state = "completed" if was_completed else "open"
+    await _increment(
+        user_id, **{"total": 1, "deleted": -1, state: 1}, **_tag_deltas(tags, 1)
+    )
+
+
+async def record_archived(user_id: int, count: int = 1) -> None:
+    """Deleted tasks moved to the archive leave the deleted counter"""
+    await _increment(user_id, deleted=-count)
+
+
+async def record_update(
+    user_id: int, before: Dict[str, Any], update: Dict[str, Any]
+) -> None:
+    """Follow open/completed transitions and tag changes made by an update"""
+    deltas: Dict[str, int] = {}
+    if "completed_at" in update:
+        was_completed = before.get("completed_at") is not None
+        is_completed = update["completed_at"] is not None
+        if was_completed != is_completed:
+            delta = 1 if is_completed else -1
+            deltas.update(open=-delta, completed=delta)
+    if "tags" in update:
+        old_tags, new_tags = set(before.get("tags") or []), set(update["tags"])
+        deltas.update(_tag_deltas(old_tags - new_tags, -1))
+        deltas.update(_tag_deltas(new_tags - old_tags, 1))
+    if deltas:
+        await _increment(user_id, **deltas)
+
+
+async def recompute_stats(user_id: Optional[int] = None) -> int:
+    """Rebuild counters from the tasks collection with an aggregation
+
+    Covers a single user or, when user_id is None, every user, cold
+    tasks in monthly buckets included. Returns the number of stats
+    documents written.
+    """
+    pipeline = [union_cold_tasks(user_id), *STATS_PIPELINE]
+    if user_id is not None:
+        pipeline.insert(0, {"$match": {"user_id": user_id}})
+
+    cursor = await get_tasks_collection().aggregate(pipeline)
+    operations = [
+        UpdateOne(
+            {"_id": doc["_id"]},
+            {
+                "$set": {
+                    **{counter: doc[counter] for counter in COUNTERS},
+                    "tags": doc.get("tags", {}),
+                }
+            },
+            upsert=True,
+        )
+        async for doc in cursor
+    ]
+    if user_id is not None and not operations:
+        # Users without tasks still get a document so increments apply
+        operations.append(
+            UpdateOne(
+                {"_id": user_id},
+                {"$set": {**{counter: 0 for counter in COUNTERS}, "tags": {}}},
+                upsert=True,
+            )
+        )
+    if operations:
+        await get_collection(TASK_STATS_COLLECTION).bulk_write(operations)
+    return len(operations)
+
+
+async def _load(user_id: int) -> Dict[str, Any]:
+    """Read a user's stats document, building it on first access"""
+    stats_collection = get_collection(TASK_STATS_COLLECTION)
+    doc = await stats_collection.find_one({"_id": user_id})
+    if doc is None:
+        await recompute_stats(user_id)
+        doc = await stats_collection.find_one({"_id": user_id})
+    return doc
+
+
+async def get_stats(user_id: int) -> TaskStats:
+    doc = await _load(user_id)
+    return TaskStats(**{counter: doc.get(counter, 0) for counter in COUNTERS})
+
+
+async def get_tag_counts(user_id: int) -> TaskTagCounts:
+    """Live tasks per tag, most used first"""
+    doc = await _load(user_id)
+    counts = [(tag, count) for tag, count in doc.get("tags", {}).items() if count > 0]
+    counts.sort(key=lambda item: (-item[1], item[0]))
+    return TaskTagCounts(tags=[TagCount(tag=tag, count=count) for tag, count in counts])
+
+
+async def main():
+    from app.mongo import connect_to_mongo, disconnect_from_mongo
+
+    await connect_to_mongo()
+    try:
+        written = await recompute_stats()
+        print(f"Recomputed task stats for {written} users")
+    finally:
+        await disconnect_from_mongo()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
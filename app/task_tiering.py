@@ -0,0 +1,368 @@
+# app/task_tiering.py
+import asyncio
+import os
+import zlib
+from collections import defaultdict
+from datetime import UTC, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bson import Binary, ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.cache import list_cache
+from app.invalidation import bus
+from app.mongo import TASK_BUCKETS_COLLECTION, get_collection, get_tasks_collection
+from app.reminders import as_utc
+
+TIER_AFTER_DAYS = int(os.getenv("TIER_AFTER_DAYS", 180))
+TIER_BATCH_SIZE = int(os.getenv("TIER_BATCH_SIZE", 500))
+TIER_BATCH_PAUSE_SECONDS = float(os.getenv("TIER_BATCH_PAUSE_SECONDS", 0.5))
+TIER_COMPRESS_DESCRIPTIONS = os.getenv(
+    "TIER_COMPRESS_DESCRIPTIONS", "true"
+).lower() in ("1", "true", "yes")
+TIER_COMPRESS_MIN_LENGTH = int(os.getenv("TIER_COMPRESS_MIN_LENGTH", 256))
+
+# Bucket entries drop what every cold task shares with its bucket
+BUCKET_FIELDS = ("user_id", "deleted_at", "reminder_pending")
+DUPLICATE_KEY = 11000
+
+
+def tier_cutoff() -> datetime:
+    """Tasks completed before this are cold, so were all created before it"""
+    return datetime.now(UTC) - timedelta(days=TIER_AFTER_DAYS)
+
+
+def month_start(moment: datetime) -> datetime:
+    return as_utc(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def bucket_id(user_id: int, created_at: datetime) -> str:
+    return f"{user_id}:{as_utc(created_at):%Y-%m}"
+
+
+def compact(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Bucket entry for a hot task document"""
+    entry = {k: v for k, v in doc.items() if k not in BUCKET_FIELDS}
+    description = entry.get("description")
+    if (
+        TIER_COMPRESS_DESCRIPTIONS
+        and description
+        and len(description) >= TIER_COMPRESS_MIN_LENGTH
+    ):
+        entry["description"] = Binary(zlib.compress(description.encode()))
+    return entry
+
+
+def expand(entry: Dict[str, Any], user_id: int) -> Dict[str, Any]:
+    """Task document for a bucket entry"""
+    doc = {**entry, "user_id": user_id, "deleted_at": None}
+    if isinstance(doc.get("description"), bytes):
+        doc["description"] = zlib.decompress(doc["description"]).decode()
+    return doc
+
+
+def union_cold_tasks(user_id: Optional[int] = None) -> Dict[str, Any]:
+    """Aggregation stage adding cold tasks, shaped like hot ones"""
+    pipeline: List[Dict[str, Any]] = []
+    if user_id is not None:
+        pipeline.append({"$match": {"user_id": user_id}})
+    pipeline += [
+        {"$unwind": "$tasks"},
+        {
+            "$replaceWith": {
+                "$mergeObjects": [
+                    "$tasks",
+                    {"user_id": "$user_id", "deleted_at": None},
+                ]
+            }
+        },
+    ]
+    return {"$unionWith": {"coll": TASK_BUCKETS_COLLECTION, "pipeline": pipeline}}
+
+
+def reaches_cold(
+    created_from: Optional[datetime], created_to: Optional[datetime]
+) -> bool:
+    """Whether a list query's creation date range can include cold tasks"""
+    if created_from is None and created_to is None:
+        return False
+    return created_from is None or as_utc(created_from) < tier_cutoff()
+
+
+def sort_key(order: str) -> Callable[[Dict[str, Any]], Tuple]:
+    """Key merging hot and cold pages in the order Mongo returned them"""
+
+    def newest_first(doc: Dict[str, Any]) -> float:
+        return -as_utc(doc["created_at"]).timestamp()
+
+    if order == "manual":
+        # Unranked tasks sort first, as nulls do in Mongo
+        return lambda doc: (
+            doc.get("rank") is not None,
+            doc.get("rank") or "",
+            newest_first(doc),
+        )
+    return lambda doc: (newest_first(doc),)
+
+
+async def list_cold(
+    user_id: int,
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    tag: Optional[str],
+    order: str,
+    limit: int,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """First limit cold tasks in a creation date range, and how many match"""
+    months: Dict[str, Any] = {}
+    created: Dict[str, Any] = {}
+    if created_from is not None:
+        months["$gte"] = month_start(created_from)
+        created["$gte"] = created_from
+    if created_to is not None:
+        months["$lt"] = created_to
+        created["$lt"] = created_to
+    bucket_match: Dict[str, Any] = {"user_id": user_id}
+    if months:
+        # Served by the (user_id, month) index, only buckets in range are read
+        bucket_match["month"] = months
+    task_match: Dict[str, Any] = {"created_at": created} if created else {}
+    if tag is not None:
+        task_match["tags"] = tag
+    sort = {"rank": 1, "created_at": -1} if order == "manual" else {"created_at": -1}
+    cursor = await get_collection(TASK_BUCKETS_COLLECTION).aggregate(
+        [
+            {"$match": bucket_match},
+            {"$unwind": "$tasks"},
+            {"$replaceWith": "$tasks"},
+            {"$match": task_match},
+            {
+                "$facet": {
+                    "page": [{"$sort": sort}, {"$limit": limit}],
+                    "total": [{"$count": "count"}],
+                }
+            },
+        ]
+    )
+    facets = await cursor.next()
+    total = facets["total"][0]["count"] if facets["total"] else 0
+    return [expand(entry, user_id) for entry in facets["page"]], total
+
+
+async def find_cold(user_id: int, task_id: ObjectId) -> Optional[Dict[str, Any]]:
+    bucket = await get_collection(TASK_BUCKETS_COLLECTION).find_one(
+        {"user_id": user_id, "tasks._id": task_id}, projection={"tasks.$": True}
+    )
+    return expand(bucket["tasks"][0], user_id) if bucket else None
+
+
+async def find_cold_many(
+    user_id: int, task_ids: List[ObjectId]
+) -> List[Dict[str, Any]]:
+    """Cold tasks among task_ids, read from the buckets holding them"""
+    if not task_ids:
+        return []
+    cursor = await get_collection(TASK_BUCKETS_COLLECTION).aggregate(
+        [
+            # Served by the (user_id, tasks._id) index
+            {"$match": {"user_id": user_id, "tasks._id": {"$in": task_ids}}},
+            {"$unwind": "$tasks"},
+            {"$replaceWith": "$tasks"},
+            {"$match": {"_id": {"$in": task_ids}}},
+        ]
+    )
+    return [expand(entry, user_id) for entry in await cursor.to_list(None)]
+
+
+async def thaw(user_id: int, task_id: ObjectId) -> bool:
+    """Move a cold task back to the tasks collection before it is written"""
+    doc = await find_cold(user_id, task_id)
+    if doc is None:
+        return False
+    try:
+        await get_tasks_collection().insert_one(doc)
+    except DuplicateKeyError:
+        pass  # Thawed by a concurrent write
+    await get_collection(TASK_BUCKETS_COLLECTION).update_one(
+        {"user_id": user_id, "tasks._id": task_id},
+        {"$pull": {"tasks": {"_id": task_id}}},
+    )
+    return True
+
+
+def _matching_entries(
+    user_id: int, task_match: Dict[str, Any], months: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    bucket_match: Dict[str, Any] = {"user_id": user_id}
+    if months:
+        bucket_match["month"] = months
+    return [
+        {"$match": bucket_match},
+        {"$unwind": "$tasks"},
+        {"$replaceWith": "$tasks"},
+        {"$match": task_match},
+    ]
+
+
+async def count_matching(
+    user_id: int,
+    task_match: Dict[str, Any],
+    months: Optional[Dict[str, Any]] = None,
+    limit: int = 0,
+) -> int:
+    """How many cold tasks of a user match task_match, counting up to limit"""
+    pipeline = _matching_entries(user_id, task_match, months)
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$count": "count"})
+    cursor = await get_collection(TASK_BUCKETS_COLLECTION).aggregate(pipeline)
+    counted = await cursor.to_list(None)
+    return counted[0]["count"] if counted else 0
+
+
+async def thaw_matching(
+    user_id: int,
+    task_match: Dict[str, Any],
+    months: Optional[Dict[str, Any]] = None,
+    limit: int = TIER_BATCH_SIZE,
+) -> int:
+    """Move up to limit cold tasks matching task_match back to tasks
+
+    For writes selecting tasks by a filter rather than by id, so they
+    reach cold tasks too. Returns the number of tasks moved.
+    """
+    buckets_collection = get_collection(TASK_BUCKETS_COLLECTION)
+    pipeline = _matching_entries(user_id, task_match, months)
+    cursor = await buckets_collection.aggregate([*pipeline, {"$limit": limit}])
+    docs = [expand(entry, user_id) for entry in await cursor.to_list(None)]
+    if not docs:
+        return 0
+    try:
+        await get_tasks_collection().insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Thawed by a concurrent write
+        if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+            raise
+    ids = [doc["_id"] for doc in docs]
+    await buckets_collection.update_many(
+        {"user_id": user_id, "tasks._id": {"$in": ids}},
+        {"$pull": {"tasks": {"_id": {"$in": ids}}}},
+    )
+    return len(docs)
+
+
+async def tier_batch(cutoff: datetime, batch_size: int = TIER_BATCH_SIZE) -> int:
+    """Move one batch of tasks completed before cutoff into monthly buckets
+
+    Entries are added with $addToSet, so a batch repeated after a crash
+    does not duplicate them. Returns the number of tasks moved.
+    """
+    tasks_collection = get_tasks_collection()
+    buckets_collection = get_collection(TASK_BUCKETS_COLLECTION)
+    # Recurring tasks and their occurrences stay hot for occurrence listings
+    query = {
+        "completed_at": {"$lt": cutoff},
+        "deleted_at": None,
+        "recurrence": None,
+        "series_id": None,
+    }
+    docs = await tasks_collection.find(query).limit(batch_size).to_list(None)
+    if not docs:
+        return 0
+
+    entries = defaultdict(list)
+    for doc in docs:
+        entries[(doc["user_id"], month_start(doc["created_at"]))].append(compact(doc))
+    await buckets_collection.bulk_write(
+        [
+            UpdateOne(
+                {"_id": bucket_id(user_id, month)},
+                {
+                    "$setOnInsert": {"user_id": user_id, "month": month},
+                    "$addToSet": {"tasks": {"$each": bucket_entries}},
+                },
+                upsert=True,
+            )
+            for (user_id, month), bucket_entries in entries.items()
+        ],
+        ordered=False,
+    )
+
+    # Each task is deleted only as it was read, so an edit between the
+    # find and the delete keeps it hot
+    ids = [doc["_id"] for doc in docs]
+    result = await tasks_collection.bulk_write(
+        [
+            DeleteOne(
+                {
+                    **query,
+                    "_id": doc["_id"],
+                    "updated_at": doc.get("updated_at"),
+                    "rank": doc.get("rank"),
+                }
+            )
+            for doc in docs
+        ],
+        ordered=False,
+    )
+    kept = set()
+    if result.deleted_count < len(ids):
+        # Changed meanwhile, the hot copy wins
+        kept = set(await tasks_collection.distinct("_id", {"_id": {"$in": ids}}))
+        stale = defaultdict(list)
+        for doc in docs:
+            if doc["_id"] in kept:
+                stale[(doc["user_id"], month_start(doc["created_at"]))].append(
+                    doc["_id"]
+                )
+        if stale:
+            await buckets_collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": bucket_id(user_id, month)},
+                        {"$pull": {"tasks": {"_id": {"$in": stale_ids}}}},
+                    )
+                    for (user_id, month), stale_ids in stale.items()
+                ],
+                ordered=False,
+            )
+
+    for user_id in {doc["user_id"] for doc in docs if doc["_id"] not in kept}:
+        # Cached pages may still list the moved tasks as hot
+        await list_cache.bump(user_id)
+        await bus.publish("task", user_id=user_id)
+    return len(ids) - len(kept)
+
+
+async def tier_completed(
+    older_than_days: int = TIER_AFTER_DAYS,
+    batch_size: int = TIER_BATCH_SIZE,
+    pause: float = TIER_BATCH_PAUSE_SECONDS,
+) -> int:
+    """Move every task completed more than older_than_days ago to buckets"""
+    cutoff = datetime.now(UTC) - timedelta(days=older_than_days)
+    total = 0
+    while True:
+        moved = await tier_batch(cutoff, batch_size)
+        total += moved
+        if moved < batch_size:
+            return total
+        await asyncio.sleep(pause)
+
+
+async def main():
+    from app.mongo import connect_to_mongo, disconnect_from_mongo
+
+    await connect_to_mongo()
+    await bus.start()
+    try:
+        moved = await tier_completed()
+        print(f"Moved {moved} completed tasks to monthly buckets")
+    finally:
+        await bus.stop()
+        await disconnect_from_mongo()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+# app/write_batcher.py
+import asyncio
+import contextvars
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from app import metrics
+from app.mongo import get_tasks_collection
+
+INSERT_BATCHING_ENABLED = os.getenv("INSERT_BATCHING_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+INSERT_BATCH_WINDOW_MS = float(os.getenv("INSERT_BATCH_WINDOW_MS", 2))
+INSERT_BATCH_MAX_DOCS = int(os.getenv("INSERT_BATCH_MAX_DOCS", 100))
+
+
+class InsertBatcher:
+    """Coalesce single-document inserts into insert_many round-trips
+
+    A document waits at most window_ms for companions before its batch
+    is flushed, and a batch is flushed at once when it reaches max_docs.
+    Each caller gets back the _id of its own document.
+    """
+
+    def __init__(
+        self,
+        get_collection: Callable[[], Any] = get_tasks_collection,
+        enabled: bool = INSERT_BATCHING_ENABLED,
+        window_ms: float = INSERT_BATCH_WINDOW_MS,
+        max_docs: int = INSERT_BATCH_MAX_DOCS,
+    ):
+        self.get_collection = get_collection
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_docs = max_docs
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+        self.batches = 0
+        self.documents = 0
+        self.max_batch_size = 0
+
+    async def insert(self, doc: Dict[str, Any]) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((doc, future))
+        if len(self._pending) >= self.max_docs:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window, self._schedule_flush
+            )
+        return await future
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # The batch outlives the request that triggered the flush, so it must
+        # not inherit that request's deadline
+        task = asyncio.create_task(self._flush(batch), context=contextvars.Context())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        docs = [doc for doc, _ in batch]
+        self.batches += 1
+        self.documents += len(docs)
+        self.max_batch_size = max(self.max_batch_size, len(docs))
+        failed: Dict[int, Exception] = {}
+        try:
+            # insert_many assigns every _id client side before sending
+            await self.get_collection().insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = BulkWriteError(
+                    {"writeErrors": [error], "nInserted": 0}
+                )
+        except Exception as e:
+            failed = {index: e for index in range(len(batch))}
+
+        for index, (doc, future) in enumerate(batch):
+            if future.done():
+                continue  # The caller went away
+            if index in failed:
+                future.set_exception(failed[index])
+            else:
+                future.set_result(doc["_id"])
+
+    async def close(self) -> None:
+        """Flush anything still waiting, used on shutdown"""
+        self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "batches": self.batches,
+            "documents": self.documents,
+            "average_batch_size": (
+                self.documents / self.batches if self.batches else 0.0
+            ),
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+insert_batcher = InsertBatcher()
+metrics.register("insert_batcher", insert_batcher.metrics)
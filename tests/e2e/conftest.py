@@ -14,6 +14,8 @@ MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "fastapi_db_test")
 os.environ["DATABASE_URL"] = (
     f"mysql+mysqldb://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
 )
+# Every test client shares one address and would exhaust the login bucket
+os.environ["RATE_LIMIT_ENABLED"] = "false"
 
 
 @pytest.fixture(scope="function", autouse=True)
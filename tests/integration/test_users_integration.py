@@ -1,5 +1,6 @@
 # tests/integration/test_users_integration.py
 import os
+from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -77,3 +78,21 @@ def test_register_and_login(client):
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_coalesced_user_lookup_is_attached_to_each_session(db_session):
+    from app import crud, models
+
+    db_session.add(models.User(email="shared@example.com", hashed_password="hash"))
+    db_session.flush()
+    # What a concurrent lookup on another session hands to this one
+    row = crud._load_user_row(db_session, "shared@example.com")
+    other_session = TestingSessionLocal(bind=db_session.connection())
+
+    with patch.object(crud.user_lookups, "do", return_value=row):
+        user = crud.get_user_by_email(other_session, "shared@example.com")
+
+    assert user in other_session and user not in db_session
+    other_session.delete(user)
+    other_session.flush()
+    other_session.close()
@@ -0,0 +1,176 @@
+# tests/unit/routers/test_batch_unit.py
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, RedirectResponse
+
+import app.deps as deps
+import app.schemas as schemas
+from app.routers import tasks
+from app.routers.batch import run_batch
+from app.schemas_batch import BatchRequest, BatchRequestItem
+
+
+@pytest.fixture
+def tasks_app():
+    """Stand-in for the tasks API, authenticated like it"""
+    app = FastAPI()
+
+    @app.get("/tasks/me")
+    def whoami(current_user=Depends(deps.get_current_user)):
+        return {"id": current_user.id}
+
+    @app.post("/tasks/echo", status_code=201)
+    async def echo(body: dict, current_user=Depends(deps.get_current_user)):
+        return body
+
+    @app.get("/tasks/text")
+    async def text():
+        return PlainTextResponse("plain")
+
+    @app.get("/tasks/moved")
+    async def moved():
+        return RedirectResponse("/users/me")
+
+    @app.get("/users/me")
+    async def outside():
+        return {"outside": True}
+
+    @app.get("/tasks/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return app
+
+
+@pytest.fixture
+def mock_request(mocker, tasks_app):
+    request = mocker.MagicMock()
+    request.app = tasks_app
+    request.headers = {"authorization": "Bearer token"}
+    return request
+
+
+@pytest.fixture
+def mock_user():
+    return schemas.User(id=7, email="test@example.com")
+
+
+class TestBatchRequest:
+    """Test cases for validating batch requests"""
+
+    @pytest.mark.parametrize("path", ["/tasks/", "/tasks/stats", "/tasks/?tag=a"])
+    def test_tasks_paths_allowed(self, path):
+        assert BatchRequestItem(method="GET", path=path).path == path
+
+    @pytest.mark.parametrize(
+        "path, served",
+        [("/tasks", "/tasks/"), ("/tasks?tag=a", "/tasks/?tag=a")],
+    )
+    def test_bare_list_path_points_at_the_list(self, path, served):
+        assert BatchRequestItem(method="GET", path=path).path == served
+
+    @pytest.mark.parametrize("path", ["/batch", "/users/me", "/tasksx", "tasks"])
+    def test_other_paths_rejected(self, path):
+        with pytest.raises(ValueError):
+            BatchRequestItem(method="GET", path=path)
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/tasks/../users/me",
+            "/tasks/%2e%2e/users/me",
+            "/tasks/%2E%2e/users/me",
+            "/tasks/..%2fusers/me",
+            "/tasks/.%2e/users/me",
+            "/tasks/./stats",
+            "/tasks/%2e/stats",
+            "/tasks//x",
+            "/tasks/..",
+            "/tasks/..?tag=a",
+        ],
+    )
+    def test_dot_and_empty_segments_rejected(self, path):
+        with pytest.raises(ValueError):
+            BatchRequestItem(method="GET", path=path)
+
+    def test_size_is_bounded(self):
+        with pytest.raises(ValueError):
+            BatchRequest(requests=[])
+        with pytest.raises(ValueError):
+            BatchRequest(requests=[{"method": "GET", "path": "/tasks"}] * 21)
+
+
+class TestRunBatch:
+    """Test cases for run_batch endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_sub_requests_share_the_principal(
+        self, mocker, mock_request, mock_user
+    ):
+        # Arrange
+        decode = mocker.patch("app.deps.jwt.decode")
+        batch = BatchRequest(
+            requests=[
+                {"method": "GET", "path": "/tasks/me"},
+                {"method": "POST", "path": "/tasks/echo", "body": {"a": 1}},
+            ]
+        )
+
+        # Act
+        result = await run_batch(batch, mock_request, mock_user)
+
+        # Assert
+        assert [item.status for item in result.responses] == [200, 201]
+        assert result.responses[0].body == {"id": 7}
+        assert result.responses[1].body == {"a": 1}
+        decode.assert_not_called()
+        assert deps.batch_principal.get() is None
+
+    @pytest.mark.asyncio
+    async def test_failures_stay_with_their_sub_request(self, mock_request, mock_user):
+        # Arrange
+        batch = BatchRequest(
+            requests=[
+                {"method": "GET", "path": "/tasks/boom"},
+                {"method": "GET", "path": "/tasks/missing"},
+                {"method": "GET", "path": "/tasks/text"},
+            ]
+        )
+
+        # Act
+        result = await run_batch(batch, mock_request, mock_user)
+
+        # Assert
+        assert [item.status for item in result.responses] == [500, 404, 200]
+        assert result.responses[1].body == {"detail": "Not Found"}
+        assert result.responses[2].body == "plain"
+
+    @pytest.mark.asyncio
+    async def test_redirects_are_not_followed(self, mock_request, mock_user):
+        batch = BatchRequest(requests=[{"method": "GET", "path": "/tasks/moved"}])
+
+        result = await run_batch(batch, mock_request, mock_user)
+
+        assert result.responses[0].status == 307
+        assert result.responses[0].body != {"outside": True}
+
+    @pytest.mark.asyncio
+    async def test_list_request_reaches_the_tasks_router(
+        self, mocker, mock_request, mock_user
+    ):
+        # Arrange
+        mock_request.app = FastAPI()
+        mock_request.app.include_router(tasks.router)
+        get_or_build = mocker.patch(
+            "app.routers.tasks.list_cache.get_or_build",
+            return_value=b'{"tasks": [], "total": 0, "page": 1, "size": 10}',
+        )
+        batch = BatchRequest(requests=[{"method": "GET", "path": "/tasks?tag=a"}])
+
+        # Act
+        result = await run_batch(batch, mock_request, mock_user)
+
+        # Assert
+        assert result.responses[0].status == 200
+        assert result.responses[0].body["total"] == 0
+        assert get_or_build.call_args[0][1]["tag"] == "a"
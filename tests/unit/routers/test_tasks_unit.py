@@ -1,26 +1,96 @@
 # tests/unit/routers/test_tasks_unit.py
-from datetime import UTC, datetime
+import asyncio
+from datetime import UTC, datetime, timedelta
 
+import pymongo
 import pytest
 from bson import ObjectId
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from pymongo import _csot
+from pymongo.errors import ExecutionTimeout
 
+import app.idempotency as idempotency
 import app.schemas as schemas
+from app.cache import ListPageCache, MemoryCacheBackend, TaskCache
 from app.routers.tasks import (
+    bulk_delete_tasks,
     create_task,
     delete_task,
     get_task,
+    get_task_analytics,
+    get_task_job,
+    get_task_stats,
+    get_task_tags,
+    list_occurrences,
     list_tasks,
+    list_trash,
+    lookup_tasks,
     mark_complete,
     mark_uncomplete,
+    move_task,
+    restore_task,
+    update_occurrence,
     update_task,
 )
-from app.schemas_task import TaskCreate, TaskInDB, TaskList, TaskUpdate
+from app.schemas_task import (
+    TaskAnalytics,
+    TaskBulkDelete,
+    TaskCreate,
+    TaskInDB,
+    TaskList,
+    TaskLookup,
+    TaskMove,
+    TaskStats,
+    TaskTagCounts,
+    TaskUpdate,
+)
 
 
 class TestTaskBase:
     """Base class to test tasks endpoint"""
 
+    @pytest.fixture(autouse=True)
+    def mock_task_stats(self, mocker):
+        return mocker.patch("app.routers.tasks.task_stats", new=mocker.AsyncMock())
+
+    @pytest.fixture(autouse=True)
+    def task_cache(self, mocker):
+        cache = TaskCache(MemoryCacheBackend())
+        mocker.patch("app.routers.tasks.task_cache", new=cache)
+        return cache
+
+    @pytest.fixture(autouse=True)
+    def list_cache(self, mocker):
+        cache = ListPageCache(MemoryCacheBackend())
+        mocker.patch("app.routers.tasks.list_cache", new=cache)
+        return cache
+
+    @pytest.fixture(autouse=True)
+    def mock_bus(self, mocker):
+        return mocker.patch("app.routers.tasks.bus", new=mocker.AsyncMock())
+
+    @pytest.fixture(autouse=True)
+    def mock_task_analytics(self, mocker):
+        return mocker.patch("app.routers.tasks.task_analytics", new=mocker.AsyncMock())
+
+    @pytest.fixture(autouse=True)
+    def mock_scheduler(self, mocker):
+        return mocker.patch("app.routers.tasks.scheduler")
+
+    @pytest.fixture(autouse=True)
+    def mock_top_rank(self, mocker):
+        return mocker.patch("app.routers.tasks.task_ranking.top_rank", return_value="V")
+
+    @pytest.fixture(autouse=True)
+    def mock_task_tiering(self, mocker):
+        module = "app.routers.tasks.task_tiering"
+        return {
+            "find_cold": mocker.patch(f"{module}.find_cold", return_value=None),
+            "thaw": mocker.patch(f"{module}.thaw", return_value=False),
+            "list_cold": mocker.patch(f"{module}.list_cold", return_value=([], 0)),
+            "find_cold_many": mocker.patch(f"{module}.find_cold_many", return_value=[]),
+        }
+
     @pytest.fixture
     def mock_user(self):
         return schemas.User(id=1, email="test@example.com")
@@ -121,7 +191,15 @@ class TestCreateTask(TestTaskBase):
     """Test cases for create_task endpoint"""
 
     @pytest.mark.asyncio
-    async def test_create_task_success(self, mocker, mock_user, task_create, mock_now):
+    async def test_create_task_success(
+        self,
+        mocker,
+        mock_user,
+        task_create,
+        mock_now,
+        mock_task_stats,
+        mock_task_analytics,
+    ):
         # Arrange
         mock_collection = mocker.AsyncMock()
         mock_result = mocker.MagicMock()
@@ -152,6 +230,187 @@ class TestCreateTask(TestTaskBase):
         assert call_args["description"] == "Test Description"
         assert call_args["deleted_at"] is None
         assert call_args["completed_at"] is None
+        assert call_args["tags"] == []
+        assert call_args["rank"] == "V"
+        assert call_args["due_at"] is None
+        assert "reminder_pending" not in call_args
+        mock_task_stats.record_created.assert_awaited_once_with(1, [])
+        mock_task_analytics.record_change.assert_awaited_once_with(1, [mock_now])
+
+    @pytest.mark.asyncio
+    async def test_create_task_with_due_date_schedules_reminder(
+        self, mocker, mock_user, mock_scheduler
+    ):
+        # Arrange
+        due_at = datetime(2023, 1, 2, 9, 0, tzinfo=UTC)
+        mock_collection = mocker.AsyncMock()
+        mock_collection.insert_one.return_value.inserted_id = ObjectId(
+            "507f1f77bcf86cd799439011"
+        )
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        result = await create_task(TaskCreate(title="Call", due_at=due_at), mock_user)
+
+        # Assert
+        assert result.due_at == due_at
+        doc = mock_collection.insert_one.call_args[0][0]
+        assert doc["due_at"] == due_at
+        assert doc["reminder_pending"] is True
+        mock_scheduler.notify.assert_called_once_with(
+            1, ObjectId("507f1f77bcf86cd799439011"), due_at
+        )
+
+    @pytest.mark.asyncio
+    async def test_create_task_uses_insert_batcher(
+        self, mocker, mock_user, task_create
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mock_batcher = mocker.patch("app.routers.tasks.insert_batcher")
+        mock_batcher.enabled = True
+        mock_batcher.insert = mocker.AsyncMock(
+            return_value=ObjectId("507f1f77bcf86cd799439011")
+        )
+
+        # Act
+        result = await create_task(task_create, mock_user)
+
+        # Assert
+        assert result.id == "507f1f77bcf86cd799439011"
+        mock_batcher.insert.assert_awaited_once()
+        mock_collection.insert_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_task_with_idempotency_key(
+        self, mocker, mock_user, task_create, mock_now
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_result = mocker.MagicMock()
+        mock_result.inserted_id = ObjectId("507f1f77bcf86cd799439011")
+        mock_collection.insert_one.return_value = mock_result
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mock_begin = mocker.patch(
+            "app.routers.tasks.idempotency.begin", return_value=None
+        )
+        mock_complete = mocker.patch("app.routers.tasks.idempotency.complete")
+
+        # Act
+        result = await create_task(task_create, mock_user, idempotency_key="key-1")
+
+        # Assert
+        assert result.id == "507f1f77bcf86cd799439011"
+        assert mock_begin.call_args[0][:2] == (1, "key-1")
+        user_id, key, resource_id, status_code, response = mock_complete.call_args[0]
+        assert (user_id, key, status_code) == (1, "key-1", 201)
+        assert resource_id == ObjectId("507f1f77bcf86cd799439011")
+        assert response["_id"] == "507f1f77bcf86cd799439011"
+        assert response["title"] == "Test Task"
+
+    @pytest.mark.asyncio
+    async def test_create_task_replays_without_insert(
+        self, mocker, mock_user, task_create
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        replay = mocker.MagicMock()
+        mocker.patch("app.routers.tasks.idempotency.begin", return_value=replay)
+
+        # Act
+        result = await create_task(task_create, mock_user, idempotency_key="key-1")
+
+        # Assert
+        assert result is replay
+        mock_collection.insert_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_create_task_releases_key_on_failure(
+        self, mocker, mock_user, task_create
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.insert_one.side_effect = Exception("write failed")
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mocker.patch("app.routers.tasks.idempotency.begin", return_value=None)
+        mock_release = mocker.patch("app.routers.tasks.idempotency.release_later")
+
+        # Act & Assert
+        with pytest.raises(Exception, match="write failed"):
+            await create_task(task_create, mock_user, idempotency_key="key-1")
+
+        mock_release.assert_called_once_with(1, "key-1")
+
+    @pytest.mark.asyncio
+    async def test_create_task_releases_key_when_cancelled(
+        self, mocker, mock_user, task_create
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        # E.g. the request deadline cancelling the insert
+        mock_collection.insert_one.side_effect = asyncio.CancelledError()
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mocker.patch("app.routers.tasks.idempotency.begin", return_value=None)
+        mock_release = mocker.patch("app.routers.tasks.idempotency.release_later")
+
+        # Act & Assert
+        with pytest.raises(asyncio.CancelledError):
+            await create_task(task_create, mock_user, idempotency_key="key-1")
+
+        mock_release.assert_called_once_with(1, "key-1")
+
+    @pytest.mark.asyncio
+    async def test_create_task_releases_key_past_the_deadline(
+        self, mocker, mock_user, task_create
+    ):
+        # Arrange
+        async def slow_insert(doc):
+            await asyncio.sleep(1)
+
+        mock_collection = mocker.AsyncMock()
+        mock_collection.insert_one.side_effect = slow_insert
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mocker.patch("app.routers.tasks.idempotency.begin", return_value=None)
+        released = []
+
+        async def delete_one(query):
+            # What pymongo does before sending a command past its deadline
+            left = _csot.remaining()
+            if left is not None and left <= 0:
+                raise ExecutionTimeout("operation would exceed time limit")
+            released.append(query)
+
+        mock_keys = mocker.AsyncMock()
+        mock_keys.delete_one.side_effect = delete_one
+        mocker.patch("app.idempotency.get_collection", return_value=mock_keys)
+
+        # Act
+        with pytest.raises(TimeoutError):
+            # As request_deadline bounds the handler
+            with pymongo.timeout(0.05):
+                async with asyncio.timeout(0.05):
+                    await create_task(task_create, mock_user, idempotency_key="key-1")
+        await asyncio.gather(*idempotency._releases)
+
+        # Assert
+        assert released == [{"user_id": 1, "key": "key-1", "status": "pending"}]
 
 
 class TestListTasks(TestTaskBase):
@@ -179,7 +438,8 @@ class TestListTasks(TestTaskBase):
         )
 
         # Act
-        result = await list_tasks(page=1, size=10, current_user=mock_user)
+        response = await list_tasks(page=1, size=10, current_user=mock_user)
+        result = TaskList.model_validate_json(response.body)
 
         # Assert
         assert isinstance(result, TaskList)
@@ -196,6 +456,31 @@ class TestListTasks(TestTaskBase):
             {"user_id": 1, "deleted_at": None}
         )
 
+    @pytest.mark.asyncio
+    async def test_list_tasks_filtered_by_tag(self, mocker, mock_user, mock_tasks_data):
+        # Arrange
+        mock_collection = mocker.MagicMock()
+        mock_cursor = mocker.AsyncMock()
+        mock_cursor.__aiter__.return_value = iter(mock_tasks_data[:1])
+        mock_collection.find.return_value.sort.return_value.skip.return_value.limit.return_value = (
+            mock_cursor
+        )
+        mock_collection.count_documents = mocker.AsyncMock(return_value=1)
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        response = await list_tasks(page=1, size=10, tag="Work", current_user=mock_user)
+        result = TaskList.model_validate_json(response.body)
+
+        # Assert
+        assert result.total == 1
+        expected_query = {"user_id": 1, "deleted_at": None, "tags": "work"}
+        mock_collection.find.assert_called_once_with(expected_query)
+        mock_collection.count_documents.assert_called_once_with(expected_query)
+
     @pytest.mark.asyncio
     async def test_list_tasks_with_pagination(self, mocker, mock_user, mock_tasks_data):
         # Arrange
@@ -216,7 +501,8 @@ class TestListTasks(TestTaskBase):
         )
 
         # Act
-        result = await list_tasks(page=2, size=1, current_user=mock_user)
+        response = await list_tasks(page=2, size=1, current_user=mock_user)
+        result = TaskList.model_validate_json(response.body)
 
         # Assert
         assert result.page == 2
@@ -233,6 +519,95 @@ class TestListTasks(TestTaskBase):
             1
         )
 
+    @pytest.mark.asyncio
+    async def test_list_tasks_served_from_cache_until_write(
+        self, mocker, mock_user, mock_tasks_data, task_create, list_cache
+    ):
+        # Arrange
+        mock_collection = mocker.MagicMock()
+        mock_collection.find.return_value.sort.return_value.skip.return_value.limit.side_effect = lambda _: self.cursor(
+            mocker, mock_tasks_data
+        )
+        mock_collection.count_documents = mocker.AsyncMock(return_value=2)
+        mock_result = mocker.MagicMock()
+        mock_result.inserted_id = ObjectId("507f1f77bcf86cd799439013")
+        mock_collection.insert_one = mocker.AsyncMock(return_value=mock_result)
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        first = await list_tasks(page=1, size=10, current_user=mock_user)
+        second = await list_tasks(page=1, size=10, current_user=mock_user)
+        await create_task(task_create, mock_user)
+        third = await list_tasks(page=1, size=10, current_user=mock_user)
+
+        # Assert
+        assert first.body == second.body == third.body
+        assert mock_collection.count_documents.await_count == 2
+        assert list_cache.hits == 1
+        assert list_cache.misses == 2
+
+    @staticmethod
+    def cursor(mocker, docs):
+        cursor = mocker.AsyncMock()
+        cursor.__aiter__.return_value = iter(docs)
+        return cursor
+
+
+class TestGetTaskStats(TestTaskBase):
+    """Test cases for get_task_stats endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_get_task_stats(self, mock_user, mock_task_stats):
+        # Arrange
+        stats = TaskStats(total=3, open=2, completed=1, deleted=1)
+        mock_task_stats.get_stats.return_value = stats
+
+        # Act
+        result = await get_task_stats(mock_user)
+
+        # Assert
+        assert result == stats
+        mock_task_stats.get_stats.assert_awaited_once_with(1)
+
+
+class TestGetTaskTags(TestTaskBase):
+    """Test cases for get_task_tags endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_get_task_tags(self, mock_user, mock_task_stats):
+        # Arrange
+        counts = TaskTagCounts(tags=[{"tag": "work", "count": 2}])
+        mock_task_stats.get_tag_counts.return_value = counts
+
+        # Act
+        result = await get_task_tags(mock_user)
+
+        # Assert
+        assert result == counts
+        mock_task_stats.get_tag_counts.assert_awaited_once_with(1)
+
+
+class TestGetTaskAnalytics(TestTaskBase):
+    """Test cases for get_task_analytics endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_get_task_analytics(self, mock_user, mock_task_analytics):
+        # Arrange
+        analytics = TaskAnalytics(granularity="week", buckets=[])
+        mock_task_analytics.get_analytics.return_value = analytics
+
+        # Act
+        result = await get_task_analytics("week", None, None, mock_user)
+
+        # Assert
+        assert result == analytics
+        mock_task_analytics.get_analytics.assert_awaited_once_with(
+            1, "week", None, None
+        )
+
 
 class TestGetTask(TestTaskBase):
     """Test cases for get_task endpoint"""
@@ -265,6 +640,31 @@ class TestGetTask(TestTaskBase):
             }
         )
 
+    @pytest.mark.asyncio
+    async def test_get_task_served_from_cache(
+        self, mocker, mock_user, mock_task_data, task_cache
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one.return_value = mock_task_data
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        first = await get_task(ObjectId("507f1f77bcf86cd799439011"), mock_user)
+        second = await get_task(ObjectId("507f1f77bcf86cd799439011"), mock_user)
+
+        # Assert
+        assert first.model_dump(exclude={"created_at", "updated_at"}) == (
+            second.model_dump(exclude={"created_at", "updated_at"})
+        )
+        # BSON round trips return naive UTC datetimes, as Mongo itself does
+        assert second.created_at == first.created_at.replace(tzinfo=None)
+        mock_collection.find_one.assert_called_once()
+        assert task_cache.hits == 1
+
     @pytest.mark.asyncio
     async def test_get_task_not_found(self, mocker, mock_user):
         # Arrange
@@ -322,6 +722,27 @@ class TestUpdateTask(TestTaskBase):
         assert update_doc["completed_at"] == mock_now
         assert "completed" not in update_doc  # Should be removed after processing
 
+    @pytest.mark.asyncio
+    async def test_update_task_refreshes_cache(
+        self, mocker, mock_user, task_update, mock_updated_task, task_cache
+    ):
+        # Arrange
+        task_id = ObjectId("507f1f77bcf86cd799439011")
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = mock_updated_task
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        await update_task(task_update, task_id, mock_user)
+        result = await get_task(task_id, mock_user)
+
+        # Assert
+        assert result.title == "Updated Task"
+        mock_collection.find_one.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_update_task_not_found(self, mocker, mock_user, task_update):
         # Arrange
@@ -372,13 +793,10 @@ class TestUpdateTask(TestTaskBase):
         call_args = mock_collection.find_one_and_update.call_args[0][1]["$set"]
         assert call_args["completed_at"] is None
 
-
-class TestDeleteTask(TestTaskBase):
-    """Test cases for delete_task endpoint"""
-
     @pytest.mark.asyncio
-    async def test_delete_task_success(self, mocker, mock_user, mock_now):
+    async def test_update_task_return_minimal(self, mocker, mock_user, mock_now):
         # Arrange
+        task_update = TaskUpdate(title="Updated Task")
         mock_collection = mocker.AsyncMock()
         mock_result = mocker.MagicMock()
         mock_result.matched_count = 1
@@ -387,28 +805,92 @@ class TestDeleteTask(TestTaskBase):
         mocker.patch(
             "app.routers.tasks.get_tasks_collection", return_value=mock_collection
         )
+        mock_convert = mocker.patch("app.routers.tasks.convert_doc_to_task")
 
         # Act
-        result = await delete_task("507f1f77bcf86cd799439011", mock_user)
+        result = await update_task(
+            task_update,
+            ObjectId("507f1f77bcf86cd799439011"),
+            mock_user,
+            prefer="return=minimal",
+        )
 
         # Assert
-        assert result is None  # Should return None for 204 status
+        assert result.status_code == 204
+        assert result.headers["Preference-Applied"] == "return=minimal"
+        mock_collection.find_one_and_update.assert_not_called()
+        mock_convert.assert_not_called()
+        update_doc = mock_collection.update_one.call_args[0][1]["$set"]
+        assert update_doc["title"] == "Updated Task"
+        assert update_doc["updated_at"] == mock_now
 
-        # Verify soft delete
-        mock_collection.update_one.assert_called_once()
-        call_args = mock_collection.update_one.call_args
+    @pytest.mark.asyncio
+    async def test_update_task_return_minimal_completion_change(
+        self, mocker, mock_user, task_update, mock_now, mock_task_stats
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = {
+            "_id": ObjectId("507f1f77bcf86cd799439011"),
+            "completed_at": None,
+        }
 
-        expected_filter = {
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mock_convert = mocker.patch("app.routers.tasks.convert_doc_to_task")
+
+        # Act
+        result = await update_task(
+            task_update,
+            ObjectId("507f1f77bcf86cd799439011"),
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        assert result.status_code == 204
+        mock_convert.assert_not_called()
+        call_args = mock_collection.find_one_and_update.call_args
+        assert call_args.kwargs["projection"] == {"completed_at": True}
+        assert call_args[0][1]["$set"]["completed_at"] == mock_now
+        mock_task_stats.record_update.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_update_task_return_minimal_tags_change(
+        self, mocker, mock_user, mock_task_stats
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = {
             "_id": ObjectId("507f1f77bcf86cd799439011"),
-            "user_id": 1,
-            "deleted_at": None,
+            "tags": ["home"],
         }
-        assert call_args[0][0] == expected_filter
-        assert call_args[0][1]["$set"]["deleted_at"] == mock_now
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        result = await update_task(
+            TaskUpdate(tags=["Work"]),
+            ObjectId("507f1f77bcf86cd799439011"),
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        assert result.status_code == 204
+        mock_collection.update_one.assert_not_called()
+        call_args = mock_collection.find_one_and_update.call_args
+        assert call_args.kwargs["projection"] == {"tags": True}
+        assert call_args[0][1]["$set"]["tags"] == ["work"]
+        mock_task_stats.record_update.assert_awaited_once()
 
     @pytest.mark.asyncio
-    async def test_delete_task_not_found(self, mocker, mock_user):
+    async def test_update_task_return_minimal_not_found(self, mocker, mock_user):
         # Arrange
+        task_update = TaskUpdate(title="Updated Task")
         mock_collection = mocker.AsyncMock()
         mock_result = mocker.MagicMock()
         mock_result.matched_count = 0
@@ -420,25 +902,100 @@ class TestDeleteTask(TestTaskBase):
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
-            await delete_task("507f1f77bcf86cd799439011", mock_user)
+            await update_task(
+                task_update,
+                ObjectId("507f1f77bcf86cd799439011"),
+                mock_user,
+                prefer="return=minimal",
+            )
 
         assert exc_info.value.status_code == 404
-        assert exc_info.value.detail == "Task not found"
 
 
-class TestMarkComplete(TestTaskBase):
-    """Test cases for mark_complete endpoint"""
+class TestDeleteTask(TestTaskBase):
+    """Test cases for delete_task endpoint"""
 
     @pytest.mark.asyncio
-    async def test_mark_complete_success(self, mocker, mock_user, mock_now):
-        # Fix: Use mock_now for completed_at to match what the function will set
-        mock_completed_task = {
+    async def test_delete_task_success(
+        self,
+        mocker,
+        mock_user,
+        mock_now,
+        mock_task_stats,
+        mock_task_analytics,
+        task_cache,
+        mock_bus,
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = {
             "_id": ObjectId("507f1f77bcf86cd799439011"),
-            "user_id": 1,
-            "title": "Test Task",
-            "description": "Test Description",
             "created_at": datetime(2023, 1, 1, tzinfo=UTC),
-            "updated_at": mock_now,
+            "completed_at": None,
+        }
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        result = await delete_task("507f1f77bcf86cd799439011", mock_user)
+
+        # Assert
+        assert result is None  # Should return None for 204 status
+
+        # Verify soft delete
+        mock_collection.find_one_and_update.assert_called_once()
+        call_args = mock_collection.find_one_and_update.call_args
+
+        expected_filter = {
+            "_id": ObjectId("507f1f77bcf86cd799439011"),
+            "user_id": 1,
+            "deleted_at": None,
+        }
+        assert call_args[0][0] == expected_filter
+        assert call_args[0][1]["$set"]["deleted_at"] == mock_now
+        mock_task_stats.record_deleted.assert_awaited_once_with(1, False, [])
+        assert task_cache.generation == 1
+        mock_bus.publish.assert_awaited_once_with(
+            "task", user_id=1, task_id="507f1f77bcf86cd799439011"
+        )
+        mock_task_analytics.record_change.assert_awaited_once_with(
+            1, [datetime(2023, 1, 1, tzinfo=UTC), None]
+        )
+
+    @pytest.mark.asyncio
+    async def test_delete_task_not_found(self, mocker, mock_user, mock_task_stats):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = None
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await delete_task("507f1f77bcf86cd799439011", mock_user)
+
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.detail == "Task not found"
+        mock_task_stats.record_deleted.assert_not_called()
+
+
+class TestMarkComplete(TestTaskBase):
+    """Test cases for mark_complete endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_mark_complete_success(self, mocker, mock_user, mock_now):
+        # Fix: Use mock_now for completed_at to match what the function will set
+        mock_completed_task = {
+            "_id": ObjectId("507f1f77bcf86cd799439011"),
+            "user_id": 1,
+            "title": "Test Task",
+            "description": "Test Description",
+            "created_at": datetime(2023, 1, 1, tzinfo=UTC),
+            "updated_at": mock_now,
             "completed_at": mock_now,  # Changed to use mock_now
             "deleted_at": None,
         }
@@ -490,6 +1047,36 @@ class TestMarkComplete(TestTaskBase):
         assert exc_info.value.status_code == 404
         assert exc_info.value.detail == "Task not found"
 
+    @pytest.mark.asyncio
+    async def test_mark_complete_return_minimal(
+        self, mocker, mock_user, mock_now, mock_task_stats
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = {
+            "_id": ObjectId("507f1f77bcf86cd799439011"),
+            "completed_at": None,
+        }
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        result = await mark_complete(
+            "507f1f77bcf86cd799439011", mock_user, prefer="return=minimal"
+        )
+
+        # Assert
+        assert result.status_code == 204
+        call_args = mock_collection.find_one_and_update.call_args
+        assert call_args.kwargs["projection"] == {"completed_at": True}
+        update_doc = call_args[0][1]["$set"]
+        assert update_doc["completed_at"] == mock_now
+        mock_task_stats.record_update.assert_awaited_once_with(
+            1, mock_collection.find_one_and_update.return_value, update_doc
+        )
+
 
 class TestMarkUncomplete(TestTaskBase):
     """Test cases for mark_uncomplete endpoint"""
@@ -545,3 +1132,832 @@ class TestMarkUncomplete(TestTaskBase):
 
         assert exc_info.value.status_code == 404
         assert exc_info.value.detail == "Task not found"
+
+    @pytest.mark.asyncio
+    async def test_mark_uncomplete_return_minimal(
+        self, mocker, mock_user, mock_now, mock_task_stats
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one_and_update.return_value = {
+            "_id": ObjectId("507f1f77bcf86cd799439011"),
+            "completed_at": datetime(2023, 1, 1, tzinfo=UTC),
+        }
+
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        result = await mark_uncomplete(
+            "507f1f77bcf86cd799439011", mock_user, prefer="return=minimal"
+        )
+
+        # Assert
+        assert result.status_code == 204
+        call_args = mock_collection.find_one_and_update.call_args
+        assert call_args.kwargs["projection"] == {"completed_at": True}
+        update_doc = call_args[0][1]["$set"]
+        assert update_doc["completed_at"] is None
+        mock_task_stats.record_update.assert_awaited_once_with(
+            1, mock_collection.find_one_and_update.return_value, update_doc
+        )
+
+
+class TestMoveTask(TestTaskBase):
+    """Test cases for move_task endpoint"""
+
+    TASK_ID = ObjectId("507f1f77bcf86cd799439011")
+    PREVIOUS_ID = "507f1f77bcf86cd799439012"
+    NEXT_ID = "507f1f77bcf86cd799439013"
+
+    @pytest.fixture
+    def mock_collection(self, mocker):
+        collection = mocker.AsyncMock()
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=collection)
+        return collection
+
+    @staticmethod
+    def set_ranks(collection, ranks):
+        async def find_one(query, projection=None):
+            rank = ranks.get(str(query["_id"]))
+            return {"_id": query["_id"], "rank": rank} if rank else None
+
+        collection.find_one.side_effect = find_one
+
+    @pytest.mark.asyncio
+    async def test_move_between_two_tasks_writes_one_document(
+        self, mock_user, mock_collection
+    ):
+        # Arrange
+        self.set_ranks(mock_collection, {self.PREVIOUS_ID: "A", self.NEXT_ID: "C"})
+
+        # Act
+        result = await move_task(
+            TaskMove(previous_id=self.PREVIOUS_ID, next_id=self.NEXT_ID),
+            self.TASK_ID,
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        assert result.status_code == 204
+        mock_collection.update_one.assert_called_once()
+        query, update = mock_collection.update_one.call_args[0]
+        assert query["_id"] == self.TASK_ID
+        assert update == {"$set": {"rank": "B"}}
+
+    @pytest.mark.asyncio
+    async def test_move_after_task_uses_its_current_follower(
+        self, mocker, mock_user, mock_collection
+    ):
+        # Arrange
+        self.set_ranks(mock_collection, {self.PREVIOUS_ID: "A"})
+        mock_neighbour = mocker.patch(
+            "app.routers.tasks.task_ranking.neighbour_rank", return_value="A1"
+        )
+
+        # Act
+        await move_task(
+            TaskMove(previous_id=self.PREVIOUS_ID),
+            self.TASK_ID,
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        mock_neighbour.assert_awaited_once_with(
+            1, "A", following=True, exclude=self.TASK_ID
+        )
+        rank = mock_collection.update_one.call_args[0][1]["$set"]["rank"]
+        assert "A" < rank < "A1"
+
+    @pytest.mark.asyncio
+    async def test_move_with_neighbours_out_of_order(self, mock_user, mock_collection):
+        # Arrange
+        self.set_ranks(mock_collection, {self.PREVIOUS_ID: "C", self.NEXT_ID: "A"})
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await move_task(
+                TaskMove(previous_id=self.PREVIOUS_ID, next_id=self.NEXT_ID),
+                self.TASK_ID,
+                mock_user,
+            )
+        assert exc_info.value.status_code == 409
+        mock_collection.update_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_move_relative_to_missing_task(self, mock_user, mock_collection):
+        # Arrange
+        self.set_ranks(mock_collection, {})
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await move_task(TaskMove(next_id=self.NEXT_ID), self.TASK_ID, mock_user)
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "move", [TaskMove(), TaskMove(previous_id="507f1f77bcf86cd799439011")]
+    )
+    async def test_move_requires_another_task(self, mock_user, mock_collection, move):
+        with pytest.raises(HTTPException) as exc_info:
+            await move_task(move, self.TASK_ID, mock_user)
+        assert exc_info.value.status_code == 422
+
+
+class TestListOccurrences(TestTaskBase):
+    """Test cases for list_occurrences endpoint"""
+
+    SERIES_ID = ObjectId("507f1f77bcf86cd799439011")
+    START = datetime(2023, 1, 1, tzinfo=UTC)
+
+    @pytest.fixture
+    def mock_collection(self, mocker):
+        collection = mocker.MagicMock()
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=collection)
+        return collection
+
+    @staticmethod
+    def cursors(mocker, *results):
+        cursors = []
+        for docs in results:
+            cursor = mocker.MagicMock()
+            cursor.__aiter__.return_value = docs
+            cursors.append(cursor)
+        return cursors
+
+    @pytest.fixture
+    def series(self):
+        return {
+            "_id": self.SERIES_ID,
+            "user_id": 1,
+            "title": "Stand-up",
+            "tags": ["work"],
+            "recurrence": "FREQ=DAILY",
+            "due_at": datetime(2022, 12, 1, 9, 0),
+            "created_at": datetime(2022, 11, 1),
+        }
+
+    @pytest.mark.asyncio
+    async def test_expands_only_the_requested_range(
+        self, mocker, mock_user, mock_collection, series
+    ):
+        # Arrange
+        mock_collection.find.side_effect = self.cursors(mocker, [series], [])
+
+        # Act
+        result = await list_occurrences(
+            self.START, self.START + timedelta(days=3), mock_user
+        )
+
+        # Assert
+        assert [o.occurrence_at.day for o in result.occurrences] == [1, 2, 3]
+        assert all(o.id is None and o.title == "Stand-up" for o in result.occurrences)
+        series_query = mock_collection.find.call_args_list[0][0][0]
+        assert series_query["recurrence"] == {"$type": "string"}
+        stored_query = mock_collection.find.call_args_list[1][0][0]
+        assert stored_query["series_id"] == {"$in": [self.SERIES_ID]}
+
+    @pytest.mark.asyncio
+    async def test_merges_stored_occurrences(
+        self, mocker, mock_user, mock_collection, series
+    ):
+        # Arrange
+        done_id = ObjectId("507f1f77bcf86cd799439012")
+        stored = [
+            {
+                "_id": done_id,
+                "series_id": self.SERIES_ID,
+                "occurrence_at": datetime(2023, 1, 1, 9, 0),
+                "title": "Stand-up (short)",
+                "completed_at": datetime(2023, 1, 1, 9, 15),
+            },
+            {
+                "_id": ObjectId("507f1f77bcf86cd799439013"),
+                "series_id": self.SERIES_ID,
+                "occurrence_at": datetime(2023, 1, 2, 9, 0),
+                "title": "Stand-up",
+                "deleted_at": datetime(2023, 1, 1),
+            },
+        ]
+        mock_collection.find.side_effect = self.cursors(mocker, [series], stored)
+
+        # Act
+        result = await list_occurrences(
+            self.START, self.START + timedelta(days=3), mock_user
+        )
+
+        # Assert
+        assert [o.occurrence_at.day for o in result.occurrences] == [1, 3]
+        first = result.occurrences[0]
+        assert first.id == str(done_id)
+        assert first.title == "Stand-up (short)"
+        assert first.completed_at is not None
+        assert result.occurrences[1].completed_at is None
+
+    @pytest.mark.asyncio
+    async def test_range_is_bounded(self, mock_user, mock_collection):
+        with pytest.raises(HTTPException) as exc_info:
+            await list_occurrences(
+                self.START, self.START + timedelta(days=400), mock_user
+            )
+        assert exc_info.value.status_code == 422
+        mock_collection.find.assert_not_called()
+
+
+class TestUpdateOccurrence(TestTaskBase):
+    """Test cases for update_occurrence endpoint"""
+
+    SERIES_ID = ObjectId("507f1f77bcf86cd799439011")
+    OCCURRENCE_ID = ObjectId("507f1f77bcf86cd799439012")
+    OCCURRENCE_AT = datetime(2023, 1, 2, 9, 0, tzinfo=UTC)
+
+    @pytest.fixture
+    def mock_collection(self, mocker):
+        collection = mocker.AsyncMock()
+        collection.find_one.return_value = {
+            "_id": self.SERIES_ID,
+            "user_id": 1,
+            "title": "Stand-up",
+            "tags": ["work"],
+            "recurrence": "FREQ=DAILY",
+            "due_at": datetime(2022, 12, 1, 9, 0),
+            "created_at": datetime(2022, 11, 1),
+        }
+        collection.find_one_and_update.return_value = {
+            "_id": self.OCCURRENCE_ID,
+            "completed_at": None,
+            "tags": ["work"],
+        }
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=collection)
+        return collection
+
+    @pytest.mark.asyncio
+    async def test_completing_materializes_the_occurrence(
+        self, mock_user, mock_collection, mock_task_stats
+    ):
+        # Arrange
+        mock_collection.update_one.return_value.upserted_id = self.OCCURRENCE_ID
+
+        # Act
+        result = await update_occurrence(
+            TaskUpdate(completed=True),
+            self.OCCURRENCE_AT,
+            self.SERIES_ID,
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        assert result.status_code == 204
+        query, update = mock_collection.update_one.call_args[0]
+        assert query == {
+            "user_id": 1,
+            "series_id": self.SERIES_ID,
+            "occurrence_at": self.OCCURRENCE_AT,
+        }
+        assert update["$setOnInsert"]["title"] == "Stand-up"
+        mock_task_stats.record_created.assert_awaited_once_with(1, ["work"])
+        applied = mock_collection.find_one_and_update.call_args[0]
+        assert applied[0]["_id"] == self.OCCURRENCE_ID
+        assert applied[1]["$set"]["completed_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_existing_occurrence_is_reused(
+        self, mock_user, mock_collection, mock_task_stats
+    ):
+        # Arrange
+        mock_collection.update_one.return_value.upserted_id = None
+        mock_collection.find_one.side_effect = [
+            mock_collection.find_one.return_value,
+            {"_id": self.OCCURRENCE_ID},
+        ]
+
+        # Act
+        await update_occurrence(
+            TaskUpdate(title="Short stand-up"),
+            self.OCCURRENCE_AT,
+            self.SERIES_ID,
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        mock_task_stats.record_created.assert_not_called()
+        query = mock_collection.update_one.call_args_list[-1][0][0]
+        assert query["_id"] == self.OCCURRENCE_ID
+
+    @pytest.mark.asyncio
+    async def test_moment_outside_the_rule(self, mock_user, mock_collection):
+        with pytest.raises(HTTPException) as exc_info:
+            await update_occurrence(
+                TaskUpdate(completed=True),
+                self.OCCURRENCE_AT + timedelta(hours=1),
+                self.SERIES_ID,
+                mock_user,
+            )
+        assert exc_info.value.status_code == 404
+        mock_collection.update_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_task_without_recurrence(self, mock_user, mock_collection):
+        # Arrange
+        mock_collection.find_one.return_value = None
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await update_occurrence(
+                TaskUpdate(completed=True),
+                self.OCCURRENCE_AT,
+                self.SERIES_ID,
+                mock_user,
+            )
+        assert exc_info.value.status_code == 404
+        assert exc_info.value.detail == "Recurring task not found"
+
+
+class TestColdTasks(TestTaskBase):
+    """Test cases for reading and writing tasks in the cold tier"""
+
+    TASK_ID = ObjectId("507f1f77bcf86cd799439011")
+
+    @staticmethod
+    def task_doc(task_id, created_at, **fields):
+        return {
+            "_id": task_id,
+            "user_id": 1,
+            "title": f"Task {task_id}",
+            "created_at": created_at,
+            "updated_at": created_at,
+            "deleted_at": None,
+            **fields,
+        }
+
+    @pytest.mark.asyncio
+    async def test_list_with_old_range_merges_cold_tasks(
+        self, mocker, mock_user, mock_task_tiering
+    ):
+        # Arrange
+        hot = self.task_doc(ObjectId(), datetime(2022, 3, 1))
+        cold = [
+            self.task_doc(ObjectId(), datetime(2022, 5, 1)),
+            self.task_doc(ObjectId(), datetime(2022, 1, 1)),
+        ]
+        mock_task_tiering["list_cold"].return_value = (cold, 2)
+        mock_collection = mocker.MagicMock()
+        mock_cursor = mocker.AsyncMock()
+        mock_cursor.__aiter__.return_value = iter([hot])
+        mock_collection.find.return_value.sort.return_value.limit.return_value = (
+            mock_cursor
+        )
+        mock_collection.count_documents = mocker.AsyncMock(return_value=1)
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        created_from = datetime(2022, 1, 1, tzinfo=UTC)
+
+        # Act
+        response = await list_tasks(
+            page=1, size=2, created_from=created_from, current_user=mock_user
+        )
+        result = TaskList.model_validate_json(response.body)
+
+        # Assert
+        assert [task.id for task in result.tasks] == [
+            str(cold[0]["_id"]),
+            str(hot["_id"]),
+        ]
+        assert result.total == 3
+        mock_task_tiering["list_cold"].assert_awaited_once_with(
+            1, created_from, None, None, "created", 2
+        )
+        query = mock_collection.find.call_args[0][0]
+        assert query["created_at"] == {"$gte": created_from}
+
+    @pytest.mark.asyncio
+    async def test_list_without_range_reads_hot_tier_only(
+        self, mocker, mock_user, mock_task_tiering
+    ):
+        # Arrange
+        mock_collection = mocker.MagicMock()
+        mock_cursor = mocker.AsyncMock()
+        mock_cursor.__aiter__.return_value = iter([])
+        mock_collection.find.return_value.sort.return_value.skip.return_value.limit.return_value = (
+            mock_cursor
+        )
+        mock_collection.count_documents = mocker.AsyncMock(return_value=0)
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+
+        # Act
+        await list_tasks(page=1, size=10, current_user=mock_user)
+
+        # Assert
+        mock_task_tiering["list_cold"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_cold_task(self, mocker, mock_user, mock_task_tiering):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.find_one.return_value = None
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mock_task_tiering["find_cold"].return_value = self.task_doc(
+            self.TASK_ID, datetime(2022, 1, 1), completed_at=datetime(2022, 1, 2)
+        )
+
+        # Act
+        result = await get_task(self.TASK_ID, mock_user)
+
+        # Assert
+        assert result.id == str(self.TASK_ID)
+        mock_task_tiering["find_cold"].assert_awaited_once_with(1, self.TASK_ID)
+
+    @pytest.mark.asyncio
+    async def test_update_thaws_cold_task_first(
+        self, mocker, mock_user, mock_task_tiering
+    ):
+        # Arrange
+        mock_collection = mocker.AsyncMock()
+        mock_collection.update_one.side_effect = [
+            mocker.Mock(matched_count=0),
+            mocker.Mock(matched_count=1),
+        ]
+        mocker.patch(
+            "app.routers.tasks.get_tasks_collection", return_value=mock_collection
+        )
+        mock_task_tiering["thaw"].return_value = True
+
+        # Act
+        result = await update_task(
+            TaskUpdate(title="Renamed"),
+            self.TASK_ID,
+            mock_user,
+            prefer="return=minimal",
+        )
+
+        # Assert
+        assert result.status_code == 204
+        mock_task_tiering["thaw"].assert_awaited_once_with(1, self.TASK_ID)
+        assert mock_collection.update_one.await_count == 2
+
+
+class TestListTrash(TestTaskBase):
+    """Test cases for list_trash endpoint"""
+
+    @pytest.fixture
+    def mock_sources(self, mocker):
+        hot = mocker.MagicMock()
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=hot)
+        mock_archived = mocker.patch("app.routers.tasks.task_archive.find_archived")
+
+        def fill(hot_docs, archived_docs):
+            hot.find.return_value.sort.return_value.limit.return_value.__aiter__.return_value = (
+                hot_docs
+            )
+            mock_archived.return_value.__aiter__.return_value = archived_docs
+
+        return hot, mock_archived, fill
+
+    @staticmethod
+    def deleted(day, task_id):
+        return {
+            "_id": ObjectId(task_id),
+            "user_id": 1,
+            "title": "Gone",
+            "created_at": datetime(2022, 12, 1),
+            "updated_at": datetime(2022, 12, 1),
+            "deleted_at": datetime(2023, 1, day),
+        }
+
+    @pytest.mark.asyncio
+    async def test_merges_trash_and_archive_latest_first(self, mock_user, mock_sources):
+        # Arrange
+        hot, mock_archived, fill = mock_sources
+        fill(
+            [
+                self.deleted(9, "507f1f77bcf86cd799439019"),
+                self.deleted(5, "507f1f77bcf86cd799439015"),
+            ],
+            [self.deleted(7, "507f1f77bcf86cd799439017")],
+        )
+
+        # Act
+        result = await list_trash(size=2, current_user=mock_user)
+
+        # Assert
+        assert [task.deleted_at.day for task in result.tasks] == [9, 7]
+        assert result.next_cursor == (
+            "2023-01-07T00:00:00+00:00_507f1f77bcf86cd799439017"
+        )
+        query = hot.find.call_args[0][0]
+        assert query == {"user_id": 1, "deleted_at": {"$type": "date"}}
+        assert mock_archived.call_args[0][0] == query
+
+    @pytest.mark.asyncio
+    async def test_cursor_continues_after_last_entry(self, mock_user, mock_sources):
+        # Arrange
+        hot, _, fill = mock_sources
+        fill([self.deleted(5, "507f1f77bcf86cd799439015")], [])
+
+        # Act
+        result = await list_trash(
+            size=2,
+            cursor="2023-01-07T00:00:00+00:00_507f1f77bcf86cd799439017",
+            current_user=mock_user,
+        )
+
+        # Assert
+        assert result.next_cursor is None
+        deleted_at = datetime(2023, 1, 7, tzinfo=UTC)
+        assert hot.find.call_args[0][0]["$or"] == [
+            {"deleted_at": {"$lt": deleted_at}},
+            {
+                "deleted_at": deleted_at,
+                "_id": {"$lt": ObjectId("507f1f77bcf86cd799439017")},
+            },
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cursor", ["garbage", "2023-01-07T00:00:00_nope"])
+    async def test_invalid_cursor(self, mock_user, mock_sources, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            await list_trash(size=2, cursor=cursor, current_user=mock_user)
+        assert exc_info.value.status_code == 400
+
+
+class TestRestoreTask(TestTaskBase):
+    """Test cases for restore_task endpoint"""
+
+    TASK_ID = ObjectId("507f1f77bcf86cd799439011")
+
+    @pytest.fixture
+    def mock_collection(self, mocker):
+        collection = mocker.AsyncMock()
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=collection)
+        return collection
+
+    @pytest.fixture
+    def restored_doc(self):
+        return {
+            "_id": self.TASK_ID,
+            "user_id": 1,
+            "title": "Back",
+            "tags": ["home"],
+            "created_at": datetime(2023, 1, 1),
+            "updated_at": datetime(2023, 1, 3),
+            "deleted_at": None,
+            "completed_at": None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_restore_from_trash(
+        self, mock_user, mock_collection, restored_doc, mock_task_stats, task_cache
+    ):
+        # Arrange
+        mock_collection.find_one_and_update.return_value = restored_doc
+
+        # Act
+        result = await restore_task(self.TASK_ID, mock_user)
+
+        # Assert
+        assert result.deleted_at is None
+        query, update = mock_collection.find_one_and_update.call_args[0]
+        assert query["deleted_at"] == {"$type": "date"}
+        assert update["$set"]["deleted_at"] is None
+        mock_task_stats.record_restored.assert_awaited_once_with(1, False, ["home"])
+        assert await task_cache.backend.get(task_cache.key(1, self.TASK_ID))
+
+    @pytest.mark.asyncio
+    async def test_restore_from_archive(
+        self, mocker, mock_user, mock_collection, restored_doc
+    ):
+        # Arrange
+        mock_collection.find_one_and_update.side_effect = [None, restored_doc]
+        mock_restore = mocker.patch(
+            "app.routers.tasks.task_archive.restore", return_value={"_id": 1}
+        )
+
+        # Act
+        result = await restore_task(self.TASK_ID, mock_user)
+
+        # Assert
+        assert result.id == str(self.TASK_ID)
+        mock_restore.assert_awaited_once_with(1, self.TASK_ID)
+        assert mock_collection.find_one_and_update.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_restore_unknown_task(
+        self, mocker, mock_user, mock_collection, mock_task_stats
+    ):
+        # Arrange
+        mock_collection.find_one_and_update.return_value = None
+        mocker.patch("app.routers.tasks.task_archive.restore", return_value=None)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await restore_task(self.TASK_ID, mock_user)
+        assert exc_info.value.status_code == 404
+        mock_task_stats.record_restored.assert_not_called()
+
+
+class TestBulkDeleteTasks(TestTaskBase):
+    """Test cases for bulk_delete_tasks endpoint"""
+
+    @pytest.fixture
+    def mock_collection(self, mocker):
+        collection = mocker.AsyncMock()
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=collection)
+        return collection
+
+    @pytest.fixture(autouse=True)
+    def mock_count_cold(self, mocker):
+        return mocker.patch("app.routers.tasks.bulk_delete.count_cold", return_value=0)
+
+    @pytest.mark.asyncio
+    async def test_cold_tasks_count_towards_the_inline_limit(
+        self, mocker, mock_user, mock_collection, mock_count_cold
+    ):
+        # Arrange
+        mocker.patch("app.routers.tasks.bulk_delete.BULK_DELETE_INLINE_LIMIT", 10)
+        mock_collection.count_documents.return_value = 4
+        mock_count_cold.return_value = 7
+        mock_submit = mocker.patch(
+            "app.routers.tasks.runner.submit",
+            return_value={"_id": ObjectId(), "kind": "bulk_delete", "status": "queued"},
+        )
+        response = Response()
+
+        # Act
+        await bulk_delete_tasks(TaskBulkDelete(completed=True), response, mock_user)
+
+        # Assert
+        assert response.status_code == 202
+        mock_count_cold.assert_awaited_once_with(1, {"completed": True}, limit=7)
+        mock_submit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_small_sets_are_deleted_inline(
+        self, mocker, mock_user, mock_collection
+    ):
+        # Arrange
+        mock_collection.count_documents.return_value = 12
+        mock_delete = mocker.patch(
+            "app.routers.tasks.bulk_delete.delete_matching", return_value=12
+        )
+        response = Response()
+
+        # Act
+        result = await bulk_delete_tasks(
+            TaskBulkDelete(completed=True), response, mock_user
+        )
+
+        # Assert
+        assert result.status == "done"
+        assert result.result == {"deleted": 12}
+        assert response.status_code == 200
+        mock_delete.assert_awaited_once_with(1, {"completed": True})
+
+    @pytest.mark.asyncio
+    async def test_large_sets_run_as_a_job(self, mocker, mock_user, mock_collection):
+        # Arrange
+        mocker.patch("app.routers.tasks.bulk_delete.BULK_DELETE_INLINE_LIMIT", 10)
+        mock_collection.count_documents.return_value = 11
+        job_id = ObjectId()
+        mock_submit = mocker.patch(
+            "app.routers.tasks.runner.submit",
+            return_value={"_id": job_id, "kind": "bulk_delete", "status": "queued"},
+        )
+        mock_delete = mocker.patch("app.routers.tasks.bulk_delete.delete_matching")
+        response = Response()
+
+        # Act
+        result = await bulk_delete_tasks(
+            TaskBulkDelete(completed=True, tag="Old"), response, mock_user
+        )
+
+        # Assert
+        assert response.status_code == 202
+        assert result.id == str(job_id)
+        assert result.status == "queued"
+        mock_submit.assert_awaited_once_with(
+            "bulk_delete", 1, {"completed": True, "tag": "old"}
+        )
+        assert mock_collection.count_documents.call_args.kwargs == {"limit": 11}
+        mock_delete.assert_not_called()
+
+    def test_conditions_are_required(self):
+        with pytest.raises(ValueError):
+            TaskBulkDelete()
+
+
+class TestGetTaskJob(TestTaskBase):
+    """Test cases for get_task_job endpoint"""
+
+    @pytest.mark.asyncio
+    async def test_job_progress(self, mocker, mock_user):
+        job_id = ObjectId()
+        mock_get = mocker.patch(
+            "app.routers.tasks.runner.get",
+            return_value={
+                "_id": job_id,
+                "kind": "bulk_delete",
+                "status": "running",
+                "progress": {"deleted": 500},
+            },
+        )
+
+        result = await get_task_job(job_id, mock_user)
+
+        assert result.progress == {"deleted": 500}
+        mock_get.assert_awaited_once_with(1, job_id)
+
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, mocker, mock_user):
+        mocker.patch("app.routers.tasks.runner.get", return_value=None)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_task_job(ObjectId(), mock_user)
+        assert exc_info.value.status_code == 404
+
+
+class TestLookupTasks(TestTaskBase):
+    """Test cases for lookup_tasks endpoint"""
+
+    HOT_ID = ObjectId("507f1f77bcf86cd799439011")
+    COLD_ID = ObjectId("507f1f77bcf86cd799439012")
+    GONE_ID = ObjectId("507f1f77bcf86cd799439013")
+
+    @pytest.fixture
+    def mock_collection(self, mocker):
+        collection = mocker.MagicMock()
+        mocker.patch("app.routers.tasks.get_tasks_collection", return_value=collection)
+        return collection
+
+    @staticmethod
+    def task_doc(task_id):
+        return {
+            "_id": task_id,
+            "user_id": 1,
+            "title": f"Task {task_id}",
+            "created_at": datetime(2022, 1, 1),
+            "updated_at": datetime(2022, 1, 1),
+            "deleted_at": None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_returns_found_in_order_and_missing(
+        self, mock_user, mock_collection, mock_task_tiering
+    ):
+        # Arrange
+        mock_collection.find.return_value.__aiter__.return_value = [
+            self.task_doc(self.HOT_ID)
+        ]
+        mock_task_tiering["find_cold_many"].return_value = [self.task_doc(self.COLD_ID)]
+        lookup = TaskLookup(
+            ids=[
+                str(self.COLD_ID),
+                "not-an-id",
+                str(self.HOT_ID),
+                str(self.GONE_ID),
+                str(self.HOT_ID),
+            ]
+        )
+
+        # Act
+        result = await lookup_tasks(lookup, mock_user)
+
+        # Assert
+        assert [task.id for task in result.tasks] == [
+            str(self.COLD_ID),
+            str(self.HOT_ID),
+        ]
+        assert result.missing == ["not-an-id", str(self.GONE_ID)]
+        mock_collection.find.assert_called_once_with(
+            {
+                "_id": {"$in": [self.COLD_ID, self.HOT_ID, self.GONE_ID]},
+                "user_id": 1,
+                "deleted_at": None,
+            }
+        )
+        mock_task_tiering["find_cold_many"].assert_awaited_once_with(
+            1, [self.COLD_ID, self.GONE_ID]
+        )
+
+    @pytest.mark.asyncio
+    async def test_only_invalid_ids_skip_the_query(self, mock_user, mock_collection):
+        result = await lookup_tasks(TaskLookup(ids=["nope"]), mock_user)
+
+        assert result.tasks == []
+        assert result.missing == ["nope"]
+        mock_collection.find.assert_not_called()
+
+    def test_ids_are_bounded(self):
+        with pytest.raises(ValueError):
+            TaskLookup(ids=[])
+        with pytest.raises(ValueError):
+            TaskLookup(ids=[str(ObjectId()) for _ in range(101)])
@@ -89,7 +89,9 @@ def test_login_for_access_token_success(mocker, mock_db, mock_user, mock_token):
     crud.authenticate_user.assert_called_once_with(
         mock_db, "test@example.com", "password"
     )
-    crud.create_access_token.assert_called_once_with(data={"sub": "test@example.com"})
+    crud.create_access_token.assert_called_once_with(
+        data={"sub": "test@example.com", "uid": 1}
+    )
     assert response == mock_token
 
 
@@ -125,3 +127,37 @@ def test_login_for_access_token_empty_username(mocker, mock_db):
 
     assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
     crud.authenticate_user.assert_called_once_with(mock_db, "", "password")
+
+
+@pytest.mark.asyncio
+async def test_delete_account(mocker, mock_db, mock_user):
+    """Test account deletion removes the user and schedules the task purge"""
+    # Arrange
+    mocker.patch("app.crud.delete_user")
+    schedule = mocker.patch("app.account_purge.schedule", new=mocker.AsyncMock())
+
+    # Act
+    response = await router.routes[2].endpoint(current_user=mock_user, db=mock_db)
+
+    # Assert
+    crud.delete_user.assert_called_once_with(mock_db, mock_user)
+    schedule.assert_awaited_once_with(1)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_delete_account_purge_not_scheduled(mocker, mock_db, mock_user):
+    """Test the account is still deleted when the purge cannot be queued"""
+    # Arrange
+    mocker.patch("app.crud.delete_user")
+    mocker.patch(
+        "app.account_purge.schedule",
+        new=mocker.AsyncMock(side_effect=Exception("Mongo down")),
+    )
+
+    # Act
+    response = await router.routes[2].endpoint(current_user=mock_user, db=mock_db)
+
+    # Assert
+    crud.delete_user.assert_called_once_with(mock_db, mock_user)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
@@ -0,0 +1,192 @@
+# tests/unit/test_account_purge_unit.py
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from app.account_purge import (
+    JOB_KIND,
+    PURGED_COLLECTIONS,
+    purge_chunk,
+    purge_user,
+    run_job,
+    schedule_orphans,
+    throttle,
+)
+
+
+@pytest.fixture
+def collections(mocker):
+    """One mock per collection, each holding no documents of the user"""
+    mocks = {}
+
+    def collection(name):
+        if name not in mocks:
+            mock = mocker.MagicMock()
+            mock.delete_many = AsyncMock()
+            mock.delete_one = AsyncMock()
+            mock.find_one = AsyncMock(return_value=None)
+            mock.distinct = AsyncMock(return_value=[])
+            mock.find.return_value.limit.return_value.to_list = AsyncMock(
+                return_value=[]
+            )
+            mocks[name] = mock
+        return mocks[name]
+
+    mocker.patch("app.account_purge.get_collection", side_effect=collection)
+    mocker.patch(
+        "app.account_purge.get_tasks_collection",
+        side_effect=lambda: collection("tasks"),
+    )
+    return collection
+
+
+@pytest.fixture(autouse=True)
+def mock_hooks(mocker):
+    return {
+        "task_cache": mocker.patch("app.account_purge.task_cache", new=AsyncMock()),
+        "list_cache": mocker.patch("app.account_purge.list_cache", new=AsyncMock()),
+        "bus": mocker.patch("app.account_purge.bus", new=AsyncMock()),
+        "sleep": mocker.patch("app.account_purge.asyncio.sleep", new=AsyncMock()),
+    }
+
+
+def holding(collection, *chunks):
+    collection.find.return_value.limit.return_value.to_list = AsyncMock(
+        side_effect=[*chunks, []]
+    )
+    collection.delete_many.side_effect = [
+        type("Result", (), {"deleted_count": len(chunk)}) for chunk in chunks
+    ]
+
+
+class TestThrottle:
+    """Test cases for pausing between chunks"""
+
+    def test_fast_chunk_pauses_the_minimum(self, mocker):
+        mocker.patch("app.account_purge.ACCOUNT_PURGE_PAUSE_SECONDS", 0.2)
+        assert throttle(0.01) == 0.2
+
+    def test_slow_chunk_backs_off(self, mocker):
+        mocker.patch("app.account_purge.ACCOUNT_PURGE_PAUSE_SECONDS", 0.2)
+        mocker.patch("app.account_purge.ACCOUNT_PURGE_LOAD_FACTOR", 2)
+        assert throttle(1.5) == 3.0
+
+
+class TestPurgeChunk:
+    """Test cases for deleting one chunk of a user's documents"""
+
+    @pytest.mark.asyncio
+    async def test_deletes_tasks_and_invalidates_caches(self, collections, mock_hooks):
+        # Arrange
+        ids = [ObjectId(), ObjectId()]
+        holding(collections("tasks"), [{"_id": task_id} for task_id in ids])
+
+        # Act
+        deleted = await purge_chunk("tasks", 1)
+
+        # Assert
+        assert deleted == 2
+        collections("tasks").delete_many.assert_awaited_once_with(
+            {"user_id": 1, "_id": {"$in": ids}}
+        )
+        assert mock_hooks["task_cache"].invalidate.await_count == 2
+        mock_hooks["bus"].publish.assert_awaited_once_with(
+            "task", user_id=1, task_ids=[str(task_id) for task_id in ids]
+        )
+
+    @pytest.mark.asyncio
+    async def test_nothing_left(self, collections):
+        deleted = await purge_chunk("tasks", 1)
+
+        assert deleted == 0
+        collections("tasks").delete_many.assert_not_awaited()
+
+
+class TestPurgeUser:
+    """Test cases for purging everything of a user"""
+
+    @pytest.mark.asyncio
+    async def test_purges_every_collection_in_throttled_chunks(
+        self, collections, mock_hooks
+    ):
+        # Arrange
+        holding(
+            collections("tasks"),
+            [{"_id": ObjectId()}, {"_id": ObjectId()}],
+            [{"_id": ObjectId()}],
+        )
+        holding(collections("tasks_archive"), [{"_id": ObjectId()}])
+        progress = AsyncMock()
+
+        # Act
+        purged = await purge_user(1, {}, progress)
+
+        # Assert
+        assert purged == {"tasks": 3, "tasks_archive": 1}
+        progress.assert_any_await(tasks=2)
+        progress.assert_any_await(tasks=3)
+        assert mock_hooks["sleep"].await_count == 3
+        for name in PURGED_COLLECTIONS:
+            collections(name).find.assert_called_with(
+                {"user_id": 1}, projection={"_id": True}
+            )
+        collections("task_stats").delete_one.assert_awaited_once_with({"_id": 1})
+        collections("task_analytics").delete_one.assert_awaited_once_with({"_id": 1})
+        mock_hooks["list_cache"].bump.assert_awaited_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_resumed_job_continues_counts(self, collections):
+        # Arrange
+        holding(collections("tasks"), [{"_id": ObjectId()}])
+        job = {"user_id": 1, "progress": {"tasks": 500}}
+        progress = AsyncMock()
+
+        # Act
+        result = await run_job(job, progress)
+
+        # Assert
+        assert result == {"tasks": 501}
+        progress.assert_awaited_once_with(tasks=501)
+
+
+class TestScheduleOrphans:
+    """Test cases for queueing purges of users without an account"""
+
+    @pytest.mark.asyncio
+    async def test_queues_users_without_account_or_pending_purge(
+        self, mocker, collections
+    ):
+        # Arrange
+        collections("tasks").distinct.return_value = [1, 2, 3]
+        collections("jobs").find_one.side_effect = [{"kind": JOB_KIND}, None]
+        schedule = mocker.patch("app.account_purge.schedule", new=AsyncMock())
+
+        # Act
+        queued = await schedule_orphans(lambda user_ids: {1} & set(user_ids))
+
+        # Assert
+        assert queued == 1
+        schedule.assert_awaited_once_with(3)
+
+    @pytest.mark.asyncio
+    async def test_accounts_are_checked_after_reading_task_owners(
+        self, mocker, collections
+    ):
+        # Arrange
+        collections("tasks").distinct.return_value = [1, 2]
+        schedule = mocker.patch("app.account_purge.schedule", new=AsyncMock())
+        checked = []
+
+        def accounts(user_ids):
+            # User 2 signed up and created a task before this check
+            checked.append(collections("tasks").distinct.await_count)
+            return set(user_ids)
+
+        # Act
+        queued = await schedule_orphans(accounts)
+
+        # Assert
+        assert queued == 0
+        assert checked == [1]
+        schedule.assert_not_awaited()
@@ -0,0 +1,194 @@
+# tests/unit/test_bulk_delete_unit.py
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from app.bulk_delete import (
+    cold_match,
+    count_cold,
+    delete_chunk,
+    delete_matching,
+    match_query,
+    run_job,
+)
+
+BEFORE = datetime(2023, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def mock_tasks(mocker):
+    collection = mocker.MagicMock()
+    collection.update_many = mocker.AsyncMock()
+    mocker.patch("app.bulk_delete.get_tasks_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture(autouse=True)
+def mock_hooks(mocker):
+    return {
+        "task_stats": mocker.patch("app.bulk_delete.task_stats", new=AsyncMock()),
+        "task_analytics": mocker.patch(
+            "app.bulk_delete.task_analytics", new=AsyncMock()
+        ),
+        "task_cache": mocker.patch("app.bulk_delete.task_cache", new=AsyncMock()),
+        "list_cache": mocker.patch("app.bulk_delete.list_cache", new=AsyncMock()),
+        "bus": mocker.patch("app.bulk_delete.bus", new=AsyncMock()),
+        "task_tiering": mocker.patch("app.bulk_delete.task_tiering", new=AsyncMock()),
+    }
+
+
+def matching(mock_tasks, *chunks):
+    mock_tasks.find.return_value.limit.return_value.to_list = AsyncMock(
+        side_effect=list(chunks)
+    )
+
+
+class TestMatchQuery:
+    """Test cases for translating bulk delete conditions"""
+
+    def test_completed_before(self):
+        assert match_query(1, {"completed": True, "completed_before": BEFORE}) == {
+            "user_id": 1,
+            "deleted_at": None,
+            "completed_at": {"$ne": None, "$lt": BEFORE},
+        }
+
+    def test_open_tasks_with_tag_created_before(self):
+        assert match_query(
+            1, {"completed": False, "created_before": BEFORE, "tag": "old"}
+        ) == {
+            "user_id": 1,
+            "deleted_at": None,
+            "completed_at": {"$eq": None},
+            "created_at": {"$lt": BEFORE},
+            "tags": "old",
+        }
+
+
+class TestColdMatch:
+    """Test cases for reaching tasks moved to monthly buckets"""
+
+    def test_bucket_entries_match_task_conditions(self):
+        assert cold_match(
+            1, {"completed": True, "created_before": BEFORE, "tag": "old"}
+        ) == (
+            {
+                "completed_at": {"$ne": None},
+                "created_at": {"$lt": BEFORE},
+                "tags": "old",
+            },
+            {"$lt": BEFORE},
+        )
+
+    def test_open_tasks_are_never_cold(self):
+        assert cold_match(1, {"completed": False, "tag": "old"}) is None
+
+    @pytest.mark.asyncio
+    async def test_count_cold(self, mock_hooks):
+        mock_hooks["task_tiering"].count_matching.return_value = 3
+
+        assert await count_cold(1, {"tag": "old"}, limit=5) == 3
+        mock_hooks["task_tiering"].count_matching.assert_awaited_once_with(
+            1, {"tags": "old"}, {}, limit=5
+        )
+
+
+class TestDeleteChunk:
+    """Test cases for deleting one chunk of matching tasks"""
+
+    @pytest.mark.asyncio
+    async def test_deletes_chunk_and_updates_hooks(self, mock_tasks, mock_hooks):
+        # Arrange
+        docs = [
+            {"_id": ObjectId(), "created_at": BEFORE, "completed_at": BEFORE},
+            {"_id": ObjectId(), "created_at": BEFORE, "completed_at": None},
+        ]
+        matching(mock_tasks, docs)
+        mock_tasks.update_many.return_value.modified_count = 2
+        query = match_query(1, {"completed": True})
+
+        # Act
+        deleted = await delete_chunk(1, query)
+
+        # Assert
+        assert deleted == 2
+        ids = [doc["_id"] for doc in docs]
+        selector, update = mock_tasks.update_many.call_args[0]
+        assert selector == {**query, "_id": {"$in": ids}}
+        assert "deleted_at" in update["$set"]
+        mock_hooks["task_stats"].record_bulk_deleted.assert_awaited_once_with(1, docs)
+        assert mock_hooks["task_cache"].invalidate.await_count == 2
+        mock_hooks["list_cache"].bump.assert_awaited_once_with(1)
+        mock_hooks["bus"].publish.assert_awaited_once_with(
+            "task", user_id=1, task_ids=[str(task_id) for task_id in ids]
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_changes_recompute_stats(self, mock_tasks, mock_hooks):
+        # Arrange
+        matching(mock_tasks, [{"_id": ObjectId()}, {"_id": ObjectId()}])
+        mock_tasks.update_many.return_value.modified_count = 1
+
+        # Act
+        deleted = await delete_chunk(1, match_query(1, {"completed": True}))
+
+        # Assert
+        assert deleted == 1
+        mock_hooks["task_stats"].recompute_stats.assert_awaited_once_with(1)
+        mock_hooks["task_stats"].record_bulk_deleted.assert_not_called()
+
+
+class TestDeleteMatching:
+    """Test cases for chunked deletion"""
+
+    @pytest.mark.asyncio
+    async def test_runs_chunks_until_nothing_matches(self, mocker):
+        mocker.patch("app.bulk_delete.delete_chunk", side_effect=[500, 120, 0])
+        progress = AsyncMock()
+
+        deleted = await delete_matching(1, {"completed": True}, progress)
+
+        assert deleted == 620
+        assert [call.kwargs for call in progress.await_args_list] == [
+            {"deleted": 500},
+            {"deleted": 620},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_thaws_matching_cold_tasks_before_each_chunk(
+        self, mocker, mock_hooks
+    ):
+        mocker.patch("app.bulk_delete.delete_chunk", side_effect=[3, 0])
+
+        deleted = await delete_matching(1, {"completed": True})
+
+        assert deleted == 3
+        thaw = mock_hooks["task_tiering"].thaw_matching
+        assert thaw.await_count == 2
+        assert thaw.await_args.args == (1, {"completed_at": {"$ne": None}}, {})
+
+    @pytest.mark.asyncio
+    async def test_open_tasks_skip_the_cold_tier(self, mocker, mock_hooks):
+        mocker.patch("app.bulk_delete.delete_chunk", side_effect=[0])
+
+        await delete_matching(1, {"completed": False})
+
+        mock_hooks["task_tiering"].thaw_matching.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_resumed_job_continues_count(self, mocker):
+        mocker.patch("app.bulk_delete.delete_chunk", side_effect=[100, 0])
+        mocker.patch("app.bulk_delete.asyncio.sleep")
+        progress = AsyncMock()
+        job = {
+            "user_id": 1,
+            "params": {"completed": True},
+            "progress": {"deleted": 900},
+        }
+
+        result = await run_job(job, progress)
+
+        assert result == {"deleted": 1000}
+        progress.assert_awaited_once_with(deleted=1000)
@@ -0,0 +1,229 @@
+# tests/unit/test_cache_unit.py
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app import cache
+from app.cache import (
+    ListPageCache,
+    MemoryCacheBackend,
+    NullCacheBackend,
+    TaskCache,
+    build_backend,
+)
+
+
+class TestMemoryCacheBackend:
+    """Test cases for the in-process LRU backend"""
+
+    @pytest.mark.asyncio
+    async def test_set_and_get(self):
+        backend = MemoryCacheBackend()
+
+        await backend.set("a", b"1")
+
+        assert await backend.get("a") == b"1"
+        assert await backend.get("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_entry(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+        await backend.get("a")  # "b" is now least recently used
+
+        await backend.set("c", b"3")
+
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+        assert backend.metrics()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bounded_by_total_bytes(self):
+        backend = MemoryCacheBackend(max_bytes=10)
+        await backend.set("a", b"x" * 6)
+        await backend.set("b", b"y" * 6)
+
+        assert await backend.get("a") is None
+        assert backend.metrics()["bytes"] == 6
+
+        await backend.set("huge", b"z" * 11)
+        assert await backend.get("huge") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_dropped(self, mocker):
+        backend = MemoryCacheBackend()
+        monotonic = mocker.patch("app.cache.time.monotonic", return_value=100.0)
+        await backend.set("a", b"1", ttl=10)
+
+        monotonic.return_value = 111.0
+
+        assert await backend.get("a") is None
+        assert backend.metrics()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_and_clear(self):
+        backend = MemoryCacheBackend()
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+
+        await backend.delete("a")
+        assert await backend.get("a") is None
+
+        await backend.clear()
+        assert backend.metrics() == {"entries": 0, "bytes": 0, "evictions": 0}
+
+
+class TestBuildBackend:
+    """Test cases for backend selection"""
+
+    def test_default_is_memory(self):
+        assert isinstance(build_backend("memory"), MemoryCacheBackend)
+
+    def test_none_disables_caching(self):
+        assert isinstance(build_backend("none"), NullCacheBackend)
+
+    def test_redis_without_package_falls_back(self, mocker, capsys):
+        mocker.patch.object(cache, "redis", None)
+
+        assert isinstance(build_backend("redis"), MemoryCacheBackend)
+        assert "falling back to in-memory cache" in capsys.readouterr().out
+
+
+class TestTaskCache:
+    """Test cases for the read-through task cache"""
+
+    DOC = {"_id": "t1", "title": "Task", "created_at": datetime(2023, 1, 1)}
+
+    @pytest.mark.asyncio
+    async def test_miss_loads_and_fills(self, mocker):
+        task_cache = TaskCache(MemoryCacheBackend())
+        loader = mocker.AsyncMock(return_value=self.DOC)
+
+        first = await task_cache.get_or_load(1, "t1", loader)
+        second = await task_cache.get_or_load(1, "t1", loader)
+
+        assert first == second == self.DOC
+        loader.assert_awaited_once()
+        assert task_cache.metrics()["hits"] == 1
+        assert task_cache.metrics()["misses"] == 1
+        assert task_cache.metrics()["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_missing_document_is_not_cached(self, mocker):
+        task_cache = TaskCache(MemoryCacheBackend())
+        loader = mocker.AsyncMock(return_value=None)
+
+        await task_cache.get_or_load(1, "t1", loader)
+        await task_cache.get_or_load(1, "t1", loader)
+
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_per_user(self, mocker):
+        task_cache = TaskCache(MemoryCacheBackend())
+        await task_cache.put(1, "t1", self.DOC)
+        loader = mocker.AsyncMock(return_value=None)
+
+        assert await task_cache.get_or_load(2, "t1", loader) is None
+        loader.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reload(self, mocker):
+        task_cache = TaskCache(MemoryCacheBackend())
+        await task_cache.put(1, "t1", self.DOC)
+
+        await task_cache.invalidate(1, "t1")
+        loader = mocker.AsyncMock(return_value=self.DOC)
+        await task_cache.get_or_load(1, "t1", loader)
+
+        loader.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        task_cache = TaskCache(MemoryCacheBackend())
+        loads = 0
+
+        async def loader():
+            nonlocal loads
+            loads += 1
+            await asyncio.sleep(0.01)
+            return self.DOC
+
+        await asyncio.gather(
+            *(task_cache.get_or_load(1, "t1", loader) for _ in range(3))
+        )
+
+        assert loads == 1
+        assert task_cache.metrics()["coalesced"] == 2
+
+    @pytest.mark.asyncio
+    async def test_write_during_load_prevents_stale_fill(self):
+        task_cache = TaskCache(MemoryCacheBackend())
+
+        async def loader():
+            # A write lands while the read is waiting on Mongo
+            await task_cache.invalidate(1, "t1")
+            return self.DOC
+
+        await task_cache.get_or_load(1, "t1", loader)
+
+        assert await task_cache.backend.get(TaskCache.key(1, "t1")) is None
+
+
+class TestListPageCache:
+    """Test cases for the versioned list page cache"""
+
+    @pytest.fixture
+    def page(self, mocker):
+        model = mocker.MagicMock()
+        model.model_dump_json.return_value = '{"tasks":[]}'
+        return model
+
+    @pytest.mark.asyncio
+    async def test_hit_returns_serialized_bytes(self, mocker, page):
+        list_cache = ListPageCache(MemoryCacheBackend())
+        build = mocker.AsyncMock(return_value=page)
+
+        first = await list_cache.get_or_build(1, {"page": 1, "size": 10}, build)
+        second = await list_cache.get_or_build(1, {"size": 10, "page": 1}, build)
+
+        assert first == second == b'{"tasks":[]}'
+        build.assert_awaited_once()
+        page.model_dump_json.assert_called_once_with(by_alias=True)
+
+    @pytest.mark.asyncio
+    async def test_params_are_part_of_the_key(self, mocker, page):
+        list_cache = ListPageCache(MemoryCacheBackend())
+        build = mocker.AsyncMock(return_value=page)
+
+        await list_cache.get_or_build(1, {"page": 1}, build)
+        await list_cache.get_or_build(1, {"page": 2}, build)
+        await list_cache.get_or_build(2, {"page": 1}, build)
+
+        assert build.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_bump_invalidates_all_user_pages(self, mocker, page):
+        list_cache = ListPageCache(MemoryCacheBackend())
+        build = mocker.AsyncMock(return_value=page)
+        await list_cache.get_or_build(1, {"page": 1}, build)
+        await list_cache.get_or_build(1, {"page": 2}, build)
+
+        await list_cache.bump(1)
+        await list_cache.get_or_build(1, {"page": 1}, build)
+        await list_cache.get_or_build(1, {"page": 2}, build)
+
+        assert build.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_evicted_version_starts_fresh_namespace(self, mocker, page):
+        list_cache = ListPageCache(MemoryCacheBackend())
+        build = mocker.AsyncMock(return_value=page)
+        await list_cache.get_or_build(1, {"page": 1}, build)
+
+        await list_cache.backend.delete("tasks:version:1")
+        await list_cache.get_or_build(1, {"page": 1}, build)
+
+        assert build.await_count == 2
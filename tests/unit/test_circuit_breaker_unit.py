@@ -0,0 +1,168 @@
+# tests/unit/test_circuit_breaker_unit.py
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from app.mongo import BreakerCommandListener, BreakerHeartbeatListener
+
+
+@pytest.fixture
+def clock(mocker):
+    now = SimpleNamespace(value=50.0)
+    mocker.patch("app.circuit_breaker.time.monotonic", side_effect=lambda: now.value)
+    return now
+
+
+def make_breaker(**kwargs):
+    options = {"failure_threshold": 2, "reset_timeout": 10, "half_open_max_calls": 1}
+    return CircuitBreaker("test", **{**options, **kwargs})
+
+
+class TestCircuitBreaker:
+    """Test cases for circuit breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self, clock):
+        breaker = make_breaker()
+
+        breaker.record_failure()
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_after == 10
+        assert breaker.rejected == 1
+
+    def test_success_resets_failure_count(self, clock):
+        breaker = make_breaker()
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CLOSED
+
+    def test_half_open_allows_limited_probes(self, clock):
+        breaker = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+
+        clock.value += 10
+        breaker.before_call()
+
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_probe_success_closes(self, clock):
+        breaker = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.value += 10
+        breaker.before_call()
+
+        breaker.record_success()
+
+        assert breaker.state == CLOSED
+        breaker.before_call()
+
+    def test_probe_failure_reopens(self, clock):
+        breaker = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.value += 10
+        breaker.before_call()
+
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.opened_count == 2
+
+    def test_silent_probes_are_replaced(self, clock):
+        breaker = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.value += 10
+        breaker.before_call()
+
+        clock.value += 10
+        breaker.before_call()
+
+        assert breaker.state == HALF_OPEN
+
+
+class TestGuard:
+    """Test cases for guarding blocking calls"""
+
+    def test_listed_errors_count_as_failures(self, clock):
+        breaker = make_breaker(failure_threshold=1)
+
+        @breaker.guard((OperationalError,))
+        def query():
+            raise OperationalError("SELECT 1", {}, Exception("gone away"))
+
+        with pytest.raises(OperationalError):
+            query()
+        with pytest.raises(CircuitOpenError):
+            query()
+
+    def test_other_errors_do_not_trip(self, clock):
+        breaker = make_breaker(failure_threshold=1)
+
+        @breaker.guard((OperationalError,))
+        def insert():
+            raise IntegrityError("INSERT", {}, Exception("duplicate"))
+
+        with pytest.raises(IntegrityError):
+            insert()
+
+        assert breaker.state == CLOSED
+
+
+class TestMongoListeners:
+    """Test cases for feeding pymongo events into the breaker"""
+
+    @pytest.mark.parametrize(
+        "errtype, expected_failures",
+        [
+            ("AutoReconnect", 1),
+            ("NetworkTimeout", 0),
+            ("WaitQueueTimeoutError", 0),
+            ("OperationFailure", 0),
+        ],
+    )
+    def test_command_failures(self, clock, errtype, expected_failures):
+        breaker = make_breaker(failure_threshold=5)
+        listener = BreakerCommandListener(breaker)
+
+        listener.failed(SimpleNamespace(failure={"errtype": errtype}))
+
+        assert breaker.consecutive_failures == expected_failures
+
+    def test_timeouts_neither_trip_nor_reset(self, clock):
+        breaker = make_breaker(failure_threshold=5)
+        listener = BreakerCommandListener(breaker)
+
+        listener.failed(SimpleNamespace(failure={"errtype": "AutoReconnect"}))
+        for _ in range(10):
+            listener.failed(SimpleNamespace(failure={"errtype": "NetworkTimeout"}))
+
+        assert breaker.consecutive_failures == 1
+        assert breaker.state == CLOSED
+
+    def test_heartbeat_failures_open(self, clock):
+        breaker = make_breaker()
+        listener = BreakerHeartbeatListener(breaker)
+
+        listener.failed(SimpleNamespace())
+        listener.failed(SimpleNamespace())
+
+        assert breaker.state == OPEN
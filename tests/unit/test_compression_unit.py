@@ -0,0 +1,109 @@
+# tests/unit/test_compression_unit.py
+import gzip
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, select_encoding, skip_compression
+
+LARGE_BODY = "x" * 2000
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, exclude_paths=["/raw"])
+
+    @app.get("/large", response_class=PlainTextResponse)
+    def large():
+        return LARGE_BODY
+
+    @app.get("/small", response_class=PlainTextResponse)
+    def small():
+        return "tiny"
+
+    @app.get("/raw", response_class=PlainTextResponse)
+    def raw():
+        return LARGE_BODY
+
+    @app.get(
+        "/opt-out",
+        response_class=PlainTextResponse,
+        dependencies=[Depends(skip_compression)],
+    )
+    def opt_out():
+        return LARGE_BODY
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            for i in range(5):
+                yield f"chunk-{i};".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return TestClient(app)
+
+
+class TestSelectEncoding:
+    """Test cases for Accept-Encoding negotiation"""
+
+    def test_prefers_highest_q_value(self):
+        assert select_encoding("gzip;q=0.5, br;q=1.0", ["br", "gzip"]) == "br"
+
+    def test_ignores_unsupported_codings(self):
+        assert select_encoding("br, deflate", ["gzip"]) is None
+
+    def test_wildcard_matches_supported(self):
+        assert select_encoding("*", ["gzip"]) == "gzip"
+
+    def test_zero_q_value_disables_coding(self):
+        assert select_encoding("gzip;q=0", ["gzip"]) is None
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware"""
+
+    def test_large_response_is_compressed(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(LARGE_BODY)
+        assert response.text == LARGE_BODY
+
+    def test_small_response_is_not_compressed(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "tiny"
+
+    def test_no_accept_encoding_is_not_compressed(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_excluded_path_is_not_compressed(self, client):
+        response = client.get("/raw", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_route_opt_out_is_not_compressed(self, client):
+        response = client.get("/opt-out", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == LARGE_BODY
+
+    def test_streaming_response_is_compressed_per_chunk(self, client):
+        with client.stream(
+            "GET", "/stream", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw) == b"".join(
+            f"chunk-{i};".encode() for i in range(5)
+        )
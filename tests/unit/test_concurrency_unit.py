@@ -0,0 +1,144 @@
+# tests/unit/test_concurrency_unit.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.concurrency import AdaptiveConcurrencyLimiter, ConcurrencyLimitMiddleware
+from app.deadlines import request_deadline
+
+
+@pytest.fixture
+def clock(mocker):
+    now = SimpleNamespace(value=100.0)
+    mocker.patch("app.concurrency.time.monotonic", side_effect=lambda: now.value)
+    return now
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test cases for the AIMD concurrency limit"""
+
+    def test_sheds_beyond_limit(self, clock):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+
+        admitted = [limiter.try_acquire() for _ in range(3)]
+
+        assert admitted[2] is None
+        assert limiter.in_flight == 2
+        assert limiter.shed == 1
+
+    def test_fast_requests_grow_limit(self, clock):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, latency_threshold_ms=100)
+        started_at = limiter.try_acquire()
+
+        clock.value += 0.01
+        limiter.release(started_at)
+
+        assert limiter.limit == pytest.approx(2.5)
+        assert limiter.in_flight == 0
+
+    def test_slow_requests_cut_limit_once_per_round_trip(self, clock):
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=10, latency_threshold_ms=100, backoff=0.5
+        )
+        first, second = limiter.try_acquire(), limiter.try_acquire()
+
+        clock.value += 1
+        limiter.release(first)
+        limiter.release(second)
+
+        assert limiter.limit == 5
+        assert limiter.decreases == 1
+
+    def test_limit_stays_within_bounds(self, clock):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2, backoff=0.5)
+        started_at = limiter.try_acquire()
+
+        limiter.release(started_at, overloaded=True)
+
+        assert limiter.limit == 2
+
+
+class TestConcurrencyLimitMiddleware:
+    """Test cases for load shedding in front of the routes"""
+
+    @pytest.fixture
+    def app(self):
+        app = FastAPI()
+
+        @app.get("/tasks/ok")
+        def ok():
+            return {"ok": True}
+
+        @app.get("/tasks/fail")
+        def fail():
+            raise HTTPException(500, "boom")
+
+        @app.get("/tasks/slow", dependencies=[Depends(request_deadline)])
+        async def slow():
+            await asyncio.sleep(1)
+
+        @app.get("/health")
+        def health():
+            return {"ok": True}
+
+        return app
+
+    def test_full_limiter_sheds_with_503(self, app):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        limiter.in_flight = 1
+        app.add_middleware(ConcurrencyLimitMiddleware, limiter=limiter, enabled=True)
+
+        response = TestClient(app).get("/tasks/ok")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert limiter.shed == 1
+
+    def test_other_paths_are_not_limited(self, app):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        limiter.in_flight = 1
+        app.add_middleware(ConcurrencyLimitMiddleware, limiter=limiter, enabled=True)
+
+        response = TestClient(app).get("/health")
+
+        assert response.status_code == 200
+
+    def test_server_errors_reduce_limit(self, app):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff=0.5)
+        app.add_middleware(ConcurrencyLimitMiddleware, limiter=limiter, enabled=True)
+
+        response = TestClient(app).get("/tasks/fail")
+
+        assert response.status_code == 500
+        assert limiter.limit == 5
+        assert limiter.in_flight == 0
+
+    def test_client_deadline_504s_do_not_reduce_limit(self, app):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, backoff=0.5)
+        app.add_middleware(ConcurrencyLimitMiddleware, limiter=limiter, enabled=True)
+        client = TestClient(app)
+
+        for _ in range(3):
+            response = client.get("/tasks/slow", headers={"X-Request-Timeout": "0.01"})
+            assert response.status_code == 504
+
+        assert limiter.limit == 10
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_releases_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+
+        async def app(scope, receive, send):
+            raise asyncio.CancelledError
+
+        middleware = ConcurrencyLimitMiddleware(app, limiter=limiter, enabled=True)
+
+        with pytest.raises(asyncio.CancelledError):
+            await middleware({"type": "http", "path": "/tasks"}, None, None)
+
+        assert limiter.in_flight == 0
+        assert limiter.limit == 10
@@ -48,7 +48,10 @@ class TestCrudFunctions:
 class TestGetUserByEmail(TestCrudFunctions):
     """Tests for get_user_by_email function"""
 
-    def test_get_user_by_email_found(self, mock_db_session, sample_db_user):
+    @patch("app.crud.make_transient_to_detached")
+    def test_get_user_by_email_found(
+        self, mock_make_detached, mock_db_session, sample_db_user
+    ):
         """Test getting user by email when user exists"""
         # Arrange
         email = "test@example.com"
@@ -62,7 +65,14 @@ class TestGetUserByEmail(TestCrudFunctions):
         result = crud.get_user_by_email(mock_db_session, email)
 
         # Assert
-        assert result == sample_db_user
+        assert result == mock_db_session.merge.return_value
+        # A fresh instance from the shared row, attached to this session
+        models.User.assert_called_with(
+            id=1, email=email, hashed_password="$2b$12$hashedpassword"
+        )
+        merged = mock_db_session.merge.call_args[0][0]
+        mock_make_detached.assert_called_once_with(merged)
+        assert mock_db_session.merge.call_args[1] == {"load": False}
         mock_db_session.query.assert_called_once_with(models.User)
         mock_query.filter.assert_called_once()
         mock_filter.first.assert_called_once()
@@ -181,6 +191,19 @@ class TestCreateUser(TestCrudFunctions):
         mock_db_session.commit.assert_called_once()
 
 
+class TestDeleteUser(TestCrudFunctions):
+    """Tests for delete_user function"""
+
+    def test_delete_user_success(self, mock_db_session, sample_db_user):
+        """Test the user row is deleted and committed"""
+        # Act
+        crud.delete_user(mock_db_session, sample_db_user)
+
+        # Assert
+        mock_db_session.delete.assert_called_once_with(sample_db_user)
+        mock_db_session.commit.assert_called_once()
+
+
 class TestAuthenticateUser(TestCrudFunctions):
     """Tests for authenticate_user function"""
 
@@ -512,10 +535,11 @@ class TestEnvironmentVariables(TestCrudFunctions):
 class TestCrudIntegration(TestCrudFunctions):
     """Integration tests that test multiple functions together"""
 
+    @patch("app.crud.make_transient_to_detached")
     @patch("app.crud.pwd_context")
     @patch("app.crud.models.User")
     def test_create_and_authenticate_user_flow(
-        self, mock_user_model, mock_pwd_context, mock_db_session
+        self, mock_user_model, mock_pwd_context, mock_make_detached, mock_db_session
     ):
         """Test the complete flow of creating and then authenticating a user"""
         # Arrange
@@ -539,6 +563,7 @@ class TestCrudIntegration(TestCrudFunctions):
         mock_query.filter.return_value = mock_filter
         mock_filter.first.return_value = mock_db_user
         mock_db_session.query.return_value = mock_query
+        mock_db_session.merge.side_effect = lambda user, load: user
 
         # Act - Create user
         created_user = crud.create_user(mock_db_session, user_create)
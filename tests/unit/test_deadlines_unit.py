@@ -0,0 +1,103 @@
+# tests/unit/test_deadlines_unit.py
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from pymongo.errors import ExecutionTimeout
+from sqlalchemy import create_engine, text
+
+from app import deadlines
+from app.deadlines import remaining, request_deadline, with_statement_timeout
+
+
+@pytest.fixture
+def client(mocker):
+    mocker.patch.dict(deadlines.REQUEST_TIMEOUTS, {"slow_report": 0.5}, clear=True)
+    mocker.patch.object(deadlines, "REQUEST_TIMEOUT_SECONDS", 0.05)
+    app = FastAPI(dependencies=[Depends(request_deadline)])
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+
+    @app.get("/budget")
+    async def budget():
+        return {"remaining": remaining()}
+
+    @app.get("/report")
+    async def slow_report():
+        return {"remaining": remaining()}
+
+    @app.get("/mongo-timeout")
+    async def mongo_timeout():
+        raise ExecutionTimeout("operation exceeded time limit", code=50)
+
+    return TestClient(app)
+
+
+class TestRequestDeadline:
+    """Test cases for the request deadline dependency"""
+
+    def test_work_past_deadline_is_cancelled_with_504(self, client):
+        response = client.get("/slow")
+
+        assert response.status_code == 504
+        assert response.json()["detail"] == "Request deadline exceeded"
+
+    def test_route_budget_applies(self, client):
+        response = client.get("/report")
+
+        assert 0.05 < response.json()["remaining"] <= 0.5
+
+    def test_client_header_shortens_budget(self, client):
+        response = client.get("/report", headers={"X-Request-Timeout": "0.01"})
+
+        assert response.json()["remaining"] <= 0.01
+
+    def test_client_header_cannot_extend_budget(self, client):
+        response = client.get("/budget", headers={"X-Request-Timeout": "60"})
+
+        assert response.json()["remaining"] <= 0.05
+
+    @pytest.mark.parametrize("value", ["abc", "0", "-1"])
+    def test_invalid_header_is_rejected(self, client, value):
+        response = client.get("/budget", headers={"X-Request-Timeout": value})
+
+        assert response.status_code == 400
+
+    def test_mongo_timeout_maps_to_504(self, client):
+        response = client.get("/mongo-timeout")
+
+        assert response.status_code == 504
+
+    def test_no_deadline_outside_requests(self):
+        assert remaining() is None
+
+
+class TestStatementTimeout:
+    """Test cases for SQL statement deadlines"""
+
+    def test_hint_added_to_select(self):
+        statement = with_statement_timeout("SELECT users.id FROM users", 250)
+
+        assert statement == "SELECT /*+ MAX_EXECUTION_TIME(250) */ users.id FROM users"
+
+    def test_other_statements_untouched(self):
+        statement = "UPDATE users SET email = 'a'"
+
+        assert with_statement_timeout(statement, 250) == statement
+
+    def test_expired_deadline_stops_statement(self, mocker):
+        engine = create_engine("sqlite://")
+        mocker.patch.object(deadlines, "remaining", return_value=-1)
+        deadlines.event.listen(
+            engine,
+            "before_cursor_execute",
+            deadlines.apply_statement_timeout,
+            retval=True,
+        )
+
+        with pytest.raises(deadlines.DeadlineExceeded):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
@@ -5,7 +5,13 @@ from fastapi import HTTPException, Path
 from jose import JWTError
 
 from app import crud
-from app.deps import get_current_user, get_db, get_object_id_or_404
+from app.deps import (
+    batch_principal,
+    get_current_user,
+    get_db,
+    get_object_id_or_404,
+    prefers_return_minimal,
+)
 
 # Mock data for testing
 TEST_SECRET_KEY = "test-secret-key"
@@ -113,6 +119,37 @@ def test_get_current_user_nonexistent_user(mocker):
     assert exc_info.value.detail == "Could not validate credentials"
 
 
+def test_get_current_user_token_of_deleted_account(mocker):
+    # Setup mocks
+    mocker.patch.object(crud, "SECRET_KEY", TEST_SECRET_KEY)
+    mocker.patch.object(crud, "ALGORITHM", TEST_ALGORITHM)
+
+    # Issued to an account since deleted, its email registered again
+    mocker.patch("app.deps.jwt.decode", return_value={**TEST_PAYLOAD, "uid": 1})
+    mock_user = mocker.MagicMock()
+    mock_user.id = 2
+    mocker.patch("app.crud.get_user_by_email", return_value=mock_user)
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_user(token=TEST_TOKEN, db=mocker.MagicMock())
+
+    assert exc_info.value.status_code == 401
+
+
+def test_get_current_user_in_batch(mocker):
+    mock_jwt_decode = mocker.patch("app.deps.jwt.decode")
+    principal = mocker.MagicMock()
+
+    token = batch_principal.set(principal)
+    try:
+        result = get_current_user(token=TEST_TOKEN, db=mocker.MagicMock())
+    finally:
+        batch_principal.reset(token)
+
+    assert result is principal
+    mock_jwt_decode.assert_not_called()
+
+
 def test_get_object_id_or_404_valid_id():
     # Create the dependency function
     dependency_func = get_object_id_or_404("item_id", "Test item ID")
@@ -160,3 +197,17 @@ def test_get_object_id_or_404_with_path_parameters(mocker):
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+@pytest.mark.parametrize(
+    "prefer, expected",
+    [
+        (None, False),
+        ("", False),
+        ("return=representation", False),
+        ("return=minimal", True),
+        ("respond-async, Return=Minimal", True),
+    ],
+)
+def test_prefers_return_minimal(prefer, expected):
+    assert prefers_return_minimal(prefer) is expected
@@ -0,0 +1,136 @@
+# tests/unit/test_idempotency_unit.py
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from app import idempotency
+
+FINGERPRINT = idempotency.request_fingerprint("create_task", '{"title":"A"}')
+
+
+@pytest.fixture
+def mock_collection(mocker):
+    collection = mocker.AsyncMock()
+    # No expired pending claim to take over
+    collection.find_one_and_update.return_value = None
+    mocker.patch("app.idempotency.get_collection", return_value=collection)
+    return collection
+
+
+class TestBegin:
+    """Test cases for claiming idempotency keys"""
+
+    @pytest.mark.asyncio
+    async def test_first_request_claims_key(self, mock_collection):
+        result = await idempotency.begin(1, "key-1", FINGERPRINT)
+
+        assert result is None
+        record = mock_collection.insert_one.call_args[0][0]
+        assert record["user_id"] == 1
+        assert record["key"] == "key-1"
+        assert record["status"] == "pending"
+        assert record["fingerprint"] == FINGERPRINT
+        assert record["pending_until"] > record["created_at"]
+
+    @pytest.mark.asyncio
+    async def test_completed_key_replays_response(self, mock_collection):
+        mock_collection.insert_one.side_effect = DuplicateKeyError("dup")
+        mock_collection.find_one.return_value = {
+            "fingerprint": FINGERPRINT,
+            "status": "completed",
+            "status_code": 201,
+            "response": {"_id": str(ObjectId()), "title": "A"},
+        }
+
+        result = await idempotency.begin(1, "key-1", FINGERPRINT)
+
+        assert result.status_code == 201
+        assert result.headers["Idempotent-Replayed"] == "true"
+        assert b'"title":"A"' in result.body
+
+    @pytest.mark.asyncio
+    async def test_pending_key_conflicts(self, mock_collection):
+        mock_collection.insert_one.side_effect = DuplicateKeyError("dup")
+        mock_collection.find_one.return_value = {
+            "fingerprint": FINGERPRINT,
+            "status": "pending",
+        }
+
+        with pytest.raises(HTTPException) as exc_info:
+            await idempotency.begin(1, "key-1", FINGERPRINT)
+
+        assert exc_info.value.status_code == 409
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_expired_pending_key_is_taken_over(self, mock_collection):
+        # Arrange
+        mock_collection.insert_one.side_effect = DuplicateKeyError("dup")
+        mock_collection.find_one_and_update.return_value = {
+            "fingerprint": FINGERPRINT,
+            "status": "pending",
+        }
+
+        # Act
+        result = await idempotency.begin(1, "key-1", FINGERPRINT)
+
+        # Assert
+        assert result is None
+        query, update = mock_collection.find_one_and_update.call_args[0]
+        assert query["status"] == "pending"
+        assert query["fingerprint"] == FINGERPRINT
+        assert "$not" in query["pending_until"]
+        assert "pending_until" in update["$set"]
+        mock_collection.find_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reused_key_with_different_payload(self, mock_collection):
+        mock_collection.insert_one.side_effect = DuplicateKeyError("dup")
+        mock_collection.find_one.return_value = {
+            "fingerprint": "other",
+            "status": "completed",
+        }
+
+        with pytest.raises(HTTPException) as exc_info:
+            await idempotency.begin(1, "key-1", FINGERPRINT)
+
+        assert exc_info.value.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_invalid_key_rejected(self, mock_collection):
+        with pytest.raises(HTTPException) as exc_info:
+            await idempotency.begin(1, "x" * 256, FINGERPRINT)
+
+        assert exc_info.value.status_code == 400
+        mock_collection.insert_one.assert_not_called()
+
+
+class TestCompleteAndRelease:
+    """Test cases for finishing idempotent requests"""
+
+    @pytest.mark.asyncio
+    async def test_complete_stores_response(self, mock_collection):
+        task_id = ObjectId()
+
+        await idempotency.complete(1, "key-1", task_id, 201, {"title": "A"})
+
+        query, update = mock_collection.update_one.call_args[0]
+        assert query == {"user_id": 1, "key": "key-1"}
+        assert update["$set"]["status"] == "completed"
+        assert update["$set"]["resource_id"] == task_id
+        assert update["$set"]["response"] == {"title": "A"}
+
+    @pytest.mark.asyncio
+    async def test_release_only_drops_pending_claim(self, mock_collection):
+        await idempotency.release(1, "key-1")
+
+        mock_collection.delete_one.assert_called_once_with(
+            {"user_id": 1, "key": "key-1", "status": "pending"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_release_failure_leaves_claim_to_expire(self, mock_collection):
+        mock_collection.delete_one.side_effect = Exception("Mongo down")
+
+        await idempotency.release(1, "key-1")
@@ -0,0 +1,134 @@
+# tests/unit/test_invalidation_unit.py
+import pytest
+
+from app import invalidation
+from app.cache import ListPageCache, MemoryCacheBackend, TaskCache
+from app.invalidation import (
+    InMemoryHub,
+    InMemoryTransport,
+    InvalidationBus,
+    MongoCappedTransport,
+    build_transport,
+)
+
+
+@pytest.fixture
+def hub():
+    return InMemoryHub()
+
+
+class TestInvalidationBus:
+    """Test cases for broadcasting cache invalidations between workers"""
+
+    @pytest.mark.asyncio
+    async def test_message_reaches_other_workers_only(self, mocker, hub):
+        worker_a = InvalidationBus(InMemoryTransport(hub))
+        worker_b = InvalidationBus(InMemoryTransport(hub))
+        handler_a, handler_b = mocker.AsyncMock(), mocker.AsyncMock()
+        worker_a.subscribe("task", handler_a)
+        worker_b.subscribe("task", handler_b)
+        await worker_a.start()
+        await worker_b.start()
+
+        await worker_a.publish("task", user_id=1, task_id="t1")
+
+        handler_a.assert_not_called()
+        message = handler_b.call_args[0][0]
+        assert message["user_id"] == 1
+        assert message["task_id"] == "t1"
+        assert worker_a.metrics()["published"] == 1
+        assert worker_b.metrics()["received"] == 1
+
+    @pytest.mark.asyncio
+    async def test_publish_before_start_is_noop(self, mocker, hub):
+        transport = InMemoryTransport(hub)
+        transport.publish = mocker.AsyncMock()
+        bus = InvalidationBus(transport)
+
+        await bus.publish("task", user_id=1)
+
+        transport.publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stop_unsubscribes(self, mocker, hub):
+        worker_a = InvalidationBus(InMemoryTransport(hub))
+        worker_b = InvalidationBus(InMemoryTransport(hub))
+        handler = mocker.AsyncMock()
+        worker_b.subscribe("task", handler)
+        await worker_a.start()
+        await worker_b.start()
+
+        await worker_b.stop()
+        await worker_a.publish("task", user_id=1)
+
+        handler.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_start_failure_is_reported(self, mocker, capsys):
+        transport = mocker.AsyncMock()
+        transport.start.side_effect = Exception("no mongo")
+        bus = InvalidationBus(transport)
+
+        await bus.start()
+
+        assert bus.started is False
+        assert "Error starting cache invalidation bus: no mongo" in (
+            capsys.readouterr().out
+        )
+
+    @pytest.mark.asyncio
+    async def test_handler_failure_does_not_stop_delivery(self, mocker, hub):
+        worker_a = InvalidationBus(InMemoryTransport(hub))
+        worker_b = InvalidationBus(InMemoryTransport(hub))
+        failing = mocker.AsyncMock(side_effect=Exception("boom"))
+        working = mocker.AsyncMock()
+        worker_b.subscribe("task", failing)
+        worker_b.subscribe("task", working)
+        await worker_a.start()
+        await worker_b.start()
+
+        await worker_a.publish("task", user_id=1)
+
+        working.assert_awaited_once()
+        assert worker_b.metrics()["errors"] == 1
+
+
+class TestOnTaskChange:
+    """Test cases for applying remote task changes to local caches"""
+
+    @pytest.mark.asyncio
+    async def test_invalidates_task_and_list_pages(self, mocker):
+        backend = MemoryCacheBackend()
+        task_cache, list_cache = TaskCache(backend), ListPageCache(backend)
+        mocker.patch.object(invalidation, "task_cache", task_cache)
+        mocker.patch.object(invalidation, "list_cache", list_cache)
+        await task_cache.put(1, "t1", {"_id": "t1"})
+        await backend.set("tasks:version:1", b"v1")
+
+        await invalidation.on_task_change({"user_id": 1, "task_id": "t1"})
+
+        assert await backend.get(TaskCache.key(1, "t1")) is None
+        assert await backend.get("tasks:version:1") != b"v1"
+
+    @pytest.mark.asyncio
+    async def test_invalidates_every_task_of_a_bulk_write(self, mocker):
+        backend = MemoryCacheBackend()
+        task_cache = TaskCache(backend)
+        mocker.patch.object(invalidation, "task_cache", task_cache)
+        mocker.patch.object(invalidation, "list_cache", ListPageCache(backend))
+        await task_cache.put(1, "t1", {"_id": "t1"})
+        await task_cache.put(1, "t2", {"_id": "t2"})
+
+        await invalidation.on_task_change({"user_id": 1, "task_ids": ["t1", "t2"]})
+
+        assert await backend.get(TaskCache.key(1, "t1")) is None
+        assert await backend.get(TaskCache.key(1, "t2")) is None
+
+
+class TestBuildTransport:
+    """Test cases for transport selection"""
+
+    def test_transports(self):
+        assert isinstance(build_transport("mongo"), MongoCappedTransport)
+        assert isinstance(build_transport("memory"), InMemoryTransport)
+        assert build_transport("none") is None
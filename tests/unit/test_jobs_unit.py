@@ -0,0 +1,140 @@
+# tests/unit/test_jobs_unit.py
+from datetime import UTC, datetime
+
+import pytest
+from bson import ObjectId
+
+from app.jobs import DONE, FAILED, QUEUED, RUNNING, JobLost, JobRunner
+
+
+@pytest.fixture
+def mock_jobs(mocker):
+    collection = mocker.AsyncMock()
+    mocker.patch("app.jobs.get_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def job():
+    return {
+        "_id": ObjectId(),
+        "kind": "count",
+        "user_id": 1,
+        "params": {"to": 3},
+        "progress": {},
+    }
+
+
+class TestSubmit:
+    """Test cases for queueing jobs"""
+
+    @pytest.mark.asyncio
+    async def test_submit_stores_claimable_job(self, mock_jobs):
+        runner = JobRunner()
+
+        job = await runner.submit("count", 1, {"to": 3})
+
+        stored = mock_jobs.insert_one.call_args[0][0]
+        assert stored is job
+        assert job["status"] == QUEUED
+        assert job["lease_until"] <= datetime.now(UTC)
+
+
+class TestClaim:
+    """Test cases for leasing jobs"""
+
+    @pytest.mark.asyncio
+    async def test_claims_queued_or_abandoned_jobs_it_can_run(self, mock_jobs):
+        runner = JobRunner(lease_seconds=30)
+        runner.register("count", None)
+
+        await runner._claim()
+
+        query, update = mock_jobs.find_one_and_update.call_args[0]
+        assert query["status"] == {"$in": [QUEUED, RUNNING]}
+        assert query["kind"] == {"$in": ["count"]}
+        assert "$lte" in query["lease_until"]
+        assert update["$set"]["owner"] == runner.worker_id
+        assert update["$inc"] == {"attempts": 1}
+
+
+class TestExecute:
+    """Test cases for running a leased job"""
+
+    @pytest.mark.asyncio
+    async def test_successful_job_reports_progress_and_result(self, mock_jobs, job):
+        runner = JobRunner()
+
+        async def count(job, progress):
+            for step in range(job["params"]["to"]):
+                await progress(done=step + 1)
+            return {"counted": job["params"]["to"]}
+
+        runner.register("count", count)
+
+        await runner._execute(job)
+
+        progress_updates = mock_jobs.update_one.call_args_list[:-1]
+        assert len(progress_updates) == 3
+        owned, update = progress_updates[-1][0]
+        assert owned == {"_id": job["_id"], "owner": runner.worker_id}
+        assert update["$set"]["progress.done"] == 3
+        final = mock_jobs.update_one.call_args_list[-1][0][1]["$set"]
+        assert final["status"] == DONE
+        assert final["result"] == {"counted": 3}
+        assert runner.completed == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_job_records_error(self, mock_jobs, job, capsys):
+        runner = JobRunner()
+
+        async def broken(job, progress):
+            raise ValueError("bad params")
+
+        runner.register("count", broken)
+
+        await runner._execute(job)
+
+        final = mock_jobs.update_one.call_args[0][1]["$set"]
+        assert final["status"] == FAILED
+        assert final["error"] == "bad params"
+        assert runner.failed == 1
+        assert "failed: bad params" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_job_taken_over_stops_quietly(self, mocker, mock_jobs, job):
+        runner = JobRunner()
+        mock_jobs.update_one.return_value = mocker.Mock(matched_count=0)
+        finished = []
+
+        async def count(job, progress):
+            await progress(done=1)
+            finished.append(job)
+
+        runner.register("count", count)
+
+        await runner._execute(job)
+
+        assert finished == []
+        assert mock_jobs.update_one.await_count == 1
+        assert runner.completed == runner.failed == 0
+
+    def test_job_lost_is_an_exception(self):
+        assert issubclass(JobLost, Exception)
+
+
+class TestStop:
+    """Test cases for stopping the runner"""
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_leases(self, mocker, mock_jobs):
+        mocker.patch("app.jobs.JOBS_ENABLED", True)
+        runner = JobRunner(poll_seconds=60)
+        mock_jobs.find_one_and_update.return_value = None
+
+        await runner.start()
+        await runner.stop()
+
+        query, update = mock_jobs.update_many.call_args[0]
+        assert query == {"owner": runner.worker_id, "status": RUNNING}
+        assert "lease_until" in update["$set"]
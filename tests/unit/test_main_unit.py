@@ -19,6 +19,16 @@ def mock_mongo(mocker):
         "ensure_indexes": mocker.patch(
             "app.mongo.ensure_indexes", new_callable=AsyncMock
         ),
+        "bus_start": mocker.patch("app.invalidation.bus.start", new_callable=AsyncMock),
+        "bus_stop": mocker.patch("app.invalidation.bus.stop", new_callable=AsyncMock),
+        "reminders_start": mocker.patch(
+            "app.reminders.scheduler.start", new_callable=AsyncMock
+        ),
+        "reminders_stop": mocker.patch(
+            "app.reminders.scheduler.stop", new_callable=AsyncMock
+        ),
+        "jobs_start": mocker.patch("app.jobs.runner.start", new_callable=AsyncMock),
+        "jobs_stop": mocker.patch("app.jobs.runner.stop", new_callable=AsyncMock),
     }
     return mocks
 
@@ -56,6 +66,8 @@ async def test_lifespan_success(app_with_mocks, mock_mongo):
     mock_mongo["connect"].assert_awaited_once()
     mock_mongo["ensure_indexes"].assert_awaited_once()
     mock_mongo["disconnect"].assert_awaited_once()
+    mock_mongo["bus_start"].assert_awaited_once()
+    mock_mongo["bus_stop"].assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -99,5 +111,28 @@ async def test_lifespan_in_actual_app(client, mock_mongo):
     mock_mongo["disconnect"].assert_awaited_once()
 
 
+def test_metrics_endpoint(client, mocker):
+    mocker.patch("app.metrics._providers", {"component": lambda: {"hits": 3}})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.json() == {"component": {"hits": 3}}
+
+
+def test_open_circuit_returns_503(client, mocker):
+    from app.circuit_breaker import CircuitOpenError
+
+    mocker.patch(
+        "app.metrics.snapshot", side_effect=CircuitOpenError("mongo", retry_after=4.2)
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert response.json() == {"detail": "mongo is temporarily unavailable"}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
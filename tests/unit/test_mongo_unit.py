@@ -8,6 +8,7 @@ from app.mongo import (
     connect_to_mongo,
     disconnect_from_mongo,
     ensure_indexes,
+    get_collection,
     get_tasks_collection,
 )
 
@@ -86,6 +87,7 @@ class TestEnsureIndexes(TestMongoFunctions):
         # Use AsyncMock for async methods
         mock_collection = mocker.AsyncMock()
         app.mongo.tasks_collection = mock_collection
+        app.mongo.db = None
 
         # Mock successful async return
         mock_collection.create_index.return_value = "index_created"
@@ -97,8 +99,8 @@ class TestEnsureIndexes(TestMongoFunctions):
         assert "Ensuring MongoDB indexes..." in captured.out
         assert "MongoDB indexes created successfully" in captured.out
 
-        # Verify create_index was called exactly 6 times
-        assert mock_collection.create_index.call_count == 6
+        # Verify create_index was called exactly 12 times
+        assert mock_collection.create_index.call_count == 12
 
         # Verify the exact calls made to create_index with expected arguments
         expected_calls = [
@@ -108,10 +110,108 @@ class TestEnsureIndexes(TestMongoFunctions):
             mocker.call([("deleted_at", DESCENDING)]),
             mocker.call([("completed_at", DESCENDING)]),
             mocker.call([("user_id", ASCENDING), ("deleted_at", ASCENDING)]),
+            mocker.call(
+                [
+                    ("user_id", ASCENDING),
+                    ("tags", ASCENDING),
+                    ("created_at", DESCENDING),
+                ]
+            ),
+            mocker.call(
+                [
+                    ("user_id", ASCENDING),
+                    ("deleted_at", ASCENDING),
+                    ("rank", ASCENDING),
+                ]
+            ),
+            mocker.call(
+                [
+                    ("user_id", ASCENDING),
+                    ("deleted_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ],
+                partialFilterExpression={"deleted_at": {"$type": "date"}},
+            ),
+            mocker.call(
+                [("user_id", ASCENDING), ("recurrence", ASCENDING)],
+                partialFilterExpression={"recurrence": {"$type": "string"}},
+            ),
+            mocker.call(
+                [("series_id", ASCENDING), ("occurrence_at", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"series_id": {"$exists": True}},
+            ),
+            mocker.call(
+                [("due_at", ASCENDING)],
+                partialFilterExpression={"reminder_pending": True},
+            ),
         ]
 
         mock_collection.create_index.assert_has_calls(expected_calls, any_order=False)
 
+    @pytest.mark.asyncio
+    async def test_ensure_indexes_creates_auxiliary_indexes(self, mocker):
+        """Test index creation on auxiliary collections"""
+        from pymongo import ASCENDING, DESCENDING
+
+        import app.mongo
+
+        app.mongo.tasks_collection = mocker.AsyncMock()
+        mock_db = mocker.MagicMock()
+        mock_aux_collection = mocker.AsyncMock()
+        mock_db.__getitem__.return_value = mock_aux_collection
+        app.mongo.db = mock_db
+
+        await ensure_indexes()
+
+        mock_db.__getitem__.assert_any_call(app.mongo.IDEMPOTENCY_COLLECTION)
+        mock_aux_collection.create_index.assert_any_call(
+            [("user_id", ASCENDING), ("key", ASCENDING)], unique=True
+        )
+        mock_aux_collection.create_index.assert_any_call(
+            [("created_at", ASCENDING)],
+            expireAfterSeconds=app.mongo.IDEMPOTENCY_KEY_TTL_SECONDS,
+        )
+        mock_db.__getitem__.assert_any_call(app.mongo.REMINDER_LEASES_COLLECTION)
+        mock_db.__getitem__.assert_any_call(app.mongo.TASKS_ARCHIVE_COLLECTION)
+        mock_db.__getitem__.assert_any_call(app.mongo.TASK_BUCKETS_COLLECTION)
+        mock_db.__getitem__.assert_any_call(app.mongo.JOBS_COLLECTION)
+        mock_aux_collection.create_index.assert_any_call(
+            [("finished_at", ASCENDING)],
+            expireAfterSeconds=app.mongo.JOB_RETENTION_SECONDS,
+        )
+        mock_aux_collection.create_index.assert_any_call(
+            [("user_id", ASCENDING), ("tasks._id", ASCENDING)]
+        )
+        mock_aux_collection.create_index.assert_any_call(
+            [("user_id", ASCENDING), ("deleted_at", DESCENDING), ("_id", DESCENDING)]
+        )
+
+
+class TestGetCollection(TestMongoFunctions):
+    """Test suite for get_collection function"""
+
+    def test_get_collection_initialized(self):
+        """Test getting a collection from the initialized database"""
+        import app.mongo
+
+        mock_db = MagicMock()
+        app.mongo.db = mock_db
+
+        result = get_collection("idempotency_keys")
+
+        assert result is mock_db.__getitem__.return_value
+        mock_db.__getitem__.assert_called_once_with("idempotency_keys")
+
+    def test_get_collection_uninitialized(self):
+        """Test error when database not initialized"""
+        import app.mongo
+
+        app.mongo.db = None
+
+        with pytest.raises(RuntimeError, match="not initialized"):
+            get_collection("idempotency_keys")
+
 
 class TestConnectToMongo(TestMongoFunctions):
     """Test suite for connect_to_mongo function"""
@@ -0,0 +1,102 @@
+# tests/unit/test_rate_limit_unit.py
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app import rate_limit
+from app.rate_limit import MemoryRateLimitStore, RateLimiter
+
+
+@pytest.fixture
+def clock(mocker):
+    now = SimpleNamespace(value=1000.0)
+    mocker.patch("app.rate_limit.time.monotonic", side_effect=lambda: now.value)
+    return now
+
+
+@pytest.fixture
+def store(mocker):
+    store = MemoryRateLimitStore()
+    mocker.patch.object(rate_limit, "store", store)
+    return store
+
+
+class TestMemoryRateLimitStore:
+    """Test cases for the in-memory token buckets"""
+
+    @pytest.mark.asyncio
+    async def test_allows_burst_then_reports_wait(self, clock):
+        store = MemoryRateLimitStore()
+
+        results = [await store.take("k", rate=1, burst=3) for _ in range(4)]
+
+        assert results[:3] == [0, 0, 0]
+        assert results[3] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_refills_over_time(self, clock):
+        store = MemoryRateLimitStore()
+        for _ in range(2):
+            await store.take("k", rate=2, burst=2)
+
+        clock.value += 0.5
+
+        assert await store.take("k", rate=2, burst=2) == 0
+        assert await store.take("k", rate=2, burst=2) > 0
+
+    @pytest.mark.asyncio
+    async def test_keys_are_independent_and_bounded(self, clock):
+        store = MemoryRateLimitStore(max_keys=2)
+
+        await store.take("a", rate=1, burst=1)
+        await store.take("b", rate=1, burst=1)
+        await store.take("c", rate=1, burst=1)
+
+        assert list(store._buckets) == ["b", "c"]
+
+
+class TestRateLimiter:
+    """Test cases for the route rate limit dependencies"""
+
+    @pytest.mark.asyncio
+    async def test_per_user_raises_429_with_retry_after(self, clock, store):
+        limiter = RateLimiter("test_user", rate=0.5, burst=1)
+        dependency = limiter.per_user()
+        user = SimpleNamespace(id=1)
+
+        await dependency(current_user=user)
+        with pytest.raises(HTTPException) as exc_info:
+            await dependency(current_user=user)
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "2"
+        assert limiter.metrics()["allowed"] == 1
+        assert limiter.metrics()["limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_per_ip_limits_each_address(self, clock, store):
+        limiter = RateLimiter("test_ip", rate=1, burst=1)
+        dependency = limiter.per_ip()
+
+        await dependency(SimpleNamespace(client=SimpleNamespace(host="10.0.0.1")))
+        await dependency(SimpleNamespace(client=SimpleNamespace(host="10.0.0.2")))
+        with pytest.raises(HTTPException):
+            await dependency(SimpleNamespace(client=SimpleNamespace(host="10.0.0.1")))
+
+    @pytest.mark.asyncio
+    async def test_disabled_allows_everything(self, mocker, clock, store):
+        mocker.patch.object(rate_limit, "RATE_LIMIT_ENABLED", False)
+        limiter = RateLimiter("test_disabled", rate=1, burst=1)
+
+        for _ in range(5):
+            await limiter.hit("k")
+
+        assert store._buckets == {}
+
+    def test_env_override(self, monkeypatch):
+        monkeypatch.setenv("RATE_LIMIT_TEST_ENV", "5/50")
+
+        limiter = RateLimiter("test_env", rate=1, burst=1)
+
+        assert (limiter.rate, limiter.burst) == (5.0, 50.0)
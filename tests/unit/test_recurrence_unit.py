@@ -0,0 +1,79 @@
+# tests/unit/test_recurrence_unit.py
+from datetime import UTC, datetime
+
+import pytest
+
+from app.recurrence import is_occurrence, occurrences, series_rule, validate_rule
+from app.schemas_task import TaskCreate
+
+
+class TestValidateRule:
+    """Test cases for recurrence rule validation"""
+
+    @pytest.mark.parametrize(
+        "rule", ["FREQ=DAILY", "RRULE:FREQ=WEEKLY;BYDAY=MO,WE", "FREQ=MONTHLY;COUNT=3"]
+    )
+    def test_accepts_daily_or_slower_rules(self, rule):
+        assert validate_rule(rule) == rule
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            "FREQ=HOURLY",
+            "RRULE:INTERVAL=2;freq=minutely",
+            "FREQ=DAILY\nRRULE:FREQ=SECONDLY",
+            "every day",
+            "FREQ=SOMETIMES",
+        ],
+    )
+    def test_rejects_invalid_or_sub_daily_rules(self, rule):
+        with pytest.raises(ValueError):
+            validate_rule(rule)
+
+    def test_task_create_validates_recurrence(self):
+        with pytest.raises(ValueError):
+            TaskCreate(title="Backup", recurrence="FREQ=MINUTELY")
+
+
+class TestOccurrences:
+    """Test cases for lazy occurrence expansion"""
+
+    SERIES = {
+        "recurrence": "FREQ=WEEKLY;BYDAY=MO",
+        "due_at": datetime(2024, 1, 1, 9, 0),  # A Monday, naive as from Mongo
+        "created_at": datetime(2023, 12, 20),
+    }
+
+    def test_expands_only_the_range(self):
+        rule = series_rule(self.SERIES)
+
+        moments = occurrences(
+            rule, datetime(2024, 3, 1, tzinfo=UTC), datetime(2024, 3, 18, tzinfo=UTC)
+        )
+
+        assert moments == [
+            datetime(2024, 3, 4, 9, 0, tzinfo=UTC),
+            datetime(2024, 3, 11, 9, 0, tzinfo=UTC),
+        ]
+
+    def test_expansion_is_capped(self, mocker):
+        mocker.patch("app.recurrence.MAX_OCCURRENCES_PER_SERIES", 2)
+        rule = series_rule({**self.SERIES, "recurrence": "FREQ=DAILY"})
+
+        moments = occurrences(
+            rule, datetime(2024, 1, 1, tzinfo=UTC), datetime(2025, 1, 1, tzinfo=UTC)
+        )
+
+        assert len(moments) == 2
+
+    def test_series_without_due_date_starts_at_creation(self):
+        rule = series_rule({**self.SERIES, "due_at": None, "recurrence": "FREQ=DAILY"})
+
+        assert is_occurrence(rule, datetime(2024, 2, 1, tzinfo=UTC))
+
+    def test_is_occurrence(self):
+        rule = series_rule(self.SERIES)
+
+        assert is_occurrence(rule, datetime(2024, 1, 8, 9, 0))
+        assert not is_occurrence(rule, datetime(2024, 1, 9, 9, 0))
+        assert not is_occurrence(rule, datetime(2023, 12, 25, 9, 0))
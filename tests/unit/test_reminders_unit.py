@@ -0,0 +1,244 @@
+# tests/unit/test_reminders_unit.py
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.reminders import ReminderScheduler
+
+
+@pytest.fixture
+def mock_tasks(mocker):
+    collection = mocker.MagicMock()
+    collection.find_one_and_update = mocker.AsyncMock()
+    collection.update_one = mocker.AsyncMock()
+    collection.update_many = mocker.AsyncMock()
+    mocker.patch("app.reminders.get_tasks_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def mock_leases(mocker):
+    collection = mocker.AsyncMock()
+    mocker.patch("app.reminders.get_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def sink(mocker):
+    return mocker.AsyncMock()
+
+
+def cursor(mocker, docs):
+    result = mocker.MagicMock()
+    result.__aiter__.return_value = docs
+    return result
+
+
+class TestLoad:
+    """Test cases for loading the next window of reminders"""
+
+    @pytest.mark.asyncio
+    async def test_loads_owned_partitions_into_heap(self, mocker, mock_tasks, sink):
+        scheduler = ReminderScheduler(sink=sink, partitions=4, window_seconds=60)
+        scheduler.owned = {1, 3}
+        soon = datetime.now(UTC) + timedelta(seconds=30)
+        live, done = ObjectId(), ObjectId()
+        mock_tasks.find.return_value = cursor(
+            mocker,
+            [
+                {"_id": live, "user_id": 5, "due_at": soon.replace(tzinfo=None)},
+                {"_id": done, "user_id": 7, "due_at": soon, "completed_at": soon},
+            ],
+        )
+
+        await scheduler._load()
+
+        query = mock_tasks.find.call_args[0][0]
+        assert query["reminder_pending"] is True
+        assert query["$or"] == [
+            {"user_id": {"$mod": [4, 1]}},
+            {"user_id": {"$mod": [4, 3]}},
+        ]
+        assert [entry[2] for entry in scheduler._heap] == [live]
+        mock_tasks.update_many.assert_awaited_once_with(
+            {"_id": {"$in": [done]}}, {"$unset": {"reminder_pending": ""}}
+        )
+
+    @pytest.mark.asyncio
+    async def test_nothing_loaded_without_partitions(self, mock_tasks, sink):
+        scheduler = ReminderScheduler(sink=sink)
+
+        await scheduler._load()
+
+        mock_tasks.find.assert_not_called()
+
+
+class TestFire:
+    """Test cases for firing due reminders"""
+
+    @pytest.mark.asyncio
+    async def test_due_reminder_is_claimed_and_sent(self, mock_tasks, sink):
+        scheduler = ReminderScheduler(sink=sink)
+        task_id, due_at = ObjectId(), datetime.now(UTC) - timedelta(seconds=1)
+        later = datetime.now(UTC) + timedelta(hours=1)
+        scheduler._push(task_id, 5, due_at)
+        scheduler._push(ObjectId(), 5, later)
+        mock_tasks.find_one_and_update.return_value = {
+            "_id": task_id,
+            "user_id": 5,
+            "title": "Call",
+            "due_at": due_at,
+        }
+
+        await scheduler._fire_due()
+
+        claim, update = mock_tasks.find_one_and_update.call_args[0]
+        assert claim["reminder_pending"] is True
+        assert claim["due_at"] == due_at
+        assert update == {"$unset": {"reminder_pending": ""}}
+        sink.send.assert_awaited_once()
+        assert sink.send.call_args[0][0]["task_id"] == str(task_id)
+        assert len(scheduler._heap) == 1
+
+    @pytest.mark.asyncio
+    async def test_reminder_claimed_elsewhere_is_skipped(self, mock_tasks, sink):
+        scheduler = ReminderScheduler(sink=sink)
+        scheduler._push(ObjectId(), 5, datetime.now(UTC) - timedelta(seconds=1))
+        mock_tasks.find_one_and_update.return_value = None
+
+        await scheduler._fire_due()
+
+        sink.send.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_send_restores_pending(self, mock_tasks, sink, capsys):
+        scheduler = ReminderScheduler(sink=sink)
+        task_id, due_at = ObjectId(), datetime.now(UTC) - timedelta(seconds=1)
+        scheduler._push(task_id, 5, due_at)
+        mock_tasks.find_one_and_update.return_value = {
+            "_id": task_id,
+            "user_id": 5,
+            "title": "Call",
+            "due_at": due_at,
+        }
+        sink.send.side_effect = Exception("webhook down")
+
+        await scheduler._fire_due()
+
+        mock_tasks.update_one.assert_awaited_once_with(
+            {"_id": task_id, "due_at": due_at}, {"$set": {"reminder_pending": True}}
+        )
+        assert scheduler.failed == 1
+        assert "Error sending reminder" in capsys.readouterr().out
+
+
+class TestLeases:
+    """Test cases for sharing partitions between workers"""
+
+    @pytest.mark.asyncio
+    async def test_claims_fair_share(self, mock_leases, sink):
+        scheduler = ReminderScheduler(sink=sink, partitions=4)
+        mock_leases.distinct.return_value = [scheduler.worker_id, "other"]
+
+        changed = await scheduler._renew_leases()
+
+        assert changed
+        assert scheduler.owned == {0, 1}
+
+    @pytest.mark.asyncio
+    async def test_partitions_leased_elsewhere_are_skipped(self, mock_leases, sink):
+        scheduler = ReminderScheduler(sink=sink, partitions=2)
+        mock_leases.distinct.return_value = [scheduler.worker_id]
+        mock_leases.find_one_and_update.side_effect = [
+            DuplicateKeyError("taken"),
+            {"_id": 1},
+        ]
+
+        await scheduler._renew_leases()
+
+        assert scheduler.owned == {1}
+
+    @pytest.mark.asyncio
+    async def test_gives_back_partitions_over_share(self, mock_leases, sink):
+        scheduler = ReminderScheduler(sink=sink, partitions=4)
+        scheduler.owned = {0, 1, 2, 3}
+        mock_leases.distinct.return_value = [scheduler.worker_id, "other"]
+
+        await scheduler._renew_leases()
+
+        assert scheduler.owned == {0, 1}
+        released = [call[0][0] for call in mock_leases.update_one.call_args_list[1:]]
+        assert released == [
+            {"_id": 2, "owner": scheduler.worker_id},
+            {"_id": 3, "owner": scheduler.worker_id},
+        ]
+
+
+class TestRun:
+    """Test cases for the scheduler loop"""
+
+    @pytest.mark.asyncio
+    async def test_backs_off_while_mongo_fails(self, mocker, sink, capsys):
+        # Arrange
+        mocker.patch("app.reminders.REMINDER_RETRY_SECONDS", 60)
+        scheduler = ReminderScheduler(sink=sink)
+        renew = mocker.patch.object(
+            scheduler, "_renew_leases", side_effect=Exception("mongo down")
+        )
+
+        # Act
+        task = asyncio.create_task(scheduler._run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # Assert
+        renew.assert_awaited_once()
+        assert capsys.readouterr().out.count("Reminder scheduler error") == 1
+
+
+class TestNotify:
+    """Test cases for queueing reminders set by local writes"""
+
+    def test_notify_queues_owned_reminder_in_window(self, sink):
+        scheduler = ReminderScheduler(sink=sink, partitions=2)
+        scheduler._task = object()
+        scheduler.owned = {1}
+        scheduler._horizon = datetime.now(UTC) + timedelta(minutes=1)
+        soon = datetime.now(UTC) + timedelta(seconds=10)
+
+        scheduler.notify(3, ObjectId(), soon)
+        scheduler.notify(4, ObjectId(), soon)
+        scheduler.notify(5, ObjectId(), soon + timedelta(hours=1))
+
+        assert len(scheduler._heap) == 1
+
+    @pytest.mark.asyncio
+    async def test_notified_reminder_fires_at_stored_precision(self, mock_tasks, sink):
+        # Arrange
+        scheduler = ReminderScheduler(sink=sink, partitions=2)
+        scheduler._task = object()
+        scheduler.owned = {1}
+        scheduler._horizon = datetime.now(UTC) + timedelta(minutes=1)
+        task_id = ObjectId()
+        due_at = datetime.now(UTC).replace(microsecond=123456) - timedelta(seconds=1)
+        stored = due_at.replace(microsecond=123000)
+        mock_tasks.find_one_and_update.return_value = {
+            "_id": task_id,
+            "user_id": 1,
+            "title": "Call",
+            "due_at": stored,
+        }
+
+        # Act
+        scheduler.notify(1, task_id, due_at)
+        await scheduler._fire_due()
+
+        # Assert
+        claim = mock_tasks.find_one_and_update.call_args[0][0]
+        assert claim["due_at"] == stored
+        sink.send.assert_awaited_once()
@@ -0,0 +1,127 @@
+# tests/unit/test_singleflight_unit.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestAsyncSingleFlight:
+    """Test cases for coalescing concurrent coroutine calls"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        flight = AsyncSingleFlight()
+        executions = 0
+
+        async def query():
+            nonlocal executions
+            executions += 1
+            await asyncio.sleep(0.01)
+            return {"value": 1}
+
+        results = await asyncio.gather(*(flight.do("k", query) for _ in range(5)))
+
+        assert executions == 1
+        assert all(result == {"value": 1} for result in results)
+        assert flight.metrics() == {"calls": 1, "coalesced": 4}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_run_separately(self):
+        flight = AsyncSingleFlight()
+
+        async def query(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: query("a")), flight.do("b", lambda: query("b"))
+        )
+
+        assert results == ["a", "b"]
+        assert flight.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_are_not_coalesced(self):
+        flight = AsyncSingleFlight()
+
+        async def query():
+            return 1
+
+        await flight.do("k", query)
+        await flight.do("k", query)
+
+        assert flight.metrics() == {"calls": 2, "coalesced": 0}
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        flight = AsyncSingleFlight()
+
+        async def query():
+            await asyncio.sleep(0.01)
+            raise ValueError("mongo down")
+
+        results = await asyncio.gather(
+            flight.do("k", query), flight.do("k", query), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_follower_retries_when_leader_is_cancelled(self):
+        flight = AsyncSingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "ok"
+
+        leader = asyncio.create_task(flight.do("k", slow))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "ok"
+
+
+class TestSingleFlight:
+    """Test cases for coalescing blocking calls across threads"""
+
+    def test_concurrent_threads_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        executions = 0
+
+        def query():
+            nonlocal executions
+            executions += 1
+            release.wait(timeout=1)
+            return "user"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(flight.do, "k", query) for _ in range(4)]
+            deadline = time.monotonic() + 1
+            while flight.coalesced < 3 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["user"] * 4
+        assert executions == 1
+
+    def test_errors_are_raised(self):
+        flight = SingleFlight()
+
+        def query():
+            raise RuntimeError("mysql down")
+
+        with pytest.raises(RuntimeError, match="mysql down"):
+            flight.do("k", query)
+        assert flight._calls == {}
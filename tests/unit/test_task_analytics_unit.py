@@ -0,0 +1,146 @@
+# tests/unit/test_task_analytics_unit.py
+from datetime import UTC, date, datetime
+
+import pytest
+
+from app import task_analytics
+
+
+@pytest.fixture
+def mock_analytics_collection(mocker):
+    collection = mocker.AsyncMock()
+    mocker.patch("app.task_analytics.get_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def mock_tasks_collection(mocker):
+    collection = mocker.MagicMock()
+    cursor = mocker.AsyncMock()
+    collection.aggregate = mocker.AsyncMock(return_value=cursor)
+    mocker.patch("app.task_analytics.get_tasks_collection", return_value=collection)
+    return collection
+
+
+def aggregated(collection, created, completed):
+    cursor = collection.aggregate.return_value
+    cursor.next.return_value = {
+        "created": [{"_id": day, "count": n} for day, n in created.items()],
+        "completed": [{"_id": day, "count": n} for day, n in completed.items()],
+    }
+
+
+class TestRecordChange:
+    """Test cases for marking days dirty on writes"""
+
+    @pytest.mark.asyncio
+    async def test_record_change_marks_days(self, mock_analytics_collection):
+        await task_analytics.record_change(
+            1,
+            [datetime(2023, 1, 2, 10, tzinfo=UTC), None, datetime(2023, 1, 5)],
+        )
+
+        mock_analytics_collection.update_one.assert_called_once_with(
+            {"_id": 1},
+            {"$inc": {"dirty.2023-01-02": 1, "dirty.2023-01-05": 1}},
+            upsert=True,
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_change_without_dates(self, mock_analytics_collection):
+        await task_analytics.record_change(1, [None])
+
+        mock_analytics_collection.update_one.assert_not_called()
+
+
+class TestGetAnalytics:
+    """Test cases for serving cached buckets"""
+
+    @pytest.mark.asyncio
+    async def test_first_view_runs_full_aggregation(
+        self, mock_analytics_collection, mock_tasks_collection
+    ):
+        mock_analytics_collection.find_one.return_value = None
+        aggregated(
+            mock_tasks_collection,
+            {"2023-01-02": 2, "2023-01-03": 1},
+            {"2023-01-03": 1},
+        )
+
+        result = await task_analytics.get_analytics(1)
+
+        pipeline = mock_tasks_collection.aggregate.call_args[0][0]
+        assert pipeline[0]["$match"] == {"user_id": 1, "deleted_at": None}
+        assert [(b.start, b.created, b.completed) for b in result.buckets] == [
+            (date(2023, 1, 2), 2, 0),
+            (date(2023, 1, 3), 1, 1),
+        ]
+        operations = mock_analytics_collection.bulk_write.call_args[0][0]
+        assert operations[0]._doc["$set"]["initialized"] is True
+
+    @pytest.mark.asyncio
+    async def test_clean_cache_skips_aggregation(
+        self, mock_analytics_collection, mock_tasks_collection
+    ):
+        mock_analytics_collection.find_one.return_value = {
+            "_id": 1,
+            "initialized": True,
+            "days": {"2023-01-02": {"created": 3, "completed": 1}},
+        }
+
+        result = await task_analytics.get_analytics(1)
+
+        mock_tasks_collection.aggregate.assert_not_called()
+        mock_analytics_collection.bulk_write.assert_not_called()
+        assert result.buckets[0].created == 3
+
+    @pytest.mark.asyncio
+    async def test_only_dirty_days_are_recomputed(
+        self, mock_analytics_collection, mock_tasks_collection
+    ):
+        mock_analytics_collection.find_one.return_value = {
+            "_id": 1,
+            "initialized": True,
+            "days": {
+                "2023-01-02": {"created": 3, "completed": 1},
+                "2023-01-03": {"created": 1, "completed": 0},
+            },
+            "dirty": {"2023-01-03": 2},
+        }
+        aggregated(mock_tasks_collection, {"2023-01-03": 2}, {"2023-01-03": 1})
+
+        result = await task_analytics.get_analytics(1)
+
+        match = mock_tasks_collection.aggregate.call_args[0][0][0]["$match"]
+        assert len(match["$or"]) == 2  # created_at and completed_at of one day
+        assert [(b.created, b.completed) for b in result.buckets] == [(3, 1), (2, 1)]
+        set_op, clear_op = mock_analytics_collection.bulk_write.call_args[0][0]
+        assert set_op._doc == {
+            "$set": {"days.2023-01-03": {"created": 2, "completed": 1}}
+        }
+        assert clear_op._filter == {"_id": 1, "dirty.2023-01-03": 2}
+
+    @pytest.mark.asyncio
+    async def test_week_granularity_and_range(
+        self, mock_analytics_collection, mock_tasks_collection
+    ):
+        mock_analytics_collection.find_one.return_value = {
+            "_id": 1,
+            "initialized": True,
+            "days": {
+                "2023-01-02": {"created": 1, "completed": 0},  # Monday
+                "2023-01-08": {"created": 2, "completed": 1},  # Sunday
+                "2023-01-09": {"created": 4, "completed": 0},  # next Monday
+                "2023-01-20": {"created": 9, "completed": 9},
+            },
+        }
+
+        result = await task_analytics.get_analytics(
+            1, "week", start=date(2023, 1, 1), end=date(2023, 1, 15)
+        )
+
+        assert result.granularity == "week"
+        assert [(b.start, b.created, b.completed) for b in result.buckets] == [
+            (date(2023, 1, 2), 3, 1),
+            (date(2023, 1, 9), 4, 0),
+        ]
@@ -0,0 +1,203 @@
+# tests/unit/test_task_archive_unit.py
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.task_archive import archive_batch, archive_deleted, restore
+
+CUTOFF = datetime(2023, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def mock_tasks(mocker):
+    collection = mocker.MagicMock()
+    collection.delete_many = mocker.AsyncMock()
+    collection.distinct = mocker.AsyncMock()
+    collection.insert_one = mocker.AsyncMock()
+    mocker.patch("app.task_archive.get_tasks_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def mock_archive(mocker):
+    collection = mocker.AsyncMock()
+    mocker.patch("app.task_archive.get_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def mock_task_stats(mocker):
+    return mocker.patch("app.task_archive.task_stats", new=mocker.AsyncMock())
+
+
+def deleted_tasks(mock_tasks, docs):
+    mock_tasks.find.return_value.limit.return_value.to_list = AsyncMock(
+        return_value=docs
+    )
+
+
+class TestArchiveBatch:
+    """Test cases for moving a batch of deleted tasks to the archive"""
+
+    @pytest.mark.asyncio
+    async def test_copies_then_removes_tasks(
+        self, mock_tasks, mock_archive, mock_task_stats
+    ):
+        # Arrange
+        docs = [
+            {"_id": ObjectId(), "user_id": 1, "deleted_at": datetime(2022, 12, 1)},
+            {"_id": ObjectId(), "user_id": 1, "deleted_at": datetime(2022, 12, 2)},
+            {"_id": ObjectId(), "user_id": 2, "deleted_at": datetime(2022, 12, 3)},
+        ]
+        deleted_tasks(mock_tasks, docs)
+        mock_tasks.delete_many.return_value.deleted_count = 3
+
+        # Act
+        moved = await archive_batch(CUTOFF, batch_size=3)
+
+        # Assert
+        assert moved == 3
+        mock_tasks.find.assert_called_once_with({"deleted_at": {"$lt": CUTOFF}})
+        mock_tasks.find.return_value.limit.assert_called_once_with(3)
+        copies = mock_archive.insert_many.call_args[0][0]
+        assert [copy["_id"] for copy in copies] == [doc["_id"] for doc in docs]
+        assert all("archived_at" in copy for copy in copies)
+        mock_tasks.delete_many.assert_awaited_once_with(
+            {
+                "deleted_at": {"$lt": CUTOFF},
+                "_id": {"$in": [doc["_id"] for doc in docs]},
+            }
+        )
+        mock_task_stats.record_archived.assert_any_await(1, 2)
+        mock_task_stats.record_archived.assert_any_await(2, 1)
+
+    @pytest.mark.asyncio
+    async def test_task_restored_meanwhile_stays_hot(
+        self, mock_tasks, mock_archive, mock_task_stats
+    ):
+        # Arrange
+        kept_id = ObjectId()
+        docs = [
+            {"_id": ObjectId(), "user_id": 1, "deleted_at": datetime(2022, 12, 1)},
+            {"_id": kept_id, "user_id": 1, "deleted_at": datetime(2022, 12, 2)},
+        ]
+        deleted_tasks(mock_tasks, docs)
+        mock_tasks.delete_many.return_value.deleted_count = 1
+        mock_tasks.distinct.return_value = [kept_id]
+
+        # Act
+        moved = await archive_batch(CUTOFF)
+
+        # Assert
+        assert moved == 1
+        mock_archive.delete_many.assert_awaited_once_with({"_id": {"$in": [kept_id]}})
+        mock_task_stats.record_archived.assert_awaited_once_with(1, 1)
+
+    @pytest.mark.asyncio
+    async def test_copies_left_by_interrupted_run_are_skipped(
+        self, mock_tasks, mock_archive, mock_task_stats
+    ):
+        # Arrange
+        deleted_tasks(mock_tasks, [{"_id": ObjectId(), "user_id": 1}])
+        mock_archive.insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"code": 11000, "index": 0}]}
+        )
+        mock_tasks.delete_many.return_value.deleted_count = 1
+
+        # Act
+        moved = await archive_batch(CUTOFF)
+
+        # Assert
+        assert moved == 1
+        mock_tasks.delete_many.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_other_write_errors_stop_the_batch(self, mock_tasks, mock_archive):
+        # Arrange
+        deleted_tasks(mock_tasks, [{"_id": ObjectId(), "user_id": 1}])
+        mock_archive.insert_many.side_effect = BulkWriteError(
+            {"writeErrors": [{"code": 121, "index": 0}]}
+        )
+
+        # Act & Assert
+        with pytest.raises(BulkWriteError):
+            await archive_batch(CUTOFF)
+        mock_tasks.delete_many.assert_not_called()
+
+
+class TestArchiveDeleted:
+    """Test cases for the throttled archiving job"""
+
+    @pytest.mark.asyncio
+    async def test_pauses_between_full_batches(self, mocker):
+        # Arrange
+        mock_batch = mocker.patch(
+            "app.task_archive.archive_batch", side_effect=[2, 2, 1]
+        )
+        mock_sleep = mocker.patch("app.task_archive.asyncio.sleep")
+
+        # Act
+        archived = await archive_deleted(older_than_days=30, batch_size=2, pause=0.1)
+
+        # Assert
+        assert archived == 5
+        assert mock_batch.await_count == 3
+        assert mock_sleep.await_count == 2
+        mock_sleep.assert_awaited_with(0.1)
+
+
+class TestRestore:
+    """Test cases for restoring an archived task"""
+
+    @pytest.mark.asyncio
+    async def test_moves_task_back_as_deleted(
+        self, mock_tasks, mock_archive, mock_task_stats
+    ):
+        # Arrange
+        task_id = ObjectId()
+        mock_archive.find_one.return_value = {
+            "_id": task_id,
+            "user_id": 1,
+            "deleted_at": datetime(2022, 12, 1),
+            "archived_at": datetime(2023, 1, 1),
+        }
+
+        # Act
+        doc = await restore(1, task_id)
+
+        # Assert
+        mock_archive.find_one.assert_awaited_once_with({"_id": task_id, "user_id": 1})
+        restored = mock_tasks.insert_one.call_args[0][0]
+        assert "archived_at" not in restored
+        assert restored["deleted_at"] == datetime(2022, 12, 1)
+        mock_archive.delete_one.assert_awaited_once_with({"_id": task_id})
+        mock_task_stats.record_archived.assert_awaited_once_with(1, -1)
+        assert doc == restored
+
+    @pytest.mark.asyncio
+    async def test_interrupted_restore_completes(
+        self, mock_tasks, mock_archive, mock_task_stats
+    ):
+        # Arrange
+        task_id = ObjectId()
+        mock_archive.find_one.return_value = {"_id": task_id, "user_id": 1}
+        mock_tasks.insert_one.side_effect = DuplicateKeyError("exists")
+
+        # Act
+        await restore(1, task_id)
+
+        # Assert
+        mock_task_stats.record_archived.assert_not_called()
+        mock_archive.delete_one.assert_awaited_once_with({"_id": task_id})
+
+    @pytest.mark.asyncio
+    async def test_unknown_task(self, mock_tasks, mock_archive):
+        # Arrange
+        mock_archive.find_one.return_value = None
+
+        # Act & Assert
+        assert await restore(1, ObjectId()) is None
+        mock_tasks.insert_one.assert_not_called()
@@ -0,0 +1,106 @@
+# tests/unit/test_task_ranking_unit.py
+import random
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+
+from app import task_ranking
+from app.task_ranking import midpoint, rank_between, spread_ranks
+
+
+class TestRankKeys:
+    """Test cases for lexicographic rank keys"""
+
+    def test_midpoint_between_keys(self):
+        assert midpoint("A", "C") == "B"
+        assert "A" < midpoint("A", "B") < "B"
+
+    def test_random_inserts_keep_order(self):
+        random.seed(7)
+        keys = [rank_between(None, None)]
+        for _ in range(500):
+            index = random.randint(0, len(keys))
+            before = keys[index - 1] if index else None
+            after = keys[index] if index < len(keys) else None
+
+            key = rank_between(before, after)
+
+            assert before is None or before < key
+            assert after is None or key < after
+            assert not key.endswith("0")
+            keys.insert(index, key)
+
+    def test_repeated_prepends_and_appends_stay_short(self):
+        first = last = rank_between(None, None)
+        for _ in range(100):
+            first = rank_between(None, first)
+            last = rank_between(last, None)
+
+        assert len(first) <= 3
+        assert len(last) <= 3
+
+    @pytest.mark.parametrize("count", [1, 3, 61, 62, 1000])
+    def test_spread_ranks_are_short_sorted_and_unique(self, count):
+        ranks = spread_ranks(count)
+
+        assert ranks == sorted(ranks)
+        assert len(set(ranks)) == count
+        assert max(map(len, ranks)) <= 2
+
+
+class TestRebalance:
+    """Test cases for rewriting a user's rank keys"""
+
+    @pytest.mark.asyncio
+    async def test_rebalance_user_writes_conditional_updates(self, mocker):
+        mock_collection = mocker.MagicMock()
+        cursor = mocker.MagicMock()
+        cursor.__aiter__.return_value = [
+            {"_id": 1},
+            {"_id": 2, "rank": "A0001"},
+            {"_id": 3, "rank": "A0002"},
+        ]
+        mock_collection.find.return_value.sort.return_value = cursor
+        mock_collection.bulk_write = mocker.AsyncMock()
+        mocker.patch(
+            "app.task_ranking.get_tasks_collection", return_value=mock_collection
+        )
+
+        updated = await task_ranking.rebalance_user(1)
+
+        assert updated == 3
+        operations = mock_collection.bulk_write.call_args[0][0]
+        assert [op._filter for op in operations] == [
+            {"_id": 1, "rank": None},
+            {"_id": 2, "rank": "A0001"},
+            {"_id": 3, "rank": "A0002"},
+        ]
+        assert [op._doc["$set"]["rank"] for op in operations] == spread_ranks(3)
+
+    @pytest.mark.asyncio
+    async def test_rebalance_user_invalidates_caches(self, mocker):
+        # Arrange
+        mock_collection = mocker.MagicMock()
+        cursor = mocker.MagicMock()
+        moved = ObjectId()
+        cursor.__aiter__.return_value = [
+            {"_id": ObjectId(), "rank": spread_ranks(2)[0]},
+            {"_id": moved, "rank": "zz"},
+        ]
+        mock_collection.find.return_value.sort.return_value = cursor
+        mock_collection.bulk_write = mocker.AsyncMock()
+        mocker.patch(
+            "app.task_ranking.get_tasks_collection", return_value=mock_collection
+        )
+        task_cache = mocker.patch("app.task_ranking.task_cache", new=AsyncMock())
+        list_cache = mocker.patch("app.task_ranking.list_cache", new=AsyncMock())
+        bus = mocker.patch("app.task_ranking.bus", new=AsyncMock())
+
+        # Act
+        await task_ranking.rebalance_user(1)
+
+        # Assert
+        task_cache.invalidate.assert_awaited_once_with(1, moved)
+        list_cache.bump.assert_awaited_once_with(1)
+        bus.publish.assert_awaited_once_with("task", user_id=1, task_ids=[str(moved)])
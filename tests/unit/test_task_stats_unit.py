@@ -0,0 +1,234 @@
+# tests/unit/test_task_stats_unit.py
+from datetime import UTC, datetime
+
+import pytest
+
+from app import task_stats
+from app.schemas_task import TaskStats
+
+NOW = datetime(2023, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def mock_stats_collection(mocker):
+    collection = mocker.AsyncMock()
+    mocker.patch("app.task_stats.get_collection", return_value=collection)
+    return collection
+
+
+def incremented(collection):
+    query, update = collection.update_one.call_args[0]
+    return query["_id"], update["$inc"]
+
+
+class TestCounterUpdates:
+    """Test cases for incremental counter maintenance"""
+
+    @pytest.mark.asyncio
+    async def test_record_created(self, mock_stats_collection):
+        await task_stats.record_created(1)
+
+        assert incremented(mock_stats_collection) == (1, {"total": 1, "open": 1})
+
+    @pytest.mark.asyncio
+    async def test_record_deleted_completed_task(self, mock_stats_collection):
+        await task_stats.record_deleted(1, was_completed=True)
+
+        assert incremented(mock_stats_collection) == (
+            1,
+            {"total": -1, "deleted": 1, "completed": -1},
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_restored_open_task(self, mock_stats_collection):
+        await task_stats.record_restored(1, was_completed=False, tags=["home"])
+
+        assert incremented(mock_stats_collection) == (
+            1,
+            {"total": 1, "deleted": -1, "open": 1, "tags.home": 1},
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_bulk_deleted(self, mock_stats_collection):
+        await task_stats.record_bulk_deleted(
+            1,
+            [
+                {"completed_at": NOW, "tags": ["home"]},
+                {"completed_at": None, "tags": ["home", "work"]},
+                {"completed_at": NOW},
+            ],
+        )
+
+        assert incremented(mock_stats_collection) == (
+            1,
+            {
+                "total": -3,
+                "deleted": 3,
+                "open": -1,
+                "completed": -2,
+                "tags.home": -2,
+                "tags.work": -1,
+            },
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_archived(self, mock_stats_collection):
+        await task_stats.record_archived(1, 3)
+
+        assert incremented(mock_stats_collection) == (1, {"deleted": -3})
+
+    @pytest.mark.asyncio
+    async def test_record_update_completion(self, mock_stats_collection):
+        await task_stats.record_update(1, {"completed_at": None}, {"completed_at": NOW})
+
+        assert incremented(mock_stats_collection) == (1, {"open": -1, "completed": 1})
+
+    @pytest.mark.asyncio
+    async def test_record_update_reopen(self, mock_stats_collection):
+        await task_stats.record_update(1, {"completed_at": NOW}, {"completed_at": None})
+
+        assert incremented(mock_stats_collection) == (1, {"open": 1, "completed": -1})
+
+    @pytest.mark.asyncio
+    async def test_record_update_without_transition(self, mock_stats_collection):
+        await task_stats.record_update(1, {"completed_at": NOW}, {"completed_at": NOW})
+        await task_stats.record_update(1, {"completed_at": None}, {"title": "New"})
+
+        mock_stats_collection.update_one.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_record_created_with_tags(self, mock_stats_collection):
+        await task_stats.record_created(1, ["work", "home"])
+
+        assert incremented(mock_stats_collection) == (
+            1,
+            {"total": 1, "open": 1, "tags.work": 1, "tags.home": 1},
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_deleted_with_tags(self, mock_stats_collection):
+        await task_stats.record_deleted(1, was_completed=False, tags=["work"])
+
+        assert incremented(mock_stats_collection) == (
+            1,
+            {"total": -1, "deleted": 1, "open": -1, "tags.work": -1},
+        )
+
+    @pytest.mark.asyncio
+    async def test_record_update_tags(self, mock_stats_collection):
+        await task_stats.record_update(
+            1, {"tags": ["work", "home"]}, {"tags": ["home", "errands"]}
+        )
+
+        assert incremented(mock_stats_collection) == (
+            1,
+            {"tags.work": -1, "tags.errands": 1},
+        )
+
+    @pytest.mark.asyncio
+    async def test_increment_failure_is_swallowed(self, mock_stats_collection, capsys):
+        mock_stats_collection.update_one.side_effect = Exception("write failed")
+
+        await task_stats.record_created(1)
+
+        assert "Error updating task stats for user 1" in capsys.readouterr().out
+
+
+class TestRecompute:
+    """Test cases for rebuilding counters with an aggregation"""
+
+    @pytest.mark.asyncio
+    async def test_recompute_stats_for_all_users(self, mocker, mock_stats_collection):
+        mock_tasks = mocker.MagicMock()
+        cursor = mocker.MagicMock()
+        cursor.__aiter__.return_value = [
+            {"_id": 1, "total": 3, "open": 2, "completed": 1, "deleted": 4},
+            {"_id": 2, "total": 0, "open": 0, "completed": 0, "deleted": 1},
+        ]
+        mock_tasks.aggregate = mocker.AsyncMock(return_value=cursor)
+        mocker.patch("app.task_stats.get_tasks_collection", return_value=mock_tasks)
+
+        written = await task_stats.recompute_stats()
+
+        assert written == 2
+        pipeline = mock_tasks.aggregate.call_args[0][0]
+        assert "$match" not in pipeline[0]
+        operations = mock_stats_collection.bulk_write.call_args[0][0]
+        assert operations[0]._filter == {"_id": 1}
+        assert operations[0]._doc["$set"]["open"] == 2
+
+    @pytest.mark.asyncio
+    async def test_recompute_stats_for_user_without_tasks(
+        self, mocker, mock_stats_collection
+    ):
+        mock_tasks = mocker.MagicMock()
+        cursor = mocker.MagicMock()
+        cursor.__aiter__.return_value = []
+        mock_tasks.aggregate = mocker.AsyncMock(return_value=cursor)
+        mocker.patch("app.task_stats.get_tasks_collection", return_value=mock_tasks)
+
+        await task_stats.recompute_stats(7)
+
+        pipeline = mock_tasks.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"user_id": 7}}
+        operations = mock_stats_collection.bulk_write.call_args[0][0]
+        assert operations[0]._doc["$set"] == {
+            **dict.fromkeys(task_stats.COUNTERS, 0),
+            "tags": {},
+        }
+
+
+class TestGetStats:
+    """Test cases for reading counters"""
+
+    @pytest.mark.asyncio
+    async def test_get_stats_existing_document(self, mocker, mock_stats_collection):
+        mock_recompute = mocker.patch("app.task_stats.recompute_stats")
+        mock_stats_collection.find_one.return_value = {
+            "_id": 1,
+            "total": 3,
+            "open": 2,
+            "completed": 1,
+            "deleted": 0,
+        }
+
+        result = await task_stats.get_stats(1)
+
+        assert result == TaskStats(total=3, open=2, completed=1, deleted=0)
+        mock_recompute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_stats_builds_missing_document(
+        self, mocker, mock_stats_collection
+    ):
+        mock_recompute = mocker.patch("app.task_stats.recompute_stats")
+        mock_stats_collection.find_one.side_effect = [
+            None,
+            {"_id": 1, "total": 1, "open": 1, "completed": 0, "deleted": 0},
+        ]
+
+        result = await task_stats.get_stats(1)
+
+        assert result.total == 1
+        mock_recompute.assert_awaited_once_with(1)
+
+
+class TestGetTagCounts:
+    """Test cases for reading tag counters"""
+
+    @pytest.mark.asyncio
+    async def test_get_tag_counts_sorted_without_unused_tags(
+        self, mock_stats_collection
+    ):
+        mock_stats_collection.find_one.return_value = {
+            "_id": 1,
+            "tags": {"home": 1, "work": 3, "old": 0, "errands": 1},
+        }
+
+        result = await task_stats.get_tag_counts(1)
+
+        assert [(item.tag, item.count) for item in result.tags] == [
+            ("work", 3),
+            ("errands", 1),
+            ("home", 1),
+        ]
@@ -0,0 +1,315 @@
+# tests/unit/test_task_tiering_unit.py
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app import task_tiering
+from app.task_tiering import (
+    bucket_id,
+    compact,
+    count_matching,
+    expand,
+    find_cold_many,
+    list_cold,
+    reaches_cold,
+    sort_key,
+    thaw,
+    thaw_matching,
+    tier_batch,
+)
+
+CUTOFF = datetime(2023, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def mock_tasks(mocker):
+    collection = mocker.MagicMock()
+    collection.delete_many = mocker.AsyncMock()
+    collection.bulk_write = mocker.AsyncMock()
+    collection.distinct = mocker.AsyncMock()
+    collection.insert_one = mocker.AsyncMock()
+    mocker.patch("app.task_tiering.get_tasks_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def mock_buckets(mocker):
+    collection = mocker.AsyncMock()
+    mocker.patch("app.task_tiering.get_collection", return_value=collection)
+    return collection
+
+
+@pytest.fixture
+def mock_invalidation(mocker):
+    return {
+        "list_cache": mocker.patch("app.task_tiering.list_cache", new=AsyncMock()),
+        "bus": mocker.patch("app.task_tiering.bus", new=AsyncMock()),
+    }
+
+
+def completed_task(user_id, created_at, **fields):
+    return {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "title": "Done",
+        "description": None,
+        "created_at": created_at,
+        "completed_at": created_at + timedelta(days=1),
+        "deleted_at": None,
+        **fields,
+    }
+
+
+class TestEntries:
+    """Test cases for bucket entries"""
+
+    def test_long_descriptions_are_compressed(self, mocker):
+        mocker.patch("app.task_tiering.TIER_COMPRESS_DESCRIPTIONS", True)
+        doc = completed_task(1, datetime(2022, 1, 5), description="x" * 1000)
+
+        entry = compact(doc)
+
+        assert isinstance(entry["description"], bytes)
+        assert len(entry["description"]) < 100
+        assert "user_id" not in entry and "deleted_at" not in entry
+        assert expand(entry, 1) == doc
+
+    def test_short_descriptions_stay_plain(self):
+        doc = completed_task(1, datetime(2022, 1, 5), description="short")
+
+        assert compact(doc)["description"] == "short"
+
+    def test_bucket_per_user_and_month(self):
+        assert bucket_id(7, datetime(2022, 1, 31, 23, 59)) == "7:2022-01"
+
+
+class TestReads:
+    """Test cases for deciding and reading the cold tier"""
+
+    def test_only_ranges_reaching_back_include_cold_tasks(self):
+        recent = datetime.now(UTC) - timedelta(days=1)
+        old = datetime.now(UTC) - timedelta(days=task_tiering.TIER_AFTER_DAYS + 1)
+
+        assert not reaches_cold(None, None)
+        assert not reaches_cold(recent, None)
+        assert reaches_cold(old, None)
+        assert reaches_cold(None, recent)
+
+    def test_sort_keys_match_mongo_order(self):
+        older = {"created_at": datetime(2022, 1, 1), "rank": None}
+        newer = {"created_at": datetime(2022, 2, 1), "rank": "A"}
+
+        assert sorted([older, newer], key=sort_key("created")) == [newer, older]
+        assert sorted([newer, older], key=sort_key("manual")) == [older, newer]
+
+    @pytest.mark.asyncio
+    async def test_list_cold_reads_only_buckets_in_range(self, mocker, mock_buckets):
+        # Arrange
+        entry = compact(completed_task(1, datetime(2022, 1, 5)))
+        cursor = mocker.AsyncMock()
+        cursor.next.return_value = {"page": [entry], "total": [{"count": 4}]}
+        mock_buckets.aggregate.return_value = cursor
+        created_from = datetime(2022, 1, 3, tzinfo=UTC)
+
+        # Act
+        docs, total = await list_cold(1, created_from, None, "work", "created", 5)
+
+        # Assert
+        assert total == 4
+        assert docs[0]["user_id"] == 1
+        pipeline = mock_buckets.aggregate.call_args[0][0]
+        assert pipeline[0] == {
+            "$match": {
+                "user_id": 1,
+                "month": {"$gte": datetime(2022, 1, 1, tzinfo=UTC)},
+            }
+        }
+        assert pipeline[3] == {
+            "$match": {"created_at": {"$gte": created_from}, "tags": "work"}
+        }
+        assert pipeline[4]["$facet"]["page"][1] == {"$limit": 5}
+
+    @pytest.mark.asyncio
+    async def test_find_cold_many_reads_matching_entries(self, mocker, mock_buckets):
+        # Arrange
+        doc = completed_task(1, datetime(2022, 1, 5))
+        cursor = mocker.AsyncMock()
+        cursor.to_list.return_value = [compact(doc)]
+        mock_buckets.aggregate.return_value = cursor
+        task_ids = [doc["_id"], ObjectId()]
+
+        # Act
+        docs = await find_cold_many(1, task_ids)
+
+        # Assert
+        assert docs == [doc]
+        pipeline = mock_buckets.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"user_id": 1, "tasks._id": {"$in": task_ids}}}
+
+    @pytest.mark.asyncio
+    async def test_find_cold_many_without_ids(self, mock_buckets):
+        assert await find_cold_many(1, []) == []
+        mock_buckets.aggregate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_thaw_moves_task_back(self, mock_tasks, mock_buckets):
+        # Arrange
+        doc = completed_task(1, datetime(2022, 1, 5))
+        mock_buckets.find_one.return_value = {"tasks": [compact(doc)]}
+
+        # Act
+        thawed = await thaw(1, doc["_id"])
+
+        # Assert
+        assert thawed
+        mock_tasks.insert_one.assert_awaited_once_with(doc)
+        mock_buckets.update_one.assert_awaited_once_with(
+            {"user_id": 1, "tasks._id": doc["_id"]},
+            {"$pull": {"tasks": {"_id": doc["_id"]}}},
+        )
+
+    @pytest.mark.asyncio
+    async def test_thaw_after_concurrent_thaw(self, mock_tasks, mock_buckets):
+        # Arrange
+        doc = completed_task(1, datetime(2022, 1, 5))
+        mock_buckets.find_one.return_value = {"tasks": [compact(doc)]}
+        mock_tasks.insert_one.side_effect = DuplicateKeyError("exists")
+
+        # Act & Assert
+        assert await thaw(1, doc["_id"])
+        mock_buckets.update_one.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_thaw_matching_moves_entries_back(
+        self, mocker, mock_tasks, mock_buckets
+    ):
+        # Arrange
+        doc = completed_task(1, datetime(2022, 1, 5))
+        cursor = mocker.AsyncMock()
+        cursor.to_list.return_value = [compact(doc)]
+        mock_buckets.aggregate.return_value = cursor
+        mock_tasks.insert_many = mocker.AsyncMock()
+        task_match = {"tags": "work"}
+
+        # Act
+        moved = await thaw_matching(1, task_match, {"$lt": CUTOFF}, limit=50)
+
+        # Assert
+        assert moved == 1
+        pipeline = mock_buckets.aggregate.call_args[0][0]
+        assert pipeline[0] == {"$match": {"user_id": 1, "month": {"$lt": CUTOFF}}}
+        assert pipeline[3:] == [{"$match": task_match}, {"$limit": 50}]
+        mock_tasks.insert_many.assert_awaited_once_with([doc], ordered=False)
+        mock_buckets.update_many.assert_awaited_once_with(
+            {"user_id": 1, "tasks._id": {"$in": [doc["_id"]]}},
+            {"$pull": {"tasks": {"_id": {"$in": [doc["_id"]]}}}},
+        )
+
+    @pytest.mark.asyncio
+    async def test_count_matching(self, mocker, mock_buckets):
+        cursor = mocker.AsyncMock()
+        cursor.to_list.return_value = [{"count": 4}]
+        mock_buckets.aggregate.return_value = cursor
+
+        assert await count_matching(1, {"tags": "work"}, limit=11) == 4
+        pipeline = mock_buckets.aggregate.call_args[0][0]
+        assert pipeline[-2:] == [{"$limit": 11}, {"$count": "count"}]
+
+    @pytest.mark.asyncio
+    async def test_thaw_of_unknown_task(self, mock_tasks, mock_buckets):
+        mock_buckets.find_one.return_value = None
+
+        assert not await thaw(1, ObjectId())
+        mock_tasks.insert_one.assert_not_called()
+
+
+class TestTierBatch:
+    """Test cases for moving old completed tasks into monthly buckets"""
+
+    @staticmethod
+    def batch(mock_tasks, docs):
+        mock_tasks.find.return_value.limit.return_value.to_list = AsyncMock(
+            return_value=docs
+        )
+
+    @pytest.mark.asyncio
+    async def test_groups_tasks_by_user_and_month(
+        self, mock_tasks, mock_buckets, mock_invalidation
+    ):
+        # Arrange
+        docs = [
+            completed_task(1, datetime(2022, 1, 5)),
+            completed_task(1, datetime(2022, 1, 20)),
+            completed_task(2, datetime(2022, 2, 1)),
+        ]
+        self.batch(mock_tasks, docs)
+        mock_tasks.bulk_write.return_value.deleted_count = 3
+
+        # Act
+        moved = await tier_batch(CUTOFF)
+
+        # Assert
+        assert moved == 3
+        query = mock_tasks.find.call_args[0][0]
+        assert query["completed_at"] == {"$lt": CUTOFF}
+        assert query["recurrence"] is None
+        operations = mock_buckets.bulk_write.call_args[0][0]
+        assert [op._filter["_id"] for op in operations] == ["1:2022-01", "2:2022-02"]
+        assert len(operations[0]._doc["$addToSet"]["tasks"]["$each"]) == 2
+        mock_invalidation["list_cache"].bump.assert_any_await(1)
+        mock_invalidation["list_cache"].bump.assert_any_await(2)
+        mock_invalidation["bus"].publish.assert_any_await("task", user_id=1)
+
+    @pytest.mark.asyncio
+    async def test_deletes_each_task_only_as_read(
+        self, mock_tasks, mock_buckets, mock_invalidation
+    ):
+        # Arrange
+        edited = datetime(2022, 1, 6, tzinfo=UTC)
+        docs = [completed_task(1, datetime(2022, 1, 5), updated_at=edited)]
+        self.batch(mock_tasks, docs)
+        mock_tasks.bulk_write.return_value.deleted_count = 1
+
+        # Act
+        await tier_batch(CUTOFF)
+
+        # Assert
+        [operation] = mock_tasks.bulk_write.call_args[0][0]
+        assert operation._filter["_id"] == docs[0]["_id"]
+        assert operation._filter["updated_at"] == edited
+        assert operation._filter["rank"] is None
+        assert operation._filter["completed_at"] == {"$lt": CUTOFF}
+
+    @pytest.mark.asyncio
+    async def test_task_edited_meanwhile_stays_hot(
+        self, mock_tasks, mock_buckets, mock_invalidation
+    ):
+        # Arrange
+        docs = [
+            completed_task(1, datetime(2022, 1, 5)),
+            completed_task(1, datetime(2022, 1, 9)),
+        ]
+        self.batch(mock_tasks, docs)
+        # The second task was edited between the find and the delete
+        mock_tasks.bulk_write.return_value.deleted_count = 1
+        mock_tasks.distinct.return_value = [docs[1]["_id"]]
+
+        # Act
+        moved = await tier_batch(CUTOFF)
+
+        # Assert
+        assert moved == 1
+        [pull] = mock_buckets.bulk_write.call_args[0][0]
+        assert pull._filter == {"_id": "1:2022-01"}
+        assert pull._doc == {"$pull": {"tasks": {"_id": {"$in": [docs[1]["_id"]]}}}}
+        mock_invalidation["list_cache"].bump.assert_awaited_once_with(1)
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_move(self, mock_tasks, mock_buckets):
+        self.batch(mock_tasks, [])
+
+        assert await tier_batch(CUTOFF) == 0
+        mock_buckets.bulk_write.assert_not_called()
@@ -0,0 +1,99 @@
+# tests/unit/test_write_batcher_unit.py
+import asyncio
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.write_batcher import InsertBatcher
+
+
+@pytest.fixture
+def mock_collection(mocker):
+    collection = mocker.AsyncMock()
+
+    async def insert_many(docs, ordered):
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+
+    collection.insert_many.side_effect = insert_many
+    return collection
+
+
+def make_batcher(collection, **kwargs):
+    return InsertBatcher(get_collection=lambda: collection, enabled=True, **kwargs)
+
+
+class TestInsertBatcher:
+    """Test cases for coalescing inserts into insert_many"""
+
+    @pytest.mark.asyncio
+    async def test_inserts_within_window_share_one_round_trip(self, mock_collection):
+        batcher = make_batcher(mock_collection, window_ms=5, max_docs=100)
+
+        ids = await asyncio.gather(
+            *(batcher.insert({"title": f"Task {i}"}) for i in range(3))
+        )
+
+        mock_collection.insert_many.assert_awaited_once()
+        docs = mock_collection.insert_many.call_args[0][0]
+        assert ids == [doc["_id"] for doc in docs]
+        assert len(set(ids)) == 3
+        assert batcher.metrics()["batches"] == 1
+        assert batcher.metrics()["average_batch_size"] == 3
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self, mock_collection):
+        batcher = make_batcher(mock_collection, window_ms=10_000, max_docs=2)
+
+        await asyncio.wait_for(
+            asyncio.gather(batcher.insert({"n": 1}), batcher.insert({"n": 2})),
+            timeout=1,
+        )
+
+        assert batcher.metrics()["max_batch_size"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_documents_fail_only_their_callers(self, mock_collection):
+        async def insert_many(docs, ordered):
+            for doc in docs:
+                doc["_id"] = ObjectId()
+            raise BulkWriteError(
+                {"writeErrors": [{"index": 1, "code": 11000, "errmsg": "dup"}]}
+            )
+
+        mock_collection.insert_many.side_effect = insert_many
+        batcher = make_batcher(mock_collection, window_ms=5)
+
+        results = await asyncio.gather(
+            batcher.insert({"n": 1}),
+            batcher.insert({"n": 2}),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], ObjectId)
+        assert isinstance(results[1], BulkWriteError)
+        assert mock_collection.insert_many.call_args.kwargs["ordered"] is False
+
+    @pytest.mark.asyncio
+    async def test_connection_error_fails_whole_batch(self, mock_collection):
+        mock_collection.insert_many.side_effect = ConnectionError("mongo down")
+        batcher = make_batcher(mock_collection, window_ms=5)
+
+        results = await asyncio.gather(
+            batcher.insert({"n": 1}),
+            batcher.insert({"n": 2}),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_documents(self, mock_collection):
+        batcher = make_batcher(mock_collection, window_ms=10_000)
+        pending = asyncio.create_task(batcher.insert({"n": 1}))
+        await asyncio.sleep(0)
+
+        await batcher.close()
+
+        assert isinstance(await pending, ObjectId)